@@ -1,8 +1,8 @@
 import streamlit as st
-import pandas as pd
-import requests
 from datetime import datetime
-import math
+
+from commo_core import COMMODITY_DATA, CURRENCY_DATA, convert_units, format_number
+from commo_core.fx import MATRIX_BASE, RATE_CACHE, get_exchange_rate
 
 st.set_page_config(
     page_title="Commodities Trading Converter",
@@ -43,198 +43,6 @@ st.markdown("""
 </style>
 """, unsafe_allow_html=True)
 
-COMMODITY_DATA = {
-    "Oil & Liquids": {
-        "Brent Crude": {"density": 0.825, "api_gravity": 38.3, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "WTI Crude": {"density": 0.827, "api_gravity": 37.9, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Gasoline": {"density": 0.74, "api_gravity": 60, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Diesel": {"density": 0.85, "api_gravity": 35, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Jet Fuel": {"density": 0.8, "api_gravity": 45, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Heating Oil": {"density": 0.87, "api_gravity": 31, "units": ["barrels", "metric tons", "gallons", "liters"]}
-    },
-    "Natural Gas": {
-        "Natural Gas": {"density": 0.717, "calorific_value": 38.7, "units": ["mcf", "bcf", "mmbtu", "therms", "cubic_meters"]},
-        "LNG": {"density": 0.45, "calorific_value": 55, "units": ["metric tons", "cubic_meters", "mmbtu", "gallons"]}
-    },
-    "Coal": {
-        "Thermal Coal": {"density": 1.3, "calorific_value": 6000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]},
-        "Coking Coal": {"density": 1.35, "calorific_value": 7000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]},
-        "Anthracite": {"density": 1.4, "calorific_value": 8000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]}
-    },
-    "Agricultural": {
-        "Wheat": {"density": 0.78, "moisture_content": 13.5, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Corn": {"density": 0.72, "moisture_content": 15.5, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Soybeans": {"density": 0.77, "moisture_content": 13.0, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Rice": {"density": 0.75, "moisture_content": 14.0, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Sugar": {"density": 0.8, "moisture_content": 0.1, "units": ["metric tons", "pounds", "kilograms"]}
-    },
-    "Power/Electricity": {
-        "Electricity": {"units": ["mwh", "kwh", "gwh", "mmbtu", "therms"]}
-    }
-}
-
-UNIT_CONVERSIONS = {
-    "barrels": 0.158987, # cubic meters per barrel
-    "gallons": 0.00378541, # cubic meters per gallon
-    "liters": 0.001, # cubic meters per liter
-    "metric tons": 1.0,
-    "short tons": 0.907185,
-    "pounds": 0.000453592,
-    "kilograms": 0.001,
-    "bushels": {"wheat": 27.2155, "corn": 25.4012, "soybeans": 27.2155, "rice": 20.4124}, # kg per bushel
-    "mcf": 28.3168, # cubic meters per thousand cubic feet
-    "bcf": 28316846.6, # cubic meters per billion cubic feet
-    "mmbtu": 1.05506, # GJ per MMBtu
-    "therms": 0.105506, # GJ per therm
-    "cubic_meters": 1.0,
-    "mwh": 3.6, # GJ per MWh
-    "kwh": 0.0036, # GJ per kWh
-    "gwh": 3600, # GJ per GWh
-    "kcal": 4.184e-6 # GJ per kcal
-}
-
-CURRENCY_DATA = {
-    "USD": {"region": "USA"},
-    "EUR": {"region": "Europe"},
-    "GBP": {"region": "United Kingdom"},
-    "JPY": {"region": "Japan"},
-    "CAD": {"region": "Canada"},
-    "AUD": {"region": "Australia"},
-    "CHF": {"region": "Switzerland"},
-    "CNY": {"region": "China"},
-    "INR": {"region": "Indian Rupee"},
-    "BRL": {"region": "Brazil"},
-    "RUB": {"region": "Russia"},
-    "MXN": {"region": "Mexico"}
-}
-
-def calculate_density_from_api(api_gravity):
-    return 141.5 / (131.5 + api_gravity)
-
-def convert_oil_units(value, from_unit, to_unit, density=None, api_gravity=None):
-    if density is None and api_gravity is not None:
-        density = calculate_density_from_api(api_gravity)
-    elif density is None:
-        density = 0.85 
-    
-    if from_unit == "barrels":
-        cubic_meters = value * UNIT_CONVERSIONS["barrels"]
-    elif from_unit == "gallons":
-        cubic_meters = value * UNIT_CONVERSIONS["gallons"]
-    elif from_unit == "liters":
-        cubic_meters = value * UNIT_CONVERSIONS["liters"]
-    elif from_unit == "metric tons":
-        cubic_meters = value / density
-    else:
-        cubic_meters = value
-    
-    if to_unit == "barrels":
-        return cubic_meters / UNIT_CONVERSIONS["barrels"]
-    elif to_unit == "gallons":
-        return cubic_meters / UNIT_CONVERSIONS["gallons"]
-    elif to_unit == "liters":
-        return cubic_meters / UNIT_CONVERSIONS["liters"]
-    elif to_unit == "metric tons":
-        return cubic_meters * density
-    else:
-        return cubic_meters
-
-def convert_gas_units(value, from_unit, to_unit, calorific_value=None):
-    if calorific_value is None:
-        calorific_value = 38.7 
-    
-    if from_unit == "mcf":
-        cubic_meters = value * UNIT_CONVERSIONS["mcf"]
-    elif from_unit == "bcf":
-        cubic_meters = value * UNIT_CONVERSIONS["bcf"]
-    elif from_unit == "mmbtu":
-        cubic_meters = value * 1000 / calorific_value
-    elif from_unit == "therms":
-        cubic_meters = value * 100 / calorific_value
-    else:
-        cubic_meters = value
-    
-    if to_unit == "mcf":
-        return cubic_meters / UNIT_CONVERSIONS["mcf"]
-    elif to_unit == "bcf":
-        return cubic_meters / UNIT_CONVERSIONS["bcf"]
-    elif to_unit == "mmbtu":
-        return cubic_meters * calorific_value / 1000
-    elif to_unit == "therms":
-        return cubic_meters * calorific_value / 100
-    else:
-        return cubic_meters
-
-def convert_agricultural_units(value, from_unit, to_unit, commodity, moisture_content=None):
-    commodity_lower = commodity.lower()
-    
-    moisture_factor = 1.0
-    if moisture_content is not None:
-        standard_moisture = COMMODITY_DATA["Agricultural"][commodity]["moisture_content"]
-        moisture_factor = (100 - standard_moisture) / (100 - moisture_content)
-    
-    if from_unit == "bushels":
-        if commodity_lower in UNIT_CONVERSIONS["bushels"]:
-            kg = value * UNIT_CONVERSIONS["bushels"][commodity_lower] * moisture_factor
-        else:
-            kg = value * 25.4  
-    elif from_unit == "metric tons":
-        kg = value * 1000
-    elif from_unit == "pounds":
-        kg = value * 0.453592
-    else:
-        kg = value
-    
-    if to_unit == "bushels":
-        if commodity_lower in UNIT_CONVERSIONS["bushels"]:
-            return kg / (UNIT_CONVERSIONS["bushels"][commodity_lower] * moisture_factor)
-        else:
-            return kg / 25.4
-    elif to_unit == "metric tons":
-        return kg / 1000
-    elif to_unit == "pounds":
-        return kg / 0.453592
-    else:
-        return kg
-
-def convert_power_units(value, from_unit, to_unit):
-    if from_unit in ["mwh", "kwh", "gwh"]:
-        gj = value * UNIT_CONVERSIONS[from_unit]
-    elif from_unit == "mmbtu":
-        gj = value * UNIT_CONVERSIONS["mmbtu"]
-    elif from_unit == "therms":
-        gj = value * UNIT_CONVERSIONS["therms"]
-    else:
-        gj = value
-    
-    if to_unit in ["mwh", "kwh", "gwh"]:
-        return gj / UNIT_CONVERSIONS[to_unit]
-    elif to_unit == "mmbtu":
-        return gj / UNIT_CONVERSIONS["mmbtu"]
-    elif to_unit == "therms":
-        return gj / UNIT_CONVERSIONS["therms"]
-    else:
-        return gj
-
-def get_exchange_rate(from_currency, to_currency):
-    try:
-        url = f"https://api.exchangerate-api.com/v4/latest/{from_currency}"
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        return data['rates'].get(to_currency, None)
-    except:
-        return None
-
-def format_number(value, decimals=2):
-    if value >= 1000000:
-        return f"{value:,.{decimals}f}"
-    elif value >= 1000:
-        return f"{value:,.{decimals}f}"
-    elif value >= 1:
-        return f"{value:.{decimals}f}"
-    else:
-        return f"{value:.{decimals+2}f}"
-
 def get_currency_display(currency_code):
     region = CURRENCY_DATA.get(currency_code, {}).get("region", "")
     return f"{currency_code} – {region}"
@@ -319,26 +127,7 @@ with tab1:
             if from_unit == to_unit:
                 result = input_value
             else:
-                if category == "Oil & Liquids":
-                    result = convert_oil_units(input_value, from_unit, to_unit, 
-                                             density=additional_params.get("density"))
-                elif category == "Natural Gas":
-                    result = convert_gas_units(input_value, from_unit, to_unit, 
-                                             calorific_value=additional_params.get("calorific_value"))
-                elif category == "Agricultural":
-                    result = convert_agricultural_units(input_value, from_unit, to_unit, commodity,
-                                                      moisture_content=additional_params.get("moisture_content"))
-                elif category == "Power/Electricity":
-                    result = convert_power_units(input_value, from_unit, to_unit)
-                elif category == "Coal":
-                    if from_unit == "metric tons" and to_unit == "short tons":
-                        result = input_value / 0.907185
-                    elif from_unit == "short tons" and to_unit == "metric tons":
-                        result = input_value * 0.907185
-                    else:
-                        result = input_value
-                else:
-                    result = input_value
+                result = convert_units(input_value, category, commodity, from_unit, to_unit, **additional_params)
             
             st.markdown(f"""
             <div class="conversion-result">
@@ -396,7 +185,7 @@ with tab2:
                         <p><strong>{amount:,.2f} {get_currency_display(from_currency)}</strong> equals:</p>
                         <h2 style="color: #28a745;">{converted_amount:,.2f} {get_currency_display(to_currency)}</h2>
                         <p><small>Exchange rate: 1 {from_currency} = {exchange_rate:.4f} {to_currency}</small></p>
-                        <p><small>Rates updated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}</small></p>
+                        <p><small>Rates updated: {datetime.fromtimestamp(RATE_CACHE.fetched_at(MATRIX_BASE)).strftime('%Y-%m-%d %H:%M:%S')}{' (offline snapshot)' if RATE_CACHE.source(MATRIX_BASE) == 'snapshot' else ''}</small></p>
                     </div>
                     """, unsafe_allow_html=True)
             else:
@@ -1,11 +1,35 @@
 import streamlit as st
-import pandas as pd
-import requests
+from streamlit.errors import StreamlitAPIException
 from datetime import datetime
-import json
-import plotly.graph_objects as go
-import plotly.express as px
-import math
+import os
+import tempfile
+import uuid
+from contextlib import contextmanager
+from functools import wraps
+
+from commo_core import (
+    COMMODITY_DATA,
+    CURRENCY_DATA,
+    calculate_api_from_density,
+    calculate_density_from_api,
+    convert_units,
+    format_number
+)
+# pandas, NumPy, plotly and requests are imported where first used to keep cold starts short
+from commo_core.batch_options import (
+    DEFAULT_WORKERS,
+    OUTPUT_FORMATS,
+    detect_file_format,
+    keep_result_file,
+    remove_result_file
+)
+from commo_core.charts import create_comparison_chart, create_gauge_chart, create_histogram_chart
+from commo_core.energy import ENERGY_BASES, equivalence_matrix, to_energy
+from commo_core.bookmarks import BOOKMARKS, DEFAULT_OWNER
+from commo_core.history import HISTORY
+from commo_core.sensitivity import DISTRIBUTIONS, monte_carlo, quality_parameter
+from commo_core.instrumentation import TIMING_LOG_PATH, RerunTimer, log_timings
+from commo_core.fx import MATRIX_BASE, RATE_CACHE, get_exchange_rate, get_rate_cache_stats, get_rate_matrix
 
 # Page Configuration
 st.set_page_config(
@@ -16,16 +40,24 @@ st.set_page_config(
 )
 
 # Initialize session state
-if 'conversion_history' not in st.session_state:
-    st.session_state.conversion_history = []
-if 'bookmarks' not in st.session_state:
-    st.session_state.bookmarks = []
+if 'history_cursors' not in st.session_state:
+    st.session_state.history_cursors = [None]
+if 'bookmark_owner' not in st.session_state:
+    st.session_state.bookmark_owner = DEFAULT_OWNER
 if 'dark_mode' not in st.session_state:
     st.session_state.dark_mode = False
 if 'auto_calculate' not in st.session_state:
     st.session_state.auto_calculate = True
 if 'wizard_mode' not in st.session_state:
     st.session_state.wizard_mode = False
+if 'debug_timing' not in st.session_state:
+    st.session_state.debug_timing = (os.environ.get("COMMO_DEBUG_TIMING") == "1"
+                                     or st.query_params.get("debug") == "timing")
+if 'session_id' not in st.session_state:
+    st.session_state.session_id = uuid.uuid4().hex[:12]
+
+# Per-rerun timing (opt-in via the sidebar, COMMO_DEBUG_TIMING=1 or ?debug=timing)
+timer = RerunTimer(enabled=st.session_state.debug_timing)
 
 # Dark/Light Mode Styling
 def get_theme_styles():
@@ -150,38 +182,8 @@ def get_theme_styles():
         </style>
         """
 
-st.markdown(get_theme_styles(), unsafe_allow_html=True)
-
-# Commodity Data
-COMMODITY_DATA = {
-    "Oil & Liquids": {
-        "Brent Crude": {"density": 0.825, "api_gravity": 38.3, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "WTI Crude": {"density": 0.827, "api_gravity": 37.9, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Gasoline": {"density": 0.74, "api_gravity": 60, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Diesel": {"density": 0.85, "api_gravity": 35, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Jet Fuel": {"density": 0.8, "api_gravity": 45, "units": ["barrels", "metric tons", "gallons", "liters"]},
-        "Heating Oil": {"density": 0.87, "api_gravity": 31, "units": ["barrels", "metric tons", "gallons", "liters"]}
-    },
-    "Natural Gas": {
-        "Natural Gas": {"density": 0.717, "calorific_value": 38.7, "units": ["mcf", "bcf", "mmbtu", "therms", "cubic_meters"]},
-        "LNG": {"density": 0.45, "calorific_value": 55, "units": ["metric tons", "cubic_meters", "mmbtu", "gallons"]}
-    },
-    "Coal": {
-        "Thermal Coal": {"density": 1.3, "calorific_value": 6000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]},
-        "Coking Coal": {"density": 1.35, "calorific_value": 7000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]},
-        "Anthracite": {"density": 1.4, "calorific_value": 8000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]}
-    },
-    "Agricultural": {
-        "Wheat": {"density": 0.78, "moisture_content": 13.5, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Corn": {"density": 0.72, "moisture_content": 15.5, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Soybeans": {"density": 0.77, "moisture_content": 13.0, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Rice": {"density": 0.75, "moisture_content": 14.0, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
-        "Sugar": {"density": 0.8, "moisture_content": 0.1, "units": ["metric tons", "pounds", "kilograms"]}
-    },
-    "Power/Electricity": {
-        "Electricity": {"units": ["mwh", "kwh", "gwh", "mmbtu", "therms"]}
-    }
-}
+with timer.section("theme styles"):
+    st.markdown(get_theme_styles(), unsafe_allow_html=True)
 
 # Predefined Scenarios
 SCENARIOS = {
@@ -215,238 +217,95 @@ SCENARIOS = {
     }
 }
 
-# Unit Conversions
-UNIT_CONVERSIONS = {
-    "barrels": 0.158987,
-    "gallons": 0.00378541,
-    "liters": 0.001,
-    "metric tons": 1.0,
-    "short tons": 0.907185,
-    "pounds": 0.000453592,
-    "kilograms": 0.001,
-    "bushels": {"wheat": 27.2155, "corn": 25.4012, "soybeans": 27.2155, "rice": 20.4124},
-    "mcf": 28.3168,
-    "bcf": 28316846.6,
-    "mmbtu": 1.05506,
-    "therms": 0.105506,
-    "cubic_meters": 1.0,
-    "mwh": 3.6,
-    "kwh": 0.0036,
-    "gwh": 3600,
-    "kcal": 4.184e-6
-}
-
-# Currency Data
-CURRENCY_DATA = {
-    "USD": {"region": "USA", "symbol": "$"},
-    "EUR": {"region": "Europe", "symbol": "€"},
-    "GBP": {"region": "United Kingdom", "symbol": "£"},
-    "JPY": {"region": "Japan", "symbol": "¥"},
-    "CAD": {"region": "Canada", "symbol": "C$"},
-    "AUD": {"region": "Australia", "symbol": "A$"},
-    "CHF": {"region": "Switzerland", "symbol": "CHF"},
-    "CNY": {"region": "China", "symbol": "¥"},
-    "INR": {"region": "India", "symbol": "₹"},
-    "BRL": {"region": "Brazil", "symbol": "R$"},
-    "RUB": {"region": "Russia", "symbol": "₽"},
-    "MXN": {"region": "Mexico", "symbol": "$"}
-}
-
 # Utility Functions
-def calculate_density_from_api(api_gravity):
-    """Calculate density from API gravity"""
-    return 141.5 / (131.5 + api_gravity)
+def add_to_history(conversion_data, explicit=False):
+    """Add conversion to the persistent history (written in the background)
 
-def calculate_api_from_density(density):
-    """Calculate API gravity from density"""
-    return 141.5 / density - 131.5
+    Reruns with unchanged inputs are not recorded again unless the conversion was explicitly requested.
+    """
+    owner = st.session_state.bookmark_owner
+    history_key = repr((owner, sorted(conversion_data.items())))
+    if explicit or history_key != st.session_state.get("last_history_key"):
+        HISTORY.add(conversion_data, owner=owner)
+        st.session_state.last_history_key = history_key
 
-def convert_oil_units(value, from_unit, to_unit, density=None, api_gravity=None):
-    if density is None and api_gravity is not None:
-        density = calculate_density_from_api(api_gravity)
-    elif density is None:
-        density = 0.85
-    
-    if from_unit == "barrels":
-        cubic_meters = value * UNIT_CONVERSIONS["barrels"]
-    elif from_unit == "gallons":
-        cubic_meters = value * UNIT_CONVERSIONS["gallons"]
-    elif from_unit == "liters":
-        cubic_meters = value * UNIT_CONVERSIONS["liters"]
-    elif from_unit == "metric tons":
-        cubic_meters = value / density
-    else:
-        cubic_meters = value
+def show_batch_metrics(summary):
+    """Render the batch summary tiles from a batch summary (see commo_core.batch.summarize_batch)"""
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Total Input", f"{summary['total_input']:,.2f}")
+    with col2:
+        st.metric("Total Output", f"{summary['total_output']:,.2f}")
+    with col3:
+        st.metric("Average Ratio", f"{summary['ratio']:.4f}")
     
-    if to_unit == "barrels":
-        return cubic_meters / UNIT_CONVERSIONS["barrels"]
-    elif to_unit == "gallons":
-        return cubic_meters / UNIT_CONVERSIONS["gallons"]
-    elif to_unit == "liters":
-        return cubic_meters / UNIT_CONVERSIONS["liters"]
-    elif to_unit == "metric tons":
-        return cubic_meters * density
-    else:
-        return cubic_meters
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        st.metric("Mean Row Ratio", f"{summary['mean_ratio']:.4f}")
+    with col2:
+        st.metric("Min Result", f"{summary['min_output']:,.2f}")
+    with col3:
+        st.metric("Max Result", f"{summary['max_output']:,.2f}")
+    # Percentile bands need the whole batch in memory, so streamed batches have none
+    if summary.get("output_percentiles"):
+        st.caption("Result percentiles: " + " · ".join(
+            f"P{q}: {value:,.2f}" for q, value in summary["output_percentiles"].items()))
 
-def convert_gas_units(value, from_unit, to_unit, calorific_value=None):
-    if calorific_value is None:
-        calorific_value = 38.7
-    
-    if from_unit == "mcf":
-        cubic_meters = value * UNIT_CONVERSIONS["mcf"]
-    elif from_unit == "bcf":
-        cubic_meters = value * UNIT_CONVERSIONS["bcf"]
-    elif from_unit == "mmbtu":
-        cubic_meters = value * 1000 / calorific_value
-    elif from_unit == "therms":
-        cubic_meters = value * 100 / calorific_value
-    else:
-        cubic_meters = value
-    
-    if to_unit == "mcf":
-        return cubic_meters / UNIT_CONVERSIONS["mcf"]
-    elif to_unit == "bcf":
-        return cubic_meters / UNIT_CONVERSIONS["bcf"]
-    elif to_unit == "mmbtu":
-        return cubic_meters * calorific_value / 1000
-    elif to_unit == "therms":
-        return cubic_meters * calorific_value / 100
-    else:
-        return cubic_meters
+def serve_result_file(output, file_name, mime):
+    """Download button for a result file on disk, read only when the button is clicked
 
-def convert_agricultural_units(value, from_unit, to_unit, commodity, moisture_content=None):
-    commodity_lower = commodity.lower()
+    The file stays on disk, so it can be downloaded again, until the session converts
+    another batch or the server exits.
+    """
+    output.close()
+    path = output.name
+    previous = st.session_state.get("batch_result_path")
+    if previous and previous != path:
+        remove_result_file(previous)
+    st.session_state.batch_result_path = path
+    keep_result_file(path)
     
-    moisture_factor = 1.0
-    if moisture_content is not None:
-        standard_moisture = COMMODITY_DATA["Agricultural"][commodity]["moisture_content"]
-        moisture_factor = (100 - standard_moisture) / (100 - moisture_content)
+    def read_result():
+        with open(path, "rb") as f:
+            return f.read()
     
-    if from_unit == "bushels":
-        if commodity_lower in UNIT_CONVERSIONS["bushels"]:
-            kg = value * UNIT_CONVERSIONS["bushels"][commodity_lower] * moisture_factor
-        else:
-            kg = value * 25.4
-    elif from_unit == "metric tons":
-        kg = value * 1000
-    elif from_unit == "pounds":
-        kg = value * 0.453592
-    else:
-        kg = value
-    
-    if to_unit == "bushels":
-        if commodity_lower in UNIT_CONVERSIONS["bushels"]:
-            return kg / (UNIT_CONVERSIONS["bushels"][commodity_lower] * moisture_factor)
-        else:
-            return kg / 25.4
-    elif to_unit == "metric tons":
-        return kg / 1000
-    elif to_unit == "pounds":
-        return kg / 0.453592
-    else:
-        return kg
+    st.download_button("📥 Download Results", read_result, file_name, mime)
 
-def convert_power_units(value, from_unit, to_unit):
-    if from_unit in ["mwh", "kwh", "gwh"]:
-        gj = value * UNIT_CONVERSIONS[from_unit]
-    elif from_unit == "mmbtu":
-        gj = value * UNIT_CONVERSIONS["mmbtu"]
-    elif from_unit == "therms":
-        gj = value * UNIT_CONVERSIONS["therms"]
-    else:
-        gj = value
+@contextmanager
+def fragment_section(name):
+    """Time an app section as part of the full rerun, or on its own when only its fragment reruns"""
+    global timer
+    if not timer.finished:
+        with timer.section(name):
+            yield
+        return
     
-    if to_unit in ["mwh", "kwh", "gwh"]:
-        return gj / UNIT_CONVERSIONS[to_unit]
-    elif to_unit == "mmbtu":
-        return gj / UNIT_CONVERSIONS["mmbtu"]
-    elif to_unit == "therms":
-        return gj / UNIT_CONVERSIONS["therms"]
-    else:
-        return gj
-
-def get_exchange_rate(from_currency, to_currency):
-    try:
-        url = f"https://api.exchangerate-api.com/v4/latest/{from_currency}"
-        response = requests.get(url, timeout=5)
-        data = response.json()
-        return data['rates'].get(to_currency, None)
-    except:
-        return None
-
-def format_number(value, decimals=2):
-    if value >= 1000000:
-        return f"{value:,.{decimals}f}"
-    elif value >= 1000:
-        return f"{value:,.{decimals}f}"
-    elif value >= 1:
-        return f"{value:.{decimals}f}"
-    else:
-        return f"{value:.{decimals+2}f}"
+    # Fragment-only rerun: the full-run timer has already been reported
+    timer = RerunTimer(enabled=timer.enabled)
+    with timer.section(name):
+        yield
+    if timer.enabled:
+        record = timer.finish(session=st.session_state.session_id, fragment=name)
+        log_timings(record)
+        st.caption(f"⏱️ Partial rerun of {name}: {record['total_ms']:.1f} ms")
 
-def add_to_history(conversion_data):
-    """Add conversion to history"""
-    if len(st.session_state.conversion_history) >= 10:
-        st.session_state.conversion_history.pop(0)
-    st.session_state.conversion_history.append({
-        **conversion_data,
-        "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    })
-
-def create_comparison_chart(conversions):
-    """Create a comparison chart for multiple conversions"""
-    if not conversions:
-        return None
-    
-    fig = go.Figure()
-    
-    for i, conv in enumerate(conversions):
-        fig.add_trace(go.Bar(
-            x=[conv["commodity"]],
-            y=[conv["result"]],
-            name=f"{conv['input_value']} {conv['from_unit']} → {conv['to_unit']}",
-            text=f"{format_number(conv['result'])} {conv['to_unit']}",
-            textposition='auto',
-        ))
-    
-    fig.update_layout(
-        title="Conversion Comparison",
-        xaxis_title="Commodity",
-        yaxis_title="Converted Value",
-        height=400,
-        showlegend=True
-    )
-    
-    return fig
+def timed_fragment(name):
+    """Render a function as a Streamlit fragment that reruns independently of the rest of the app"""
+    def decorator(render):
+        @st.fragment
+        @wraps(render)
+        def fragment():
+            with fragment_section(name):
+                render()
+        return fragment
+    return decorator
 
-def create_gauge_chart(original_value, converted_value, from_unit, to_unit):
-    """Create a gauge chart showing conversion ratio"""
-    ratio = converted_value / original_value if original_value != 0 else 0
-    
-    fig = go.Figure(go.Indicator(
-        mode = "gauge+number+delta",
-        value = ratio,
-        domain = {'x': [0, 1], 'y': [0, 1]},
-        title = {'text': f"Conversion Ratio<br>{from_unit} → {to_unit}"},
-        delta = {'reference': 1},
-        gauge = {
-            'axis': {'range': [None, max(ratio * 1.5, 2)]},
-            'bar': {'color': "darkblue"},
-            'steps': [
-                {'range': [0, ratio * 0.5], 'color': "lightgray"},
-                {'range': [ratio * 0.5, ratio], 'color': "gray"}
-            ],
-            'threshold': {
-                'line': {'color': "red", 'width': 4},
-                'thickness': 0.75,
-                'value': ratio
-            }
-        }
-    ))
-    
-    fig.update_layout(height=300)
-    return fig
+def rerun_fragment():
+    """Rerun only the calling fragment, falling back to a full rerun outside a fragment rerun"""
+    try:
+        st.rerun(scope="fragment")
+    except StreamlitAPIException:
+        st.rerun()
 
 # Header with theme toggle
 col1, col2 = st.columns([4, 1])
@@ -458,14 +317,13 @@ with col2:
         st.rerun()
 
 # Settings Panel
-with st.sidebar:
+@timed_fragment("sidebar")
+def render_sidebar():
     st.header("⚙️ Settings")
     
-    # Auto-calculation toggle
-    st.session_state.auto_calculate = st.checkbox("Auto-calculate on input change", value=st.session_state.auto_calculate)
-    
-    # Wizard mode toggle
-    st.session_state.wizard_mode = st.checkbox("Enable guided wizard", value=st.session_state.wizard_mode)
+    # Rerun timing panel toggle (takes effect on a full rerun)
+    if st.checkbox("Show rerun timing panel", key="debug_timing") != timer.enabled:
+        st.rerun()
     
     st.markdown("---")
     
@@ -486,24 +344,47 @@ with st.sidebar:
     
     # Bookmarks
     st.subheader("📚 Bookmarks")
-    if st.session_state.bookmarks:
-        for i, bookmark in enumerate(st.session_state.bookmarks):
-            if st.button(f"📌 {bookmark['name']}", key=f"bookmark_{i}"):
+    owner = st.text_input("Desk / user:", key="bookmark_owner", help="Bookmarks and history are kept per desk")
+    prefix = st.text_input("Search bookmarks:", placeholder="Name starts with...")
+    # One indexed page per rerun, however many bookmarks the desk has saved
+    bookmarks = BOOKMARKS.search(owner, prefix=prefix, limit=20)
+    if bookmarks:
+        for bookmark in bookmarks:
+            if st.button(f"📌 {bookmark['name']}", key=f"bookmark_{bookmark['name']}"):
                 st.session_state.selected_bookmark = bookmark
                 st.rerun()
     else:
         st.info("No bookmarks saved yet")
     
-    if st.button("🗑️ Clear Bookmarks") and st.session_state.bookmarks:
-        st.session_state.bookmarks = []
-        st.rerun()
+    # Only the bookmarks listed above are deleted, and only after confirming
+    if st.button("🗑️ Delete Shown Bookmarks", disabled=not bookmarks):
+        st.session_state.pending_bookmark_delete = (owner, [bookmark["name"] for bookmark in bookmarks])
+    pending = st.session_state.get("pending_bookmark_delete")
+    if pending:
+        pending_owner, names = pending
+        st.warning(f"Delete {len(names)} bookmark(s) of '{pending_owner}': {', '.join(names)}?")
+        col1, col2 = st.columns(2)
+        with col1:
+            if st.button("Delete", type="primary", key="confirm_bookmark_delete"):
+                BOOKMARKS.delete_many(names, pending_owner)
+                del st.session_state.pending_bookmark_delete
+                rerun_fragment()
+        with col2:
+            if st.button("Cancel", key="cancel_bookmark_delete"):
+                del st.session_state.pending_bookmark_delete
+                rerun_fragment()
     
     st.markdown("---")
     
     # Conversion History
     st.subheader("📜 Recent Conversions")
-    if st.session_state.conversion_history:
-        for i, conv in enumerate(reversed(st.session_state.conversion_history[-5:])):
+    # Pages are fetched with keyset cursors; history_cursors holds the cursor of every page visited
+    if st.session_state.get("history_owner") != owner:
+        st.session_state.history_owner = owner
+        st.session_state.history_cursors = [None]
+    history_page, older_cursor = HISTORY.page(5, before=st.session_state.history_cursors[-1], owner=owner)
+    if history_page:
+        for conv in history_page:
             st.markdown(f"""
             <div class="history-item">
                 <small>{conv['timestamp']}</small><br>
@@ -514,9 +395,23 @@ with st.sidebar:
     else:
         st.info("No conversions yet")
     
-    if st.button("🗑️ Clear History") and st.session_state.conversion_history:
-        st.session_state.conversion_history = []
-        st.rerun()
+    col1, col2 = st.columns(2)
+    with col1:
+        if st.button("⬅️ Newer", disabled=len(st.session_state.history_cursors) == 1):
+            st.session_state.history_cursors.pop()
+            rerun_fragment()
+    with col2:
+        if st.button("Older ➡️", disabled=older_cursor is None):
+            st.session_state.history_cursors.append(older_cursor)
+            rerun_fragment()
+    
+    if st.button("🗑️ Clear History") and history_page:
+        HISTORY.clear(owner)
+        st.session_state.history_cursors = [None]
+        rerun_fragment()
+
+with st.sidebar:
+    render_sidebar()
 
 # Main Application Tabs
 tab1, tab2, tab3, tab4, tab5 = st.tabs([
@@ -528,7 +423,15 @@ tab1, tab2, tab3, tab4, tab5 = st.tabs([
 ])
 
 # Tab 1: Unit Converter
-with tab1:
+@timed_fragment("Unit Converter")
+def unit_converter_tab():
+    # Converter settings
+    col1, col2 = st.columns(2)
+    with col1:
+        st.session_state.auto_calculate = st.checkbox("Auto-calculate on input change", value=st.session_state.auto_calculate)
+    with col2:
+        st.session_state.wizard_mode = st.checkbox("Enable guided wizard", value=st.session_state.wizard_mode)
+    
     if st.session_state.wizard_mode:
         st.info("🧙‍♂️ **Wizard Mode**: Follow the steps below for guided conversion")
         
@@ -573,7 +476,7 @@ with tab1:
             with scenario_cols[i]:
                 if st.button(f"⚡ {name}", key=f"scenario_{i}"):
                     st.session_state.selected_scenario = scenario
-                    st.rerun()
+                    rerun_fragment()
         
         st.markdown("---")
         
@@ -613,7 +516,7 @@ with tab1:
             with col4:
                 if st.button("🔄", help="Swap units"):
                     from_unit, to_unit = to_unit, from_unit
-                    st.rerun()
+                    rerun_fragment()
     
     # Additional Parameters
     additional_params = {}
@@ -660,46 +563,29 @@ with tab1:
             return input_value
         
         try:
-            if category == "Oil & Liquids":
-                return convert_oil_units(input_value, from_unit, to_unit, 
-                                       density=additional_params.get("density"))
-            elif category == "Natural Gas":
-                return convert_gas_units(input_value, from_unit, to_unit, 
-                                       calorific_value=additional_params.get("calorific_value"))
-            elif category == "Agricultural":
-                return convert_agricultural_units(input_value, from_unit, to_unit, commodity,
-                                                moisture_content=additional_params.get("moisture_content"))
-            elif category == "Power/Electricity":
-                return convert_power_units(input_value, from_unit, to_unit)
-            elif category == "Coal":
-                if from_unit == "metric tons" and to_unit == "short tons":
-                    return input_value / 0.907185
-                elif from_unit == "short tons" and to_unit == "metric tons":
-                    return input_value * 0.907185
-                else:
-                    return input_value
-            else:
-                return input_value
+            return convert_units(input_value, category, commodity, from_unit, to_unit, **additional_params)
         except Exception as e:
             st.error(f"Conversion error: {str(e)}")
             return None
     
     # Auto-calculation or manual conversion
     if st.session_state.auto_calculate and input_value > 0:
-        result = perform_conversion()
+        with timer.section("conversion"):
+            result = perform_conversion()
         show_result = True
     else:
         show_result = False
         col1, col2 = st.columns([2, 1])
         with col1:
             if st.button("🔄 Convert", type="primary"):
-                result = perform_conversion()
+                with timer.section("conversion"):
+                    result = perform_conversion()
                 show_result = True
         with col2:
             if st.button("💾 Save as Bookmark"):
                 bookmark_name = st.text_input("Bookmark name:", value=f"{commodity} {from_unit}→{to_unit}")
                 if bookmark_name:
-                    st.session_state.bookmarks.append({
+                    BOOKMARKS.save({
                         "name": bookmark_name,
                         "category": category,
                         "commodity": commodity,
@@ -707,7 +593,7 @@ with tab1:
                         "to_unit": to_unit,
                         "value": input_value,
                         **additional_params
-                    })
+                    }, owner=st.session_state.bookmark_owner)
                     st.success("Bookmark saved!")
     
     # Display Results
@@ -722,7 +608,7 @@ with tab1:
             "result": result,
             **additional_params
         }
-        add_to_history(conversion_data)
+        add_to_history(conversion_data, explicit=not st.session_state.auto_calculate)
         
         # Main result display
         st.markdown(f"""
@@ -738,7 +624,8 @@ with tab1:
         col1, col2 = st.columns(2)
         with col1:
             # Gauge chart
-            gauge_fig = create_gauge_chart(input_value, result, from_unit, to_unit)
+            with timer.section("gauge chart"):
+                gauge_fig = create_gauge_chart(input_value, result, from_unit, to_unit)
             st.plotly_chart(gauge_fig, use_container_width=True)
         
         with col2:
@@ -755,6 +642,33 @@ with tab1:
             st.markdown(f"- 1 {from_unit} = {conversion_factor:.4f} {to_unit}")
             st.markdown(f"- 1 {to_unit} = {1/conversion_factor:.4f} {from_unit}")
     
+    # Quality Sensitivity
+    parameter = quality_parameter(category)
+    if parameter and input_value > 0 and from_unit != to_unit:
+        with st.expander("🎲 Quality Sensitivity (Monte Carlo)"):
+            reference = additional_params[parameter]
+            st.caption(f"Sample {parameter.replace('_', ' ')} around {reference} and convert every draw at once.")
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                distribution = st.selectbox("Distribution:", DISTRIBUTIONS, key="mc_distribution")
+            with col2:
+                spread = st.number_input("Spread (std dev / half-width):", value=round(0.02 * reference, 4),
+                                         min_value=0.0, format="%.4f", key=f"mc_spread_{parameter}")
+            with col3:
+                draws = st.select_slider("Draws:", [10_000, 100_000, 1_000_000], value=1_000_000, key="mc_draws")
+            
+            if st.button("🎲 Run Simulation"):
+                with timer.section("monte carlo"):
+                    simulation = monte_carlo(input_value, category, commodity, from_unit, to_unit,
+                                             center=reference, spread=spread, draws=draws, distribution=distribution)
+                for col, (percentile, value) in zip(st.columns(len(simulation["percentiles"])),
+                                                    simulation["percentiles"].items()):
+                    col.metric(f"P{percentile}", format_number(value))
+                st.caption(f"{draws:,} draws: mean {format_number(simulation['mean'])} {to_unit}, "
+                           f"std dev {format_number(simulation['std'])} {to_unit}")
+                st.plotly_chart(create_histogram_chart(simulation["histogram"], to_unit, simulation["percentiles"]),
+                                use_container_width=True)
+    
     # Cheat Sheet
     with st.expander("📋 Unit Conversion Cheat Sheet"):
         if category == "Oil & Liquids":
@@ -781,9 +695,22 @@ with tab1:
             - Soybeans: 1 bushel = 60 lbs = 27.2 kg
             - Moisture content affects weight conversions
             """)
+    
+    # Floating result (when applicable)
+    if show_result and result is not None:
+        st.markdown(f"""
+        <div class="sticky-result">
+            <strong>Quick Result:</strong><br>
+            {format_number(input_value)} {from_unit} = {format_number(result)} {to_unit}
+        </div>
+        """, unsafe_allow_html=True)
+
+with tab1:
+    unit_converter_tab()
 
 # Tab 2: Currency Conversion
-with tab2:
+@timed_fragment("Currency")
+def currency_tab():
     st.subheader("💱 Currency Conversion")
     
     currency_options = [f"{code} - {data['region']}" for code, data in CURRENCY_DATA.items()]
@@ -807,21 +734,148 @@ with tab2:
     
     if st.button("💱 Convert Currency", type="primary"):
         if rate_option == "Live Rate":
-            with st.spinner("Fetching live rates..."):
+            with st.spinner("Fetching live rates..."), timer.section("FX fetch"):
                 exchange_rate = get_exchange_rate(from_currency, to_currency)
             if exchange_rate:
                 converted_amount = amount * exchange_rate
                 st.success(f"**{amount:,.2f} {from_currency}** = **{converted_amount:,.2f} {to_currency}**")
                 st.info(f"Rate: 1 {from_currency} = {exchange_rate:.4f} {to_currency}")
+                cache_stats = get_rate_cache_stats()
+                if RATE_CACHE.source(MATRIX_BASE) == "snapshot":
+                    rates_as_of = datetime.fromtimestamp(RATE_CACHE.fetched_at(MATRIX_BASE)).strftime('%Y-%m-%d %H:%M')
+                    st.warning(f"Using offline snapshot rates from {rates_as_of}; live rates are fetched in the background.")
+                st.caption(f"{MATRIX_BASE} rates fetched {RATE_CACHE.age(MATRIX_BASE):.0f}s ago · "
+                           f"cache hits: {cache_stats['hits'] + cache_stats['stale_hits']}, misses: {cache_stats['misses']}")
+                with st.expander("📈 Cross-Rate Matrix"):
+                    st.dataframe(get_rate_matrix().to_frame().round(4), use_container_width=True)
             else:
                 st.error("Could not fetch live rates. Please use custom rate.")
         else:
             converted_amount = amount * custom_rate
             st.success(f"**{amount:,.2f} {from_currency}** = **{converted_amount:,.2f} {to_currency}**")
             st.info(f"Custom Rate: 1 {from_currency} = {custom_rate:.4f} {to_currency}")
+    
+    # Ledger conversion into a reporting currency
+    st.markdown("---")
+    st.subheader("📒 Ledger Conversion")
+    st.caption("Convert many (amount, currency) rows into one reporting currency at live rates, with per-currency subtotals.")
+    upload_types = ["csv", "parquet", "pq", "arrow", "feather"]
+    
+    # The row editor needs pandas, so it is only rendered on request
+    ledger_source = st.radio("Ledger source:", ["Upload file", "Enter rows"], horizontal=True, key="ledger_source")
+    ledger_df = None
+    if ledger_source == "Upload file":
+        ledger_file = st.file_uploader("Upload a ledger (`amount`, `currency` columns)",
+                                       type=upload_types, key="ledger_file")
+    else:
+        import pandas as pd
+        ledger_df = st.data_editor(
+            pd.DataFrame({"amount": [1000.0, 2500.0, 750.0], "currency": ["USD", "EUR", "GBP"]}),
+            num_rows="dynamic", use_container_width=True, key="ledger_rows")
+    reporting_currency = st.selectbox("Reporting currency:", currency_codes, key="ledger_currency")
+    
+    if (ledger_df is not None or ledger_file) and st.button("📒 Convert Ledger"):
+        if ledger_df is None:
+            from commo_core.batch import read_table
+            ledger_df = read_table(ledger_file, detect_file_format(ledger_file.name))
+        missing_columns = [c for c in ["amount", "currency"] if c not in ledger_df.columns]
+        ledger_matrix = None
+        if missing_columns:
+            st.error(f"Missing column(s): {', '.join(missing_columns)}")
+        else:
+            with st.spinner("Fetching live rates..."), timer.section("FX fetch"):
+                ledger_matrix = get_rate_matrix()
+            if ledger_matrix is None:
+                st.error("Could not fetch live rates.")
+        if ledger_matrix is not None:
+            import pandas as pd
+            with timer.section("ledger conversion"):
+                ledger_amounts = pd.to_numeric(ledger_df["amount"], errors="coerce").to_numpy(dtype=float)
+                converted, subtotals = ledger_matrix.ledger(ledger_amounts, ledger_df["currency"].to_numpy(),
+                                                            reporting_currency)
+            unconverted = int(pd.isna(converted).sum())
+            col1, col2, col3 = st.columns(3)
+            with col1:
+                st.metric(f"Total ({reporting_currency})", f"{subtotals['converted'].sum():,.2f}")
+            with col2:
+                st.metric("Rows converted", f"{len(ledger_df) - unconverted:,} of {len(ledger_df):,}")
+            with col3:
+                st.metric("Unconverted rows", f"{unconverted:,}")
+            # Rows the total leaves out: currencies without a rate, and amounts that are not numbers
+            excluded = subtotals[subtotals["rate"].isna()]
+            if len(excluded):
+                st.warning(f"{int(excluded['rows'].sum()):,} row(s) excluded from the total, no rate for: " + ", ".join(
+                    f"{row.currency or '(blank)'} ({row.rows:,} rows, {row.amount:,.2f})" for row in excluded.itertuples()))
+            blank_amounts = int(pd.isna(ledger_amounts).sum())
+            if blank_amounts:
+                st.warning(f"{blank_amounts:,} row(s) with a blank or non-numeric amount excluded from the total")
+            st.dataframe(subtotals, use_container_width=True)
+            st.download_button("📥 Download Converted Ledger",
+                               ledger_df.assign(**{f"amount_{reporting_currency}": converted}).to_csv(index=False),
+                               "ledger_converted.csv", "text/csv")
+    
+    # Dated conversions at historical rates
+    st.markdown("---")
+    st.subheader("📅 Dated Conversions")
+    st.caption("Convert dated amounts (e.g. invoices) at the rate in force on each date, from the local rate history.")
+    
+    with st.expander("🗄️ Rate History"):
+        if st.button("💾 Record Today's Live Rates"):
+            from commo_core.fx_history import RATE_HISTORY
+            rates = RATE_CACHE.get_rates(MATRIX_BASE)
+            if rates:
+                RATE_HISTORY.record(rates)
+                st.success(f"Recorded {len(rates)} {MATRIX_BASE} rates for today")
+            else:
+                st.error("Could not fetch live rates.")
+        history_file = st.file_uploader(f"Import history (`date`, `currency`, `rate` per {MATRIX_BASE} columns)",
+                                        type=upload_types, key="fx_history_file")
+        if history_file and st.button("📥 Import Rate History"):
+            from commo_core.batch import read_table
+            from commo_core.fx_history import RATE_HISTORY
+            RATE_HISTORY.import_long(read_table(history_file, detect_file_format(history_file.name)))
+            st.success(f"Rate history now covers {len(RATE_HISTORY.dates()):,} dates")
+    
+    dated_file = st.file_uploader("Upload dated amounts (`date`, `amount`, `currency` columns)",
+                                  type=upload_types, key="fx_dated_file")
+    col1, col2 = st.columns(2)
+    with col1:
+        dated_target = st.selectbox("Convert to:", currency_codes, key="fx_dated_target")
+    with col2:
+        max_rate_age = st.number_input("Max rate age in days (0 = no limit):", value=0, min_value=0, key="fx_max_age")
+    
+    if dated_file and st.button("📅 Convert at Historical Rates"):
+        from commo_core.batch import read_table
+        from commo_core.fx_history import RATE_HISTORY, convert_dated_frame
+        dated_df = read_table(dated_file, detect_file_format(dated_file.name))
+        missing_columns = [c for c in ["date", "amount", "currency"] if c not in dated_df.columns]
+        if missing_columns:
+            st.error(f"Missing column(s): {', '.join(missing_columns)}")
+        elif not RATE_HISTORY.exists():
+            st.error("No rate history yet. Record or import rates under Rate History first.")
+        else:
+            with timer.section("as-of conversion"):
+                converted_df = convert_dated_frame(dated_df, dated_target, tolerance_days=max_rate_age or None)
+            unmatched = converted_df["rate"].isna()
+            if unmatched.any():
+                import pandas as pd
+                bad_dates = int((unmatched & pd.to_datetime(converted_df["date"], errors="coerce").isna()).sum())
+                st.warning(f"{int(unmatched.sum()):,} row(s) were not converted and are excluded from the total: "
+                           f"{bad_dates:,} with a blank or unparsable date, {int(unmatched.sum()) - bad_dates:,} "
+                           f"with no rate for their currency on or before their date" + (f" within {max_rate_age} days" if max_rate_age else ""))
+                with st.expander("Unconverted rows"):
+                    st.dataframe(converted_df[unmatched].head(1000), use_container_width=True)
+            st.metric(f"Total ({dated_target})", f"{converted_df['converted'].sum():,.2f}")
+            st.dataframe(converted_df.head(1000), use_container_width=True)
+            st.download_button("📥 Download Converted Amounts", converted_df.to_csv(index=False),
+                               "dated_conversions.csv", "text/csv")
+
+with tab2:
+    currency_tab()
 
 # Tab 3: Comparison Mode
-with tab3:
+@timed_fragment("Comparison")
+def comparison_tab():
     st.subheader("📊 Commodity Comparison")
     
     st.markdown("Compare multiple commodities side by side:")
@@ -857,34 +911,51 @@ with tab3:
             })
     
     if st.button("📊 Compare All", type="primary"):
-        results = []
-        for comp in comparisons:
-            # Perform conversion based on category
-            if comp["category"] == "Oil & Liquids":
-                result = convert_oil_units(comp["input_value"], comp["from_unit"], comp["to_unit"],
-                                         density=COMMODITY_DATA[comp["category"]][comp["commodity"]]["density"])
-            elif comp["category"] == "Natural Gas":
-                result = convert_gas_units(comp["input_value"], comp["from_unit"], comp["to_unit"],
-                                         calorific_value=COMMODITY_DATA[comp["category"]][comp["commodity"]]["calorific_value"])
-            elif comp["category"] == "Agricultural":
-                result = convert_agricultural_units(comp["input_value"], comp["from_unit"], comp["to_unit"], comp["commodity"],
-                                                  moisture_content=COMMODITY_DATA[comp["category"]][comp["commodity"]]["moisture_content"])
-            else:
-                result = comp["input_value"]  # Simplified for other categories
-            
-            results.append({**comp, "result": result})
+        import pandas as pd
+        values = [comp["input_value"] for comp in comparisons]
+        commodities = [comp["commodity"] for comp in comparisons]
+        from_units = [comp["from_unit"] for comp in comparisons]
+        to_units = [comp["to_unit"] for comp in comparisons]
+        
+        # One energy-equivalence product covers every pair; its diagonal is each row's own conversion
+        with timer.section("energy equivalence"):
+            matrix = equivalence_matrix(values, commodities, from_units, commodities, to_units)
+        results = [{**comp, "result": float(matrix[i, i])} for i, comp in enumerate(comparisons)]
         
         # Display comparison table
         df = pd.DataFrame(results)
-        st.dataframe(df[["commodity", "input_value", "from_unit", "result", "to_unit"]], use_container_width=True)
+        for basis in ENERGY_BASES:
+            df[basis] = to_energy(values, commodities, from_units, basis)
+        st.dataframe(df[["commodity", "input_value", "from_unit", "result", "to_unit", *ENERGY_BASES]],
+                     use_container_width=True)
+        
+        # Energy equivalence matrix
+        row_labels = [f"{i+1}. {format_number(v)} {u} {c}" for i, (v, u, c) in enumerate(zip(values, from_units, commodities))]
+        st.markdown("**⚡ Energy Equivalence** (each row expressed in every compared commodity)")
+        st.dataframe(pd.DataFrame(matrix, index=row_labels,
+                                  columns=[f"{i+1}. {c} ({u})" for i, (c, u) in enumerate(zip(commodities, to_units))]),
+                     use_container_width=True)
+        
+        with st.expander("🌐 Equivalent in every commodity"):
+            targets = [(commodity, properties["units"][0]) for items in COMMODITY_DATA.values()
+                       for commodity, properties in items.items()]
+            full_matrix = equivalence_matrix(values, commodities, from_units,
+                                             [c for c, _ in targets], [u for _, u in targets])
+            st.dataframe(pd.DataFrame(full_matrix.T, index=[f"{c} ({u})" for c, u in targets], columns=row_labels),
+                         use_container_width=True)
         
         # Comparison chart
-        fig = create_comparison_chart(results)
+        with timer.section("comparison chart"):
+            fig = create_comparison_chart(results)
         if fig:
             st.plotly_chart(fig, use_container_width=True)
 
+with tab3:
+    comparison_tab()
+
 # Tab 4: Batch Conversion
-with tab4:
+@timed_fragment("Batch Convert")
+def batch_tab():
     st.subheader("📋 Batch Conversion")
     
     st.markdown("Convert multiple values at once:")
@@ -904,67 +975,153 @@ with tab4:
         batch_to = st.selectbox("To Unit:", batch_units, key="batch_to")
     
     # Input methods
-    input_method = st.radio("Input Method:", ["Manual Entry", "Upload CSV"])
+    input_method = st.radio("Input Method:", ["Manual Entry", "Upload File", "Upload Multi-Commodity File"])
+    upload_types = ["csv", "parquet", "pq", "arrow", "feather"]
     
+    stream_upload = False
+    mixed_df = None
     if input_method == "Manual Entry":
         values_input = st.text_area("Enter values (one per line):", 
                                    value="1000\n2000\n3000\n4000\n5000",
                                    height=100)
-        values = [float(v.strip()) for v in values_input.split('\n') if v.strip()]
+        # Parsed by to_value_array, which turns non-numeric lines into NaN (reported as skipped)
+        values = [v.strip() for v in values_input.split('\n') if v.strip()]
+    elif input_method == "Upload Multi-Commodity File":
+        st.caption("Each row needs `commodity`, `from_unit` and `to_unit` columns. Optional `density`, "
+                   "`calorific_value` and `moisture_content` columns override the defaults per row; "
+                   "the category and units selected above are ignored.")
+        values = []
+        mixed_file = st.file_uploader("Upload CSV, Parquet or Arrow file", type=upload_types, key="batch_mixed_file")
+        if mixed_file:
+            from commo_core.batch import read_table
+            mixed_df = read_table(mixed_file, detect_file_format(mixed_file.name))
+            missing_columns = [c for c in ["commodity", "from_unit", "to_unit"] if c not in mixed_df.columns]
+            if missing_columns:
+                st.error(f"Missing column(s): {', '.join(missing_columns)}")
+                mixed_df = None
+            else:
+                values_column = st.selectbox("Select values column:", mixed_df.columns, key="batch_mixed_col")
     else:
-        uploaded_file = st.file_uploader("Upload CSV file", type="csv")
+        uploaded_file = st.file_uploader("Upload CSV, Parquet or Arrow file", type=upload_types)
+        values = []
         if uploaded_file:
-            df = pd.read_csv(uploaded_file)
-            values_column = st.selectbox("Select values column:", df.columns)
-            values = df[values_column].tolist()
+            from commo_core.batch import read_column_names, read_value_column
+            upload_format = detect_file_format(uploaded_file.name)
+            # Only the header/schema is read here; the value column is read once it is chosen
+            values_column = st.selectbox("Select values column:", read_column_names(uploaded_file, upload_format))
+            if upload_format == "csv":
+                stream_upload = st.checkbox("Streaming mode (large files, bounded memory)", key="batch_stream")
+            if stream_upload:
+                batch_workers = st.number_input("Parallel workers (1 = single process):", min_value=1,
+                                                max_value=max(DEFAULT_WORKERS, 1), value=1, key="batch_workers")
+            else:
+                values = read_value_column(uploaded_file, values_column, upload_format)
+    
+    if not stream_upload:
+        output_format = st.selectbox("Output format:", list(OUTPUT_FORMATS), key="batch_output_format")
+    
+    convert_clicked = st.button("🔄 Convert Batch", type="primary")
+    
+    if convert_clicked and stream_upload:
+        import pandas as pd
+        from commo_core.batch import convert_csv_parallel, convert_csv_stream
+        # Results go to a file on disk, so the session never holds the whole output in memory
+        output_file = tempfile.NamedTemporaryFile(prefix="commo-batch-", suffix=".csv", delete=False)
+        try:
+            if batch_workers > 1:
+                with st.spinner(f"Converting in {batch_workers} worker processes..."):
+                    # Workers read byte ranges of a real file, so spill the upload to disk first
+                    upload_copy = tempfile.NamedTemporaryFile(prefix="commo-upload-", suffix=".csv", delete=False)
+                    try:
+                        with upload_copy:
+                            uploaded_file.seek(0)
+                            upload_copy.write(uploaded_file.getbuffer())
+                        _, summary = convert_csv_parallel(upload_copy.name, values_column, batch_category,
+                                                          batch_commodity, batch_from, batch_to,
+                                                          workers=batch_workers, output=output_file)
+                    finally:
+                        remove_result_file(upload_copy.name)
+                with st.expander(f"⏱️ Shard timings ({len(summary['shards'])} shards, {summary['seconds']:.2f}s total)"):
+                    st.dataframe(pd.DataFrame(summary["shards"])[["shard", "rows", "invalid", "seconds"]],
+                                 use_container_width=True)
+            else:
+                with st.spinner("Streaming conversion..."):
+                    _, summary = convert_csv_stream(uploaded_file, values_column, batch_category, batch_commodity,
+                                                    batch_from, batch_to, output=output_file)
+        except Exception:
+            remove_result_file(output_file.name)
+            raise
+        finally:
+            output_file.close()
+        if summary["invalid"]:
+            st.error(f"Skipped {summary['invalid']} non-numeric value(s)")
+        
+        if summary["rows"]:
+            st.caption(f"Preview of {summary['rows']:,} converted rows:")
+            st.dataframe(summary["preview"], use_container_width=True)
+            show_batch_metrics(summary)
+            serve_result_file(output_file, "batch_conversion_results.csv", "text/csv")
         else:
-            values = []
+            remove_result_file(output_file.name)
     
-    if st.button("🔄 Convert Batch", type="primary") and values:
-        batch_results = []
-        for value in values:
-            try:
-                if batch_category == "Oil & Liquids":
-                    result = convert_oil_units(value, batch_from, batch_to,
-                                             density=COMMODITY_DATA[batch_category][batch_commodity]["density"])
-                elif batch_category == "Natural Gas":
-                    result = convert_gas_units(value, batch_from, batch_to,
-                                             calorific_value=COMMODITY_DATA[batch_category][batch_commodity]["calorific_value"])
-                elif batch_category == "Agricultural":
-                    result = convert_agricultural_units(value, batch_from, batch_to, batch_commodity,
-                                                      moisture_content=COMMODITY_DATA[batch_category][batch_commodity]["moisture_content"])
-                else:
-                    result = value
-                
-                batch_results.append({
-                    "Input": value,
-                    "From Unit": batch_from,
-                    "Result": result,
-                    "To Unit": batch_to
-                })
-            except Exception as e:
-                st.error(f"Error converting {value}: {str(e)}")
+    elif convert_clicked and mixed_df is not None:
+        import numpy as np
+        import pandas as pd
+        from commo_core.batch import convert_mixed_batch, to_value_array, write_result_frame
+        inputs = to_value_array(mixed_df[values_column])
+        results = convert_mixed_batch(mixed_df, values_column)
+        
+        invalid = np.isnan(results)
+        if invalid.any():
+            st.error(f"Skipped {int(invalid.sum())} row(s) with a non-numeric value, unknown commodity or unsupported unit")
+        
+        if not invalid.all():
+            results_df = pd.DataFrame({
+                "Input": inputs,
+                "Commodity": mixed_df["commodity"],
+                "From Unit": mixed_df["from_unit"],
+                "Result": results,
+                "To Unit": mixed_df["to_unit"]
+            })[~invalid]
+            st.dataframe(results_df, use_container_width=True)
+            
+            # Subtotals per conversion group
+            st.markdown("**Subtotals:**")
+            subtotals = results_df.groupby(["Commodity", "From Unit", "To Unit"], sort=False)[["Input", "Result"]].sum()
+            st.dataframe(subtotals, use_container_width=True)
+            
+            output = OUTPUT_FORMATS[output_format]
+            st.download_button("📥 Download Results", write_result_frame(results_df, output["format"]),
+                               f"batch_conversion_results{output['extension']}", output["mime"])
+    
+    elif convert_clicked and len(values):
+        from commo_core.batch import BatchResult, convert_batch, to_value_array, write_result_frame
+        inputs = to_value_array(values)
+        batch = BatchResult(inputs, convert_batch(inputs, batch_category, batch_commodity, batch_from, batch_to),
+                            batch_from, batch_to)
+        
+        if batch.invalid:
+            st.error(f"Skipped {batch.invalid} non-numeric value(s)")
         
         # Display results
-        if batch_results:
-            results_df = pd.DataFrame(batch_results)
+        if len(batch):
+            results_df = batch.frame()
             st.dataframe(results_df, use_container_width=True)
             
             # Summary statistics
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Total Input", f"{sum(r['Input'] for r in batch_results):,.2f}")
-            with col2:
-                st.metric("Total Output", f"{sum(r['Result'] for r in batch_results):,.2f}")
-            with col3:
-                st.metric("Average Ratio", f"{(sum(r['Result'] for r in batch_results) / sum(r['Input'] for r in batch_results)):.4f}")
+            show_batch_metrics(batch.summary())
             
             # Download results
-            csv = results_df.to_csv(index=False)
-            st.download_button("📥 Download Results", csv, "batch_conversion_results.csv", "text/csv")
+            output = OUTPUT_FORMATS[output_format]
+            st.download_button("📥 Download Results", write_result_frame(results_df, output["format"]),
+                               f"batch_conversion_results{output['extension']}", output["mime"])
+
+with tab4:
+    batch_tab()
 
 # Tab 5: Glossary
-with tab5:
+@timed_fragment("Glossary")
+def glossary_tab():
     st.subheader("📖 Glossary & Reference")
     
     glossary_categories = {
@@ -1053,6 +1210,9 @@ with tab5:
         - 1 cubic foot = 28.32 liters
         """)
 
+with tab5:
+    glossary_tab()
+
 # Footer
 st.markdown("---")
 st.markdown("""
@@ -1088,11 +1248,20 @@ st.sidebar.markdown("""
 st.sidebar.markdown("---")
 st.sidebar.info("💡 **Tip**: Enable auto-calculation for real-time conversions as you type!")
 
-# Floating result (when applicable)
-if 'result' in locals() and result is not None:
-    st.markdown(f"""
-    <div class="sticky-result">
-        <strong>Quick Result:</strong><br>
-        {format_number(input_value)} {from_unit} = {format_number(result)} {to_unit}
-    </div>
-    """, unsafe_allow_html=True)
+# Rerun timing panel (rendered last so every section above has finished)
+if timer.enabled:
+    breakdown = timer.breakdown()
+    record = timer.finish(session=st.session_state.session_id)
+    with st.sidebar:
+        st.markdown("---")
+        st.subheader("🐞 Rerun Timings")
+        st.metric("Total rerun", f"{record['total_ms']:.1f} ms")
+        if breakdown:
+            import pandas as pd
+            st.dataframe(pd.DataFrame({
+                "Section": ["\u2003" * s["depth"] + s["section"].split(" / ")[-1] for s in breakdown],
+                "ms": [round(s["ms"], 2) for s in breakdown],
+                "% of rerun": [round(s["share"] * 100, 1) for s in breakdown]
+            }), hide_index=True, use_container_width=True)
+        st.caption(f"Logged to {TIMING_LOG_PATH}")
+    log_timings(record)
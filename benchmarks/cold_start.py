@@ -0,0 +1,93 @@
+"""Cold-start import cost of the Streamlit apps
+
+Runs each app once in a fresh interpreter (Streamlit bare mode) under
+``python -X importtime`` and reports the cumulative import cost of every
+top-level module it loaded, most expensive first.
+
+    python benchmarks/cold_start.py
+    python benchmarks/cold_start.py CONVERSION_APP_ENHANCED.py --top 15 --output cold_start.json
+    python benchmarks/cold_start.py --budget-ms 800
+
+With --budget-ms, the exit status is 1 when any app's total import time
+exceeds the budget.
+"""
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_APPS = ["CONVERSION_APP.py", "CONVERSION_APP_ENHANCED.py"]
+# Heavy optional dependencies the apps should only load on first use
+WATCHED_MODULES = ["pandas", "numpy", "plotly", "requests", "pyarrow"]
+
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+def parse_importtime(stderr):
+    """Top-level modules and their cumulative import time in ms, from -X importtime output"""
+    modules = {}
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        # Nested imports are indented by two spaces per level below the one that triggered them
+        if match and len(match.group(3)) == 1:
+            name = match.group(4)
+            modules[name] = modules.get(name, 0.0) + int(match.group(2)) / 1e3
+    return modules
+
+def measure_app(path):
+    """Run one app in a fresh interpreter and collect its import costs"""
+    env = {**os.environ, "PYTHONPATH": ROOT + os.pathsep + os.environ.get("PYTHONPATH", "")}
+    started = time.perf_counter()
+    completed = subprocess.run([sys.executable, "-X", "importtime", path], cwd=ROOT, env=env,
+                               capture_output=True, text=True)
+    wall_ms = (time.perf_counter() - started) * 1e3
+    if completed.returncode != 0:
+        raise RuntimeError(f"{path} exited with status {completed.returncode}:\n{completed.stderr[-2000:]}")
+    modules = parse_importtime(completed.stderr)
+    # Heavy modules may also arrive nested under another import, so check every line
+    imported = {match.group(4).split(".")[0] for match in map(_IMPORTTIME_LINE.match, completed.stderr.splitlines())
+                if match}
+    return {
+        "app": path,
+        "wall_ms": wall_ms,
+        "import_ms": sum(modules.values()),
+        "modules": dict(sorted(modules.items(), key=lambda item: item[1], reverse=True)),
+        "loaded": [name for name in WATCHED_MODULES if name in imported]
+    }
+
+def print_report(report, top):
+    print(f"{report['app']}: {report['import_ms']:.1f} ms importing, {report['wall_ms']:.1f} ms wall clock")
+    for name, ms in list(report["modules"].items())[:top]:
+        print(f"  {name:<40} {ms:>10.1f} ms {ms / report['import_ms']:>7.1%}")
+    print(f"  heavy modules loaded at startup: {', '.join(report['loaded']) or 'none'}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("apps", nargs="*", default=DEFAULT_APPS, help="app scripts relative to the repository root")
+    parser.add_argument("--top", type=int, default=10, help="modules to list per app")
+    parser.add_argument("--budget-ms", type=float, help="maximum total import time per app")
+    parser.add_argument("--output", help="write the reports as JSON to this path")
+    args = parser.parse_args(argv)
+
+    reports = []
+    for app in args.apps:
+        reports.append(measure_app(app))
+        print_report(reports[-1], args.top)
+
+    status = 0
+    if args.budget_ms is not None:
+        over = [r for r in reports if r["import_ms"] > args.budget_ms]
+        for report in over:
+            print(f"OVER BUDGET {report['app']}: {report['import_ms']:.1f} ms > {args.budget_ms:.1f} ms")
+        status = 1 if over else 0
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(reports, f, indent=2)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+"""Load test for the HTTP conversion API
+
+Starts `python -m commo_core.api` on a free port (or targets --host/--port), drives it
+with concurrent keep-alive clients and reports p50/p99 latency and requests/sec,
+plus how many requests the server's micro-batcher folded into each batch.
+
+    python benchmarks/load_test.py --requests 20000 --concurrency 64
+    python benchmarks/load_test.py --endpoint currency --batch-window-ms 1
+    python benchmarks/load_test.py --port 8080 --output load.json
+"""
+import argparse
+import asyncio
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import numpy as np
+
+from run_benchmarks import CASES, _RateHandler
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CURRENCY_PAIRS = [("USD", "EUR"), ("EUR", "GBP"), ("GBP", "JPY"), ("CNY", "USD"), ("CAD", "AUD")]
+
+def build_payloads(endpoint):
+    """A small rotation of request bodies for the chosen endpoint"""
+    unit_payloads = [{"commodity": commodity, "from_unit": from_unit, "to_unit": to_unit, "value": 1000 + i}
+                     for i, (commodity, from_unit, to_unit) in enumerate(CASES.values())]
+    currency_payloads = [{"from_currency": a, "to_currency": b, "amount": 250 + i}
+                         for i, (a, b) in enumerate(CURRENCY_PAIRS)]
+    if endpoint == "convert":
+        return [("/convert", p) for p in unit_payloads]
+    if endpoint == "currency":
+        return [("/currency", p) for p in currency_payloads]
+    return [("/convert", p) for p in unit_payloads] + [("/currency", p) for p in currency_payloads]
+
+def encode_request(host, path, payload):
+    body = json.dumps(payload).encode("utf-8")
+    return (f"POST {path} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n\r\n").encode("latin-1") + body
+
+async def read_response(reader):
+    """Return (status, body) for one HTTP response"""
+    status = int((await reader.readline()).split()[1])
+    length = 0
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        if name.strip().lower() == "content-length":
+            length = int(value)
+    return status, await reader.readexactly(length)
+
+async def client(host, port, requests, counter, total, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while counter[0] < total:
+            position = counter[0]
+            counter[0] += 1
+            request = requests[position % len(requests)]
+            started = time.perf_counter()
+            writer.write(request)
+            status, _ = await read_response(reader)
+            latencies.append(time.perf_counter() - started)
+            if status != 200:
+                errors.append(status)
+    finally:
+        writer.close()
+
+async def fetch_health(host, port):
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(f"GET /health HTTP/1.1\r\nHost: {host}\r\nConnection: close\r\n\r\n".encode("latin-1"))
+    _, body = await read_response(reader)
+    writer.close()
+    return json.loads(body)
+
+async def run_load(host, port, endpoint, total, concurrency, warmup):
+    requests = [encode_request(host, path, payload) for path, payload in build_payloads(endpoint)]
+    # Warm-up requests fill the FX cache and the unit graph before timing starts
+    await asyncio.gather(*(client(host, port, requests, [0], len(requests), [], []) for _ in range(warmup)))
+
+    counter, latencies, errors = [0], [], []
+    started = time.perf_counter()
+    await asyncio.gather(*(client(host, port, requests, counter, total, latencies, errors)
+                           for _ in range(concurrency)))
+    seconds = time.perf_counter() - started
+    return latencies, errors, seconds, await fetch_health(host, port)
+
+def start_api_server(batch_window_ms, fx_url=None):
+    """Launch the API in a subprocess on a free port and return (process, port)"""
+    env = {**os.environ, "PYTHONPATH": ROOT + os.pathsep + os.environ.get("PYTHONPATH", ""),
+           "PYTHONUNBUFFERED": "1"}
+    if fx_url:
+        # Stand-in rates must not end up in the offline snapshot used by the app
+        env["COMMO_FX_URL"] = fx_url
+        env["COMMO_FX_SNAPSHOT"] = ""
+    process = subprocess.Popen([sys.executable, "-m", "commo_core.api", "--port", "0",
+                                "--batch-window-ms", str(batch_window_ms)],
+                               cwd=ROOT, env=env, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+    if not line:
+        process.kill()
+        raise RuntimeError("API server failed to start")
+    return process, int(line.rsplit(":", 1)[1])
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, help="target a running server instead of starting one")
+    parser.add_argument("--endpoint", choices=["convert", "currency", "mixed"], default="convert")
+    parser.add_argument("--requests", type=int, default=10_000, help="total timed requests")
+    parser.add_argument("--concurrency", type=int, default=64, help="concurrent keep-alive connections")
+    parser.add_argument("--batch-window-ms", type=float, default=2.0, help="batch window of the started server")
+    parser.add_argument("--output", help="write the report as JSON to this path")
+    args = parser.parse_args(argv)
+
+    process = fx_server = None
+    port = args.port
+    if port is None:
+        fx_url = None
+        if args.endpoint != "convert":
+            # Serve rates locally so the test measures the API, not the upstream FX provider
+            fx_server = ThreadingHTTPServer(("127.0.0.1", 0), _RateHandler)
+            threading.Thread(target=fx_server.serve_forever, daemon=True).start()
+            fx_url = f"http://127.0.0.1:{fx_server.server_port}/latest/{{base}}"
+        process, port = start_api_server(args.batch_window_ms, fx_url)
+
+    try:
+        latencies, errors, seconds, health = asyncio.run(
+            run_load(args.host, port, args.endpoint, args.requests, args.concurrency, warmup=2))
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+        if fx_server is not None:
+            fx_server.shutdown()
+
+    latency_ms = np.array(latencies) * 1e3
+    report = {
+        "endpoint": args.endpoint,
+        "requests": len(latencies),
+        "errors": len(errors),
+        "concurrency": args.concurrency,
+        "seconds": seconds,
+        "requests_per_sec": len(latencies) / seconds,
+        "p50_ms": float(np.percentile(latency_ms, 50)),
+        "p90_ms": float(np.percentile(latency_ms, 90)),
+        "p99_ms": float(np.percentile(latency_ms, 99)),
+        "max_ms": float(latency_ms.max()),
+        "server": {"unit_batches": health["unit_batches"], "currency_batches": health["currency_batches"]}
+    }
+    print(f"{report['requests']:,} requests ({report['errors']} errors) at concurrency {args.concurrency} "
+          f"in {seconds:.2f}s: {report['requests_per_sec']:,.0f} req/s")
+    print(f"latency p50 {report['p50_ms']:.2f} ms, p90 {report['p90_ms']:.2f} ms, "
+          f"p99 {report['p99_ms']:.2f} ms, max {report['max_ms']:.2f} ms")
+    for name, stats in report["server"].items():
+        if stats["batches"]:
+            print(f"{name}: {stats['items']:,} requests in {stats['batches']:,} batches "
+                  f"(mean {stats['mean_batch']:.1f} per batch)")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if errors else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
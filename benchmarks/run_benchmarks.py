@@ -0,0 +1,250 @@
+"""Benchmarks for the conversion hot paths
+
+Covers scalar conversions, vectorized batch conversion and its summary
+statistics, multi-currency ledgers, format_number, the comparison chart builder, get_exchange_rate (cold, cached and from the offline
+snapshot) and concurrent multi-base rate fetches against a local stand-in FX
+server, on synthetic datasets of 1 to 10^7 rows per category.
+
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --save-baseline benchmarks/baseline.json
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json --tolerance 0.2
+
+With --baseline, the exit status is 1 when any case's throughput falls more than
+--tolerance below the stored baseline.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+
+from commo_core import COMMODITY_DATA, CURRENCY_DATA, convert_units, format_number
+from commo_core import fx
+from commo_core.batch import BatchResult, convert_batch, convert_mixed_batch
+from commo_core.fx_snapshot import RateSnapshot
+
+DEFAULT_SIZES = [10 ** exponent for exponent in range(8)]
+# One representative commodity and unit pair per category
+CASES = {
+    "Oil & Liquids": ("Brent Crude", "barrels", "metric tons"),
+    "Natural Gas": ("Natural Gas", "mcf", "mmbtu"),
+    "Agricultural": ("Wheat", "bushels", "metric tons"),
+    "Power/Electricity": ("Electricity", "mwh", "mmbtu"),
+    "Coal": ("Thermal Coal", "metric tons", "short tons")
+}
+
+def synthetic_values(rows, seed=0):
+    """Positive volumes spread over several orders of magnitude"""
+    rng = np.random.default_rng(seed)
+    return rng.lognormal(mean=7, sigma=2, size=rows)
+
+def time_call(func, repeat):
+    """Best wall-clock time of func() over repeat runs"""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+def record(results, name, rows, seconds):
+    results.append({
+        "name": name,
+        "rows": rows,
+        "seconds": seconds,
+        "rows_per_sec": rows / seconds if seconds > 0 else float("inf")
+    })
+    print(f"{name:<40} {rows:>10,} rows {seconds * 1e3:>12.3f} ms {results[-1]['rows_per_sec']:>16,.0f} rows/s")
+
+def bench_conversions(results, sizes, scalar_max_rows, repeat):
+    for category, (commodity, from_unit, to_unit) in CASES.items():
+        for rows in sizes:
+            values = synthetic_values(rows)
+            record(results, f"batch/{category}", rows, time_call(
+                lambda: convert_batch(values, category, commodity, from_unit, to_unit), repeat))
+            if rows <= scalar_max_rows:
+                value_list = values.tolist()
+                record(results, f"scalar/{category}", rows, time_call(
+                    lambda: [convert_units(v, category, commodity, from_unit, to_unit) for v in value_list], repeat))
+
+def bench_batch_summary(results, sizes, repeat):
+    commodity, from_unit, to_unit = CASES["Oil & Liquids"]
+    for rows in sizes:
+        inputs = synthetic_values(rows)
+        batch = BatchResult(inputs, convert_batch(inputs, "Oil & Liquids", commodity, from_unit, to_unit),
+                            from_unit, to_unit)
+        record(results, "BatchResult.summary", rows, time_call(batch.summary, repeat))
+
+def bench_mixed_batch(results, sizes, repeat):
+    import pandas as pd
+    specs = list(CASES.values())
+    for rows in sizes:
+        picks = np.random.default_rng(1).integers(0, len(specs), rows)
+        frame = pd.DataFrame({
+            "value": synthetic_values(rows),
+            "commodity": [specs[i][0] for i in picks],
+            "from_unit": [specs[i][1] for i in picks],
+            "to_unit": [specs[i][2] for i in picks]
+        })
+        record(results, "batch/mixed", rows, time_call(lambda: convert_mixed_batch(frame), repeat))
+
+def bench_ledger(results, sizes, repeat):
+    matrix = fx.RateMatrix({code: 1.0 + i / 10 for i, code in enumerate(CURRENCY_DATA)})
+    codes = np.array(list(CURRENCY_DATA), dtype=object)
+    for rows in sizes:
+        currencies = codes[np.random.default_rng(2).integers(0, len(codes), rows)]
+        amounts = synthetic_values(rows)
+        record(results, "RateMatrix.ledger", rows, time_call(lambda: matrix.ledger(amounts, currencies, "EUR"), repeat))
+
+def bench_format_number(results, sizes, scalar_max_rows, repeat):
+    for rows in sizes:
+        if rows > scalar_max_rows:
+            continue
+        value_list = synthetic_values(rows).tolist()
+        record(results, "format_number", rows, time_call(lambda: [format_number(v) for v in value_list], repeat))
+
+def bench_comparison_chart(results, chart_sizes, repeat):
+    from commo_core.charts import create_comparison_chart
+    commodities = [(category, name) for category, items in COMMODITY_DATA.items() for name in items]
+    for count in chart_sizes:
+        conversions = []
+        for i in range(count):
+            category, commodity = commodities[i % len(commodities)]
+            units = COMMODITY_DATA[category][commodity]["units"]
+            conversions.append({"commodity": commodity, "input_value": 1000.0, "from_unit": units[0],
+                                "to_unit": units[-1], "result": 1234.5})
+        record(results, "create_comparison_chart", count, time_call(lambda: create_comparison_chart(conversions), repeat))
+
+class _RateHandler(BaseHTTPRequestHandler):
+    """Local stand-in for the exchange-rate API"""
+    latency = 0.0
+
+    def do_GET(self):
+        time.sleep(self.latency)
+        rates = {code: 1.0 + i / 10 for i, code in enumerate(CURRENCY_DATA)}
+        body = json.dumps({"base": self.path.rsplit("/", 1)[-1], "rates": rates}).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+def bench_exchange_rate(results, repeat, latency):
+    _RateHandler.latency = latency
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _RateHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    previous_url, previous_snapshot = fx.RATES_URL, fx.RATE_CACHE.snapshot
+    fx.RATES_URL = f"http://127.0.0.1:{server.server_port}/latest/{{base}}"
+    # Cold cases measure the network path; stand-in rates must not reach the real snapshot
+    fx.RATE_CACHE.snapshot = None
+    snapshot_dir = tempfile.TemporaryDirectory()
+    try:
+        def cold():
+            fx.RATE_CACHE.clear()
+            fx.get_exchange_rate("EUR", "GBP")
+        record(results, "get_exchange_rate/cold", 1, time_call(cold, repeat))
+
+        bases = list(CURRENCY_DATA)
+        def cold_many():
+            fx.RATE_CACHE.clear()
+            fx.get_rate_tables(bases)
+        record(results, "get_rate_tables/cold", len(bases), time_call(cold_many, repeat))
+
+        fx.RATE_CACHE.snapshot = RateSnapshot(os.path.join(snapshot_dir.name, "fx_snapshot.bin"))
+        fx.RATE_CACHE.clear()
+        fx.get_exchange_rate("EUR", "GBP")
+        def from_snapshot():
+            fx.RATE_CACHE.clear()
+            fx.get_exchange_rate("EUR", "GBP")
+        record(results, "get_exchange_rate/snapshot", 1, time_call(from_snapshot, repeat))
+        fx.RATE_CACHE.snapshot = None
+
+        lookups = 10_000
+        fx.get_exchange_rate("EUR", "GBP")
+        record(results, "get_exchange_rate/cached", lookups, time_call(
+            lambda: [fx.get_exchange_rate("EUR", "GBP") for _ in range(lookups)], repeat))
+    finally:
+        fx.RATES_URL, fx.RATE_CACHE.snapshot = previous_url, previous_snapshot
+        fx.RATE_CACHE.clear()
+        snapshot_dir.cleanup()
+        server.shutdown()
+
+def compare_with_baseline(results, baseline, tolerance):
+    """Return the cases whose throughput dropped more than tolerance below the baseline"""
+    previous = {(case["name"], case["rows"]): case for case in baseline["results"]}
+    regressions = []
+    for case in results:
+        reference = previous.get((case["name"], case["rows"]))
+        if reference is None:
+            continue
+        ratio = case["rows_per_sec"] / reference["rows_per_sec"]
+        if ratio < 1 - tolerance:
+            regressions.append({**case, "baseline_rows_per_sec": reference["rows_per_sec"], "ratio": ratio})
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES, help="dataset sizes in rows")
+    parser.add_argument("--scalar-max-rows", type=int, default=100_000,
+                        help="largest dataset for per-row Python loops (scalar conversions, format_number)")
+    parser.add_argument("--chart-sizes", type=int, nargs="+", default=[1, 10, 100],
+                        help="number of conversions per comparison chart")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per case; the best time is kept")
+    parser.add_argument("--fx-latency", type=float, default=0.0, help="simulated FX server latency in seconds")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="compare against a stored baseline JSON")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed throughput drop versus the baseline")
+    parser.add_argument("--save-baseline", help="write these results as the new baseline")
+    args = parser.parse_args(argv)
+
+    results = []
+    bench_conversions(results, args.sizes, args.scalar_max_rows, args.repeat)
+    bench_batch_summary(results, args.sizes, args.repeat)
+    bench_mixed_batch(results, args.sizes, args.repeat)
+    bench_ledger(results, args.sizes, args.repeat)
+    bench_format_number(results, args.sizes, args.scalar_max_rows, args.repeat)
+    bench_comparison_chart(results, args.chart_sizes, args.repeat)
+    bench_exchange_rate(results, args.repeat, args.fx_latency)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count()
+        },
+        "results": results
+    }
+
+    status = 0
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare_with_baseline(results, json.load(f), args.tolerance)
+        report["regressions"] = regressions
+        for case in regressions:
+            print(f"REGRESSION {case['name']} ({case['rows']:,} rows): {case['rows_per_sec']:,.0f} rows/s "
+                  f"vs baseline {case['baseline_rows_per_sec']:,.0f} ({case['ratio']:.0%})")
+        print(f"{len(regressions)} regression(s) beyond {args.tolerance:.0%} tolerance")
+        status = 1 if regressions else 0
+
+    for path in [args.output, args.save_baseline]:
+        if path:
+            with open(path, "w") as f:
+                json.dump(report, f, indent=2)
+    return status
+
+if __name__ == "__main__":
+    sys.exit(main())
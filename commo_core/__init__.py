@@ -0,0 +1,23 @@
+"""Headless conversion core shared by the Streamlit apps and batch jobs
+
+Importing the package only loads the pure-Python reference data and unit
+conversions. Vectorized conversion lives in ``commo_core.batch`` (NumPy and
+pandas) and live exchange rates in ``commo_core.fx`` (requests, imported on
+first fetch).
+"""
+from .data import COMMODITY_DATA, CURRENCY_DATA, ENERGY_CONTENT, UNIT_CONVERSIONS
+from .energy import ENERGY_BASES, ENERGY_TABLE, energy_per_unit, equivalence_matrix, to_energy
+from .formatting import format_number
+from .units import (
+    UNIT_FACTOR_INDEX,
+    calculate_api_from_density,
+    calculate_density_from_api,
+    compile_unit_graph,
+    convert_agricultural_units,
+    convert_coal_units,
+    convert_gas_units,
+    convert_oil_units,
+    convert_power_units,
+    convert_units,
+    get_conversion_factor
+)
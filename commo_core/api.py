@@ -0,0 +1,304 @@
+"""Local HTTP conversion API with request micro-batching
+
+    python -m commo_core.api --port 8080
+
+Endpoints (JSON in, JSON out):
+
+    POST /convert   {"commodity": "Brent Crude", "from_unit": "barrels", "to_unit": "metric tons",
+                     "value": 1000, "density": 0.84}
+    POST /currency  {"from_currency": "USD", "to_currency": "EUR", "amount": 250}
+    GET  /health
+
+Quality parameters (density, calorific_value, moisture_content) are optional and
+default to the commodity's reference values. Requests arriving within the batch
+window of each other are resolved together: unit conversions in one vectorized
+call per conversion group, currency conversions in one cross-rate matrix lookup.
+"""
+import argparse
+import asyncio
+import json
+import math
+import os
+
+import numpy as np
+
+from . import fx
+from .batch import COMMODITY_CATEGORIES, QUALITY_COLUMNS, convert_batch
+from .data import COMMODITY_DATA, CURRENCY_DATA
+
+DEFAULT_HOST = os.environ.get("COMMO_API_HOST", "127.0.0.1")
+DEFAULT_PORT = int(os.environ.get("COMMO_API_PORT", 8080))
+BATCH_WINDOW = float(os.environ.get("COMMO_API_BATCH_WINDOW_MS", 2)) / 1e3
+MAX_BATCH = int(os.environ.get("COMMO_API_MAX_BATCH", 4096))
+MAX_BODY = 1024 * 1024
+
+REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error", 503: "Service Unavailable"}
+
+class RequestError(ValueError):
+    """A malformed or unsupported request (answered with 400)"""
+
+class UnavailableError(RuntimeError):
+    """A conversion that cannot be served right now (answered with 503)"""
+
+# Micro-Batching
+class MicroBatcher:
+    """Collect items submitted within `window` seconds and resolve them with one `process` call
+
+    `process` takes the list of items and returns one result per item, in order; an
+    Exception in place of a result fails only that item. It may be a coroutine function.
+    A batch is flushed early once it reaches `max_batch` items.
+    """
+
+    def __init__(self, process, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.process = process
+        self.window = window
+        self.max_batch = max_batch
+        self.batches = 0
+        self.items = 0
+        self._pending = []
+        self._timer = None
+        # The event loop only keeps weak references to tasks
+        self._tasks = set()
+
+    async def submit(self, item):
+        future = asyncio.get_running_loop().create_future()
+        self._pending.append((item, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush()
+        elif self._timer is None:
+            self._timer = asyncio.get_running_loop().call_later(self.window, self._flush)
+        return await future
+
+    def _flush(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.ensure_future(self._run(batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, batch):
+        self.batches += 1
+        self.items += len(batch)
+        try:
+            results = self.process([item for item, _ in batch])
+            if asyncio.iscoroutine(results):
+                results = await results
+        except Exception as error:
+            results = [error] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def stats(self):
+        return {"batches": self.batches, "items": self.items,
+                "mean_batch": self.items / self.batches if self.batches else 0.0}
+
+# Request Parsing
+def _number(payload, key, required=True):
+    value = payload.get(key)
+    if value is None and not required:
+        return None
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise RequestError(f"'{key}' must be a number")
+    try:
+        value = float(value)
+    except OverflowError:
+        raise RequestError(f"'{key}' is too large") from None
+    # json.loads accepts NaN and Infinity, which would only come back as invalid JSON
+    if not math.isfinite(value):
+        raise RequestError(f"'{key}' must be a finite number")
+    return value
+
+def parse_unit_request(payload):
+    """Validate a /convert body and return the normalized conversion item"""
+    commodity = payload.get("commodity")
+    if commodity not in COMMODITY_CATEGORIES:
+        raise RequestError(f"Unknown commodity: {commodity!r}")
+    category = COMMODITY_CATEGORIES[commodity]
+    units = COMMODITY_DATA[category][commodity]["units"]
+    for key in ["from_unit", "to_unit"]:
+        if payload.get(key) not in units:
+            raise RequestError(f"'{key}' must be one of: {', '.join(units)}")
+    item = {"category": category, "commodity": commodity, "from_unit": payload["from_unit"],
+            "to_unit": payload["to_unit"], "value": _number(payload, "value")}
+    for column in QUALITY_COLUMNS:
+        item[column] = _number(payload, column, required=False)
+    # Out-of-range quality parameters would make a unit graph edge zero or infinite
+    for column in ["density", "calorific_value"]:
+        if item[column] is not None and item[column] <= 0:
+            raise RequestError(f"'{column}' must be positive")
+    if item["moisture_content"] is not None and not 0 <= item["moisture_content"] < 100:
+        raise RequestError("'moisture_content' must be a percentage below 100")
+    return item
+
+def parse_currency_request(payload):
+    """Validate a /currency body and return the normalized conversion item"""
+    for key in ["from_currency", "to_currency"]:
+        if payload.get(key) not in CURRENCY_DATA:
+            raise RequestError(f"'{key}' must be one of: {', '.join(CURRENCY_DATA)}")
+    return {"from_currency": payload["from_currency"], "to_currency": payload["to_currency"],
+            "amount": _number(payload, "amount")}
+
+# Batch Processors
+def convert_unit_items(items):
+    """Convert unit requests with one vectorized call per (commodity, units, quality) group"""
+    groups = {}
+    for position, item in enumerate(items):
+        key = (item["category"], item["commodity"], item["from_unit"], item["to_unit"],
+               *(item[column] for column in QUALITY_COLUMNS))
+        groups.setdefault(key, []).append(position)
+
+    results = [None] * len(items)
+    for (category, commodity, from_unit, to_unit, *quality), positions in groups.items():
+        values = np.array([items[position]["value"] for position in positions], dtype=float)
+        params = {column: q for column, q in zip(QUALITY_COLUMNS, quality) if q is not None}
+        converted = convert_batch(values, category, commodity, from_unit, to_unit, **params)
+        for position, result in zip(positions, converted.tolist()):
+            results[position] = result if math.isfinite(result) else RequestError("Result is out of range")
+    return results
+
+async def convert_currency_items(items):
+    """Convert currency requests with one lookup into the cross-rate matrix"""
+    # The first fetch blocks on the network, so keep it off the event loop
+    matrix = await asyncio.get_running_loop().run_in_executor(None, fx.get_rate_matrix)
+    if matrix is None:
+        return [UnavailableError("Exchange rates are unavailable")] * len(items)
+    converted = matrix.convert(np.array([item["amount"] for item in items], dtype=float),
+                               np.array([item["from_currency"] for item in items]),
+                               np.array([item["to_currency"] for item in items]))
+    return [UnavailableError(f"No rate for {item['from_currency']}/{item['to_currency']}") if np.isnan(result)
+            else RequestError("Result is out of range") if np.isinf(result)
+            else float(result) for item, result in zip(items, converted)]
+
+# HTTP Server
+class ConversionServer:
+    """Minimal HTTP/1.1 server (keep-alive, Content-Length bodies) over asyncio streams"""
+
+    def __init__(self, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+        self.unit_batcher = MicroBatcher(convert_unit_items, window, max_batch)
+        self.currency_batcher = MicroBatcher(convert_currency_items, window, max_batch)
+        self.routes = {
+            "/convert": ("POST", self.convert),
+            "/currency": ("POST", self.convert_currency),
+            "/health": ("GET", self.health)
+        }
+
+    async def convert(self, payload):
+        item = parse_unit_request(payload)
+        result = await self.unit_batcher.submit(item)
+        return {"commodity": item["commodity"], "value": item["value"], "from_unit": item["from_unit"],
+                "result": result, "to_unit": item["to_unit"]}
+
+    async def convert_currency(self, payload):
+        item = parse_currency_request(payload)
+        result = await self.currency_batcher.submit(item)
+        return {**item, "result": result}
+
+    async def health(self, payload):
+        return {"status": "ok", "unit_batches": self.unit_batcher.stats(),
+                "currency_batches": self.currency_batcher.stats(), "rate_cache": fx.get_rate_cache_stats()}
+
+    async def dispatch(self, method, path, body):
+        """Route one request and return (status, JSON-serialisable payload)"""
+        route = self.routes.get(path.split("?", 1)[0])
+        if route is None:
+            return 404, {"error": f"No such endpoint: {path}"}
+        if method != route[0]:
+            return 405, {"error": f"{path} only accepts {route[0]}"}
+        try:
+            payload = json.loads(body) if body else {}
+            if not isinstance(payload, dict):
+                raise RequestError("Request body must be a JSON object")
+            return 200, await route[1](payload)
+        except json.JSONDecodeError as error:
+            return 400, {"error": f"Invalid JSON: {error}"}
+        except RequestError as error:
+            return 400, {"error": str(error)}
+        except UnavailableError as error:
+            return 503, {"error": str(error)}
+        except Exception as error:
+            # Anything else is a bug; answer it instead of dropping the connection
+            return 500, {"error": f"Internal error: {type(error).__name__}"}
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b"\r\n", b"\n", b""):
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, path, version = request_line.decode("latin-1").split()
+                    length = int(headers.get("content-length", 0))
+                except ValueError:
+                    self.write_response(writer, 400, {"error": "Malformed request"}, keep_alive=False)
+                    break
+                if length > MAX_BODY:
+                    self.write_response(writer, 413, {"error": f"Body exceeds {MAX_BODY} bytes"}, keep_alive=False)
+                    break
+
+                body = await reader.readexactly(length) if length else b""
+                status, payload = await self.dispatch(method, path, body)
+                keep_alive = version == "HTTP/1.1" and headers.get("connection", "").lower() != "close"
+                self.write_response(writer, status, payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    def write_response(writer, status, payload, keep_alive=True):
+        try:
+            body = json.dumps(payload, allow_nan=False).encode("utf-8")
+        except ValueError:
+            status, body = 500, b'{"error": "Internal error: non-finite result"}'
+        writer.write(
+            f"HTTP/1.1 {status} {REASONS[status]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + body
+        )
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT):
+        """Start listening and return the asyncio server (port 0 picks a free port)"""
+        return await asyncio.start_server(self.handle_connection, host, port)
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, window=BATCH_WINDOW, max_batch=MAX_BATCH):
+    server = await ConversionServer(window, max_batch).start(host, port)
+    print(f"Serving conversions on http://{host}:{server.sockets[0].getsockname()[1]}")
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Local HTTP conversion API")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--batch-window-ms", type=float, default=BATCH_WINDOW * 1e3,
+                        help="how long to collect concurrent requests into one batch")
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH, help="flush a batch early at this size")
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(serve(args.host, args.port, args.batch_window_ms / 1e3, args.max_batch))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
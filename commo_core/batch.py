@@ -0,0 +1,354 @@
+"""Vectorized batch conversion over NumPy arrays and pandas Series"""
+import io
+import multiprocessing
+import os
+import shutil
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from .batch_options import DEFAULT_WORKERS
+from .data import COMMODITY_DATA
+from .units import (
+    convert_agricultural_units,
+    convert_coal_units,
+    convert_gas_units,
+    convert_oil_units,
+    convert_power_units,
+    convert_units
+)
+
+CHUNK_SIZE = int(os.environ.get("COMMO_BATCH_CHUNK_SIZE", 250_000))
+SPOOL_MAX_SIZE = 32 * 1024 * 1024
+SHARD_BYTES = 64 * 1024 * 1024
+RESULT_COLUMNS = ["Input", "From Unit", "Result", "To Unit"]
+QUALITY_COLUMNS = ["density", "calorific_value", "moisture_content"]
+SUMMARY_PERCENTILES = [5, 25, 50, 75, 95]
+COMMODITY_CATEGORIES = {
+    commodity: category for category, commodities in COMMODITY_DATA.items() for commodity in commodities
+}
+
+# Vectorized Batch Conversion
+def to_value_array(values):
+    """Coerce a list, NumPy array or pandas Series into a float array (invalid entries become NaN)"""
+    if isinstance(values, np.ndarray) and values.dtype.kind == "f":
+        return values
+    return pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=float)
+
+def convert_oil_units_array(values, from_unit, to_unit, density=None, api_gravity=None):
+    """Array version of convert_oil_units"""
+    return convert_oil_units(to_value_array(values), from_unit, to_unit, density=density, api_gravity=api_gravity)
+
+def convert_gas_units_array(values, from_unit, to_unit, calorific_value=None, commodity=None):
+    """Array version of convert_gas_units"""
+    return convert_gas_units(to_value_array(values), from_unit, to_unit, calorific_value=calorific_value,
+                             commodity=commodity)
+
+def convert_agricultural_units_array(values, from_unit, to_unit, commodity, moisture_content=None):
+    """Array version of convert_agricultural_units"""
+    return convert_agricultural_units(to_value_array(values), from_unit, to_unit, commodity,
+                                      moisture_content=moisture_content)
+
+def convert_power_units_array(values, from_unit, to_unit):
+    """Array version of convert_power_units"""
+    return convert_power_units(to_value_array(values), from_unit, to_unit)
+
+def convert_coal_units_array(values, from_unit, to_unit, calorific_value=None):
+    """Array version of convert_coal_units"""
+    return convert_coal_units(to_value_array(values), from_unit, to_unit, calorific_value=calorific_value)
+
+def convert_batch(values, category, commodity, from_unit, to_unit,
+                  density=None, calorific_value=None, moisture_content=None):
+    """Convert a whole column of values in one vectorized pass, using commodity defaults for quality parameters"""
+    values = to_value_array(values)
+    if from_unit == to_unit:
+        return values.copy()
+    return convert_units(values, category, commodity, from_unit, to_unit, density=density,
+                         calorific_value=calorific_value, moisture_content=moisture_content)
+
+# Columnar Batch Results
+class BatchResult:
+    """Valid inputs and results of a batch as one 2 x n float64 block (16 bytes per row)
+
+    The units are stored once rather than per row, and the output table is only built
+    when it is displayed or written.
+    """
+
+    def __init__(self, inputs, results, from_unit, to_unit):
+        valid = ~np.isnan(inputs)
+        self.invalid = int(len(inputs) - np.count_nonzero(valid))
+        self.values = np.stack([inputs, results]) if not self.invalid else np.stack([inputs[valid], results[valid]])
+        self.from_unit = from_unit
+        self.to_unit = to_unit
+
+    def __len__(self):
+        return self.values.shape[1]
+
+    @property
+    def inputs(self):
+        return self.values[0]
+
+    @property
+    def results(self):
+        return self.values[1]
+
+    def frame(self):
+        """Results table in the Batch Convert output layout (unit columns are categorical)"""
+        codes = np.zeros(len(self), dtype=np.int8)
+        return pd.DataFrame({
+            "Input": self.inputs,
+            "From Unit": pd.Categorical.from_codes(codes, [self.from_unit]),
+            "Result": self.results,
+            "To Unit": pd.Categorical.from_codes(codes, [self.to_unit])
+        })
+
+    def summary(self, percentiles=SUMMARY_PERCENTILES):
+        return summarize_batch(self.values, percentiles)
+
+def _ratio(numerator, denominator):
+    return numerator / denominator if denominator else float("nan")
+
+def summarize_batch(values, percentiles=SUMMARY_PERCENTILES):
+    """Totals, extremes, ratios and percentile bands of a 2 x n (inputs, results) block
+
+    Every statistic is a column-wise reduction over the block, so both columns are
+    summarized by the same calls.
+    """
+    rows = values.shape[1]
+    if not rows:
+        return {"rows": 0, "total_input": 0.0, "total_output": 0.0, "ratio": float("nan"),
+                "mean_ratio": float("nan"), "ratio_rows": 0}
+    totals = values.sum(axis=1)
+    lows, highs = values.min(axis=1), values.max(axis=1)
+    bands = np.percentile(values, percentiles, axis=1)
+    # Per-row ratios skip zero inputs, which have no defined ratio
+    ratios = np.divide(values[1], values[0], out=np.full(rows, np.nan), where=values[0] != 0)
+    finite = np.isfinite(ratios)
+    ratio_rows = int(np.count_nonzero(finite))
+    return {
+        "rows": rows,
+        "total_input": float(totals[0]),
+        "total_output": float(totals[1]),
+        "ratio": _ratio(float(totals[1]), float(totals[0])),
+        "mean_ratio": float(ratios[finite].mean()) if ratio_rows else float("nan"),
+        "ratio_rows": ratio_rows,
+        "min_input": float(lows[0]),
+        "max_input": float(highs[0]),
+        "min_output": float(lows[1]),
+        "max_output": float(highs[1]),
+        "input_percentiles": dict(zip(percentiles, bands[:, 0].tolist())),
+        "output_percentiles": dict(zip(percentiles, bands[:, 1].tolist()))
+    }
+
+def merge_batch_summaries(summaries):
+    """Combine per-chunk summaries into one (percentile bands cannot be merged and are dropped)"""
+    summaries = [summary for summary in summaries if summary["rows"]]
+    merged = {key: sum(summary[key] for summary in summaries)
+              for key in ["rows", "total_input", "total_output", "ratio_rows"]}
+    merged["ratio"] = _ratio(merged["total_output"], merged["total_input"])
+    merged["mean_ratio"] = _ratio(sum(summary["mean_ratio"] * summary["ratio_rows"]
+                                      for summary in summaries if summary["ratio_rows"]), merged["ratio_rows"])
+    if summaries:
+        for key in ["min_input", "min_output"]:
+            merged[key] = min(summary[key] for summary in summaries)
+        for key in ["max_input", "max_output"]:
+            merged[key] = max(summary[key] for summary in summaries)
+    return merged
+
+# Columnar Input/Output
+def read_column_names(source, file_format="csv"):
+    """List a file's columns without reading its data"""
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        names = pq.read_schema(source).names
+    elif file_format == "arrow":
+        import pyarrow as pa
+        names = pa.ipc.open_file(source).schema.names
+    else:
+        names = list(pd.read_csv(source, nrows=0).columns)
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return names
+
+def read_table(source, file_format="csv", columns=None):
+    """Read a CSV, Parquet or Arrow IPC file into a DataFrame, parsing only the requested columns"""
+    if file_format == "parquet":
+        return pd.read_parquet(source, columns=columns)
+    elif file_format == "arrow":
+        import pyarrow.feather as feather
+        return feather.read_table(source, columns=columns).to_pandas()
+    return pd.read_csv(source, usecols=columns)
+
+def read_value_column(source, value_column, file_format="csv"):
+    """Read a single column; columnar formats skip every other column entirely"""
+    return read_table(source, file_format, columns=[value_column])[value_column]
+
+def write_result_frame(frame, file_format="csv"):
+    """Serialise a results frame to CSV text or compressed Parquet / Arrow IPC bytes"""
+    if file_format == "csv":
+        return frame.to_csv(index=False)
+    
+    import pyarrow as pa
+    table = pa.Table.from_pandas(frame, preserve_index=False)
+    # Unit columns repeat one value per group, so dictionary-encode them
+    for name in ["From Unit", "To Unit", "Commodity"]:
+        if name in table.column_names and not pa.types.is_dictionary(table.schema.field(name).type):
+            index = table.column_names.index(name)
+            table = table.set_column(index, name, table.column(name).dictionary_encode())
+    buffer = io.BytesIO()
+    if file_format == "parquet":
+        import pyarrow.parquet as pq
+        pq.write_table(table, buffer, compression="zstd")
+    else:
+        import pyarrow.feather as feather
+        feather.write_feather(table, buffer, compression="zstd")
+    return buffer.getvalue()
+
+# Multi-Commodity Batch Conversion
+def convert_mixed_batch(frame, value_column="value", commodity_column="commodity",
+                        from_column="from_unit", to_column="to_unit"):
+    """Convert a table whose rows carry their own commodity, units and optional quality parameters
+
+    Rows are grouped on (commodity, from_unit, to_unit, quality parameters) and each group is
+    converted with one vectorized call; results are scattered back in the original row order.
+    Rows with an unknown commodity, a unit the commodity does not use, or a non-numeric value
+    come back as NaN.
+    """
+    values = to_value_array(frame[value_column])
+    results = np.full(len(values), np.nan)
+    quality_columns = [column for column in QUALITY_COLUMNS if column in frame.columns]
+    keys = [commodity_column, from_column, to_column] + quality_columns
+    
+    for key, positions in frame.groupby(keys, sort=False, dropna=False).indices.items():
+        commodity, from_unit, to_unit, *quality = key
+        category = COMMODITY_CATEGORIES.get(commodity)
+        if category is None:
+            continue
+        units = COMMODITY_DATA[category][commodity]["units"]
+        if from_unit not in units or to_unit not in units:
+            continue
+        params = {column: float(q) for column, q in zip(quality_columns, quality) if not pd.isna(q)}
+        results[positions] = convert_batch(values[positions], category, commodity, from_unit, to_unit, **params)
+    return results
+
+# Streaming Batch Conversion
+def iter_converted_chunks(chunks, value_column, category, commodity, from_unit, to_unit, **params):
+    """Convert an iterable of DataFrame chunks, yielding a BatchResult per chunk"""
+    for chunk in chunks:
+        inputs = to_value_array(chunk[value_column])
+        yield BatchResult(inputs, convert_batch(inputs, category, commodity, from_unit, to_unit, **params),
+                          from_unit, to_unit)
+
+def convert_csv_stream(source, value_column, category, commodity, from_unit, to_unit,
+                       chunk_size=CHUNK_SIZE, output=None, preview_rows=20, **params):
+    """Convert one CSV column chunk by chunk, writing the result CSV incrementally
+
+    Only the value column is parsed and at most one chunk is held in memory. The output goes
+    to a spooled temporary file (in memory up to SPOOL_MAX_SIZE, then on disk), which is
+    rewound and returned together with a small preview frame and the merged summary
+    statistics of every chunk (see merge_batch_summaries).
+    """
+    if output is None:
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+b")
+    invalid, preview, chunk_summaries = 0, None, []
+    
+    header = True
+    chunks = pd.read_csv(source, usecols=[value_column], chunksize=chunk_size)
+    for batch in iter_converted_chunks(chunks, value_column, category, commodity, from_unit, to_unit, **params):
+        frame = batch.frame()
+        frame.to_csv(output, header=header, index=False, encoding="utf-8")
+        header = False
+        if preview is None:
+            preview = frame.head(preview_rows)
+        invalid += batch.invalid
+        chunk_summaries.append(batch.summary(percentiles=[]))
+    
+    output.seek(0)
+    return output, {**merge_batch_summaries(chunk_summaries), "invalid": invalid, "preview": preview}
+
+# Parallel Batch Conversion
+def split_csv_shards(path, shards):
+    """Split a CSV file into newline-aligned byte ranges after the header
+
+    Assumes quoted fields do not contain line breaks.
+    """
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        header = f.readline()
+        start = f.tell()
+        bounds = [start]
+        for i in range(1, shards):
+            f.seek(max(start + (size - start) * i // shards, bounds[-1]))
+            f.readline()
+            bounds.append(max(f.tell(), bounds[-1]))
+        bounds.append(size)
+    return header, [(a, b) for a, b in zip(bounds, bounds[1:]) if b > a]
+
+def _convert_csv_shard(task):
+    """Process-pool worker: convert one byte range of a CSV into a headerless CSV part file"""
+    started = time.perf_counter()
+    with open(task["path"], "rb") as f:
+        f.seek(task["start"])
+        data = task["header"] + f.read(task["end"] - task["start"])
+    
+    invalid, chunk_summaries = 0, []
+    chunks = pd.read_csv(io.BytesIO(data), usecols=[task["value_column"]], chunksize=CHUNK_SIZE)
+    with open(task["output"], "wb") as out:
+        for batch in iter_converted_chunks(chunks, task["value_column"], *task["conversion"], **task["params"]):
+            batch.frame().to_csv(out, header=False, index=False, encoding="utf-8")
+            invalid += batch.invalid
+            chunk_summaries.append(batch.summary(percentiles=[]))
+    return {"shard": task["shard"], **merge_batch_summaries(chunk_summaries), "invalid": invalid,
+            "seconds": time.perf_counter() - started}
+
+def convert_csv_parallel(path, value_column, category, commodity, from_unit, to_unit,
+                         workers=None, shards=None, output=None, preview_rows=20, **params):
+    """Convert one CSV column across a process pool, merging shard outputs in input order
+
+    The file is split into newline-aligned shards (at least one per worker, at most
+    SHARD_BYTES each). Each worker parses, converts and writes its shard independently, and
+    the parts are concatenated under a single header. Returns the rewound output file and
+    the same summary as convert_csv_stream, plus per-shard row counts and timings.
+    """
+    started = time.perf_counter()
+    workers = max(1, workers or DEFAULT_WORKERS)
+    if shards is None:
+        shards = max(workers, -(-os.path.getsize(path) // SHARD_BYTES))
+    if output is None:
+        output = tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE, mode="w+b")
+    
+    header, ranges = split_csv_shards(path, shards)
+    with tempfile.TemporaryDirectory() as parts_dir:
+        tasks = [{
+            "shard": i,
+            "path": path,
+            "header": header,
+            "start": start,
+            "end": end,
+            "value_column": value_column,
+            "conversion": (category, commodity, from_unit, to_unit),
+            "params": params,
+            "output": os.path.join(parts_dir, f"part-{i:05d}.csv")
+        } for i, (start, end) in enumerate(ranges)]
+        
+        # Spawned workers avoid forking a threaded server process (e.g. Streamlit)
+        with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) as pool:
+            shard_stats = list(pool.map(_convert_csv_shard, tasks))
+        
+        output.write((",".join(RESULT_COLUMNS) + "\n").encode("utf-8"))
+        for task in tasks:
+            with open(task["output"], "rb") as part:
+                shutil.copyfileobj(part, output)
+    output.seek(0)
+    
+    summary = merge_batch_summaries(shard_stats)
+    summary["invalid"] = sum(stats["invalid"] for stats in shard_stats)
+    summary["preview"] = pd.read_csv(output, nrows=preview_rows)
+    output.seek(0)
+    summary["workers"] = workers
+    summary["shards"] = shard_stats
+    summary["seconds"] = time.perf_counter() - started
+    return output, summary
@@ -0,0 +1,40 @@
+"""Batch job options and file formats, importable without NumPy or pandas"""
+import atexit
+import os
+
+DEFAULT_WORKERS = int(os.environ.get("COMMO_BATCH_WORKERS", os.cpu_count() or 1))
+
+# Parquet and Arrow IPC (Feather v2) go through pyarrow, which is imported on first use.
+FILE_FORMATS = {".csv": "csv", ".parquet": "parquet", ".pq": "parquet", ".arrow": "arrow", ".feather": "arrow",
+                ".ipc": "arrow"}
+OUTPUT_FORMATS = {
+    "CSV": {"format": "csv", "extension": ".csv", "mime": "text/csv"},
+    "Parquet": {"format": "parquet", "extension": ".parquet", "mime": "application/vnd.apache.parquet"},
+    "Arrow IPC": {"format": "arrow", "extension": ".arrow", "mime": "application/vnd.apache.arrow.file"}
+}
+
+def detect_file_format(filename):
+    """Map a file name to "csv", "parquet" or "arrow" by extension (defaults to csv)"""
+    return FILE_FORMATS.get(os.path.splitext(filename)[1].lower(), "csv")
+
+# Result files
+# Written result files are kept until the session replaces them or the process exits; one exit
+# hook covers every file, however many conversions have run.
+RESULT_FILES = set()
+
+def keep_result_file(path):
+    """Remove a result file when the process exits"""
+    RESULT_FILES.add(path)
+
+def remove_result_file(path):
+    """Delete a result or upload copy if it is still on disk"""
+    RESULT_FILES.discard(path)
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+@atexit.register
+def remove_result_files():
+    for path in list(RESULT_FILES):
+        remove_result_file(path)
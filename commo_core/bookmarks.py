@@ -0,0 +1,121 @@
+"""Persistent bookmarks shared across sessions, in a local SQLite file
+
+Bookmarks belong to an owner (a user or desk name) and are unique per owner and
+name. Listing, prefix search and commodity lookups are range scans over indexes,
+so loading one page of bookmarks does not depend on how many the desk has saved.
+"""
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+BOOKMARKS_DB_PATH = os.environ.get("COMMO_BOOKMARKS_DB", "bookmarks.sqlite3")
+DEFAULT_OWNER = os.environ.get("COMMO_DESK", "shared")
+BOOKMARK_FIELDS = ["category", "commodity", "from_unit", "to_unit", "value"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS bookmarks (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    name TEXT NOT NULL,
+    category TEXT,
+    commodity TEXT,
+    from_unit TEXT,
+    to_unit TEXT,
+    value REAL,
+    params TEXT,
+    created TEXT NOT NULL,
+    UNIQUE (owner, name)
+);
+CREATE INDEX IF NOT EXISTS idx_bookmarks_name ON bookmarks (name);
+CREATE INDEX IF NOT EXISTS idx_bookmarks_commodity ON bookmarks (commodity, name);
+"""
+
+class BookmarkStore:
+    """Bookmarks backed by SQLite (created on first use); saving a name again replaces it"""
+
+    def __init__(self, path=BOOKMARKS_DB_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._initialized = False
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        with self._lock:
+            if not self._initialized:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+                self._initialized = True
+        return connection
+
+    def _execute(self, sql, args=(), fetch=False):
+        connection = self._connect()
+        try:
+            with connection:
+                cursor = connection.execute(sql, args)
+                return cursor.fetchall() if fetch else cursor.rowcount
+        finally:
+            connection.close()
+
+    def save(self, bookmark, owner=DEFAULT_OWNER):
+        """Insert or replace a bookmark (a dict with a name, BOOKMARK_FIELDS and optional quality params)"""
+        params = {key: value for key, value in bookmark.items() if key not in ["name", *BOOKMARK_FIELDS]}
+        self._execute(
+            "INSERT INTO bookmarks (owner, name, category, commodity, from_unit, to_unit, value, params, created) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (owner, name) DO UPDATE SET category = excluded.category, commodity = excluded.commodity, "
+            "from_unit = excluded.from_unit, to_unit = excluded.to_unit, value = excluded.value, "
+            "params = excluded.params, created = excluded.created",
+            (owner, bookmark["name"], *(bookmark.get(field) for field in BOOKMARK_FIELDS),
+             json.dumps(params) if params else None, datetime.now().isoformat(sep=" ", timespec="seconds")))
+
+    def search(self, owner=DEFAULT_OWNER, prefix="", commodity=None, limit=20):
+        """Bookmarks in name order for one owner (None for every owner), optionally by name prefix and commodity"""
+        clauses, args = [], []
+        if owner is not None:
+            clauses.append("owner = ?")
+            args.append(owner)
+        if commodity is not None:
+            clauses.append("commodity = ?")
+            args.append(commodity)
+        if prefix:
+            # A half-open range instead of LIKE keeps the lookup on the index
+            clauses.append("name >= ? AND name < ?")
+            args.extend([prefix, prefix + "\U0010ffff"])
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        rows = self._execute(f"SELECT * FROM bookmarks {where} ORDER BY name LIMIT ?",
+                             [*args, limit], fetch=True)
+        return [self._entry(row) for row in rows]
+
+    def get(self, name, owner=DEFAULT_OWNER):
+        rows = self._execute("SELECT * FROM bookmarks WHERE owner = ? AND name = ?", (owner, name), fetch=True)
+        return self._entry(rows[0]) if rows else None
+
+    def delete(self, name, owner=DEFAULT_OWNER):
+        return self._execute("DELETE FROM bookmarks WHERE owner = ? AND name = ?", (owner, name)) > 0
+
+    def delete_many(self, names, owner=DEFAULT_OWNER):
+        """Delete the named bookmarks of one owner; returns how many were deleted"""
+        names = list(names)
+        if not names:
+            return 0
+        return self._execute(f"DELETE FROM bookmarks WHERE owner = ? AND name IN ({', '.join('?' * len(names))})",
+                             (owner, *names))
+
+    def clear(self, owner=DEFAULT_OWNER):
+        """Delete every bookmark of one owner"""
+        return self._execute("DELETE FROM bookmarks WHERE owner = ?", (owner,))
+
+    def count(self, owner=DEFAULT_OWNER):
+        return self._execute("SELECT COUNT(*) FROM bookmarks WHERE owner = ?", (owner,), fetch=True)[0][0]
+
+    @staticmethod
+    def _entry(row):
+        entry = {key: row[key] for key in ["name", *BOOKMARK_FIELDS]}
+        if row["params"]:
+            entry.update(json.loads(row["params"]))
+        return entry
+
+BOOKMARKS = BookmarkStore()
@@ -0,0 +1,84 @@
+"""Plotly figure builders used by the enhanced app (plotly is imported when a chart is built)"""
+from .formatting import format_number
+
+def create_comparison_chart(conversions):
+    """Create a comparison chart for multiple conversions"""
+    if not conversions:
+        return None
+    
+    import plotly.graph_objects as go
+    fig = go.Figure()
+    
+    for i, conv in enumerate(conversions):
+        fig.add_trace(go.Bar(
+            x=[conv["commodity"]],
+            y=[conv["result"]],
+            name=f"{conv['input_value']} {conv['from_unit']} → {conv['to_unit']}",
+            text=f"{format_number(conv['result'])} {conv['to_unit']}",
+            textposition='auto',
+        ))
+    
+    fig.update_layout(
+        title="Conversion Comparison",
+        xaxis_title="Commodity",
+        yaxis_title="Converted Value",
+        height=400,
+        showlegend=True
+    )
+    
+    return fig
+
+def create_gauge_chart(original_value, converted_value, from_unit, to_unit):
+    """Create a gauge chart showing conversion ratio"""
+    ratio = converted_value / original_value if original_value != 0 else 0
+    
+    import plotly.graph_objects as go
+    fig = go.Figure(go.Indicator(
+        mode = "gauge+number+delta",
+        value = ratio,
+        domain = {'x': [0, 1], 'y': [0, 1]},
+        title = {'text': f"Conversion Ratio<br>{from_unit} → {to_unit}"},
+        delta = {'reference': 1},
+        gauge = {
+            'axis': {'range': [None, max(ratio * 1.5, 2)]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, ratio * 0.5], 'color': "lightgray"},
+                {'range': [ratio * 0.5, ratio], 'color': "gray"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': ratio
+            }
+        }
+    ))
+    
+    fig.update_layout(height=300)
+    return fig
+
+def create_histogram_chart(histogram, unit, percentiles=None):
+    """Create a histogram from precomputed bin counts, with optional percentile markers"""
+    import plotly.graph_objects as go
+    edges = histogram["edges"]
+    fig = go.Figure(go.Bar(
+        x=(edges[:-1] + edges[1:]) / 2,
+        y=histogram["counts"],
+        width=edges[1:] - edges[:-1],
+        marker_color="#1f77b4",
+        name="draws"
+    ))
+    
+    for percentile, value in (percentiles or {}).items():
+        fig.add_vline(x=value, line_dash="dash", line_color="#dc2626",
+                      annotation_text=f"P{percentile}", annotation_position="top")
+    
+    fig.update_layout(
+        title="Simulated Result Distribution",
+        xaxis_title=unit,
+        yaxis_title="Draws",
+        height=350,
+        showlegend=False
+    )
+    
+    return fig
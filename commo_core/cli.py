@@ -0,0 +1,166 @@
+"""Streaming command-line converter for shell pipelines (stdin to stdout)
+
+    cat noms.csv | python -m commo_core.cli --commodity "Brent Crude" --from barrels --to "metric tons"
+    python -m commo_core.cli --commodity Wheat --from bushels --to "metric tons" --format jsonl < lots.jsonl
+
+Every input row is written back with an extra result column (CSV) or key (JSON
+lines); values that are missing or not numeric get an empty result. A JSON line
+that is not an object stops the stream after the rows before it, with its line
+number on stderr and exit status 1. Input is
+processed in fixed-size chunks, so memory stays constant however long the
+stream is. Throughput is reported on stderr.
+"""
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+
+import numpy as np
+
+from .batch import COMMODITY_CATEGORIES, CHUNK_SIZE, convert_batch
+from .data import COMMODITY_DATA
+
+FORMATS = ["csv", "jsonl"]
+PROGRESS_INTERVAL = 2.0
+
+class ProgressReporter:
+    """Row counts and rows/sec on stderr, at most every PROGRESS_INTERVAL seconds"""
+
+    def __init__(self, stream, enabled=True):
+        self.stream = stream
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.last_report = self.started
+        self.rows = 0
+        self.invalid = 0
+
+    def update(self, rows, invalid):
+        self.rows += rows
+        self.invalid += invalid
+        now = time.perf_counter()
+        if self.enabled and now - self.last_report >= PROGRESS_INTERVAL:
+            self.last_report = now
+            self.report("...")
+
+    def report(self, prefix="converted"):
+        if not self.enabled:
+            return
+        seconds = time.perf_counter() - self.started
+        rate = self.rows / seconds if seconds > 0 else 0.0
+        print(f"{prefix} {self.rows:,} rows ({self.invalid:,} invalid) in {seconds:.2f}s, {rate:,.0f} rows/s",
+              file=self.stream, flush=True)
+
+def detect_format(stream):
+    """Guess "jsonl" or "csv" from the first buffered line without consuming it"""
+    head = stream.buffer.peek(1)[:1] if hasattr(stream, "buffer") and hasattr(stream.buffer, "peek") else b""
+    return "jsonl" if head == b"{" else "csv"
+
+def convert_csv_lines(source, output, column, output_column, chunk_size, progress, convert):
+    """Stream CSV rows through pandas in chunks, passing the original columns through unchanged"""
+    import pandas as pd
+    # Read every column as text so untouched fields are written back exactly as received
+    try:
+        chunks = pd.read_csv(source, dtype=str, keep_default_na=False, chunksize=chunk_size)
+    except pd.errors.EmptyDataError:
+        return
+    header = True
+    for chunk in chunks:
+        if column is None:
+            column = "value" if "value" in chunk.columns else chunk.columns[0]
+        if column not in chunk.columns:
+            raise SystemExit(f"error: column {column!r} not found (columns: {', '.join(chunk.columns)})")
+        inputs = pd.to_numeric(chunk[column].str.strip(), errors="coerce").to_numpy(dtype=float)
+        chunk[output_column] = convert(inputs)
+        chunk.to_csv(output, header=header, index=False, lineterminator="\n")
+        header = False
+        progress.update(len(chunk), int(np.isnan(inputs).sum()))
+
+def convert_json_lines(source, output, column, output_column, chunk_size, progress, convert):
+    """Stream JSON objects (one per line) in chunks, adding the result to each object"""
+    column = column or "value"
+    lines = ((number, line) for number, line in enumerate(source, 1) if line.strip())
+    while True:
+        records, error = [], None
+        for number, line in itertools.islice(lines, chunk_size):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError as decode_error:
+                error = f"error: line {number} is not valid JSON ({decode_error.msg})"
+                break
+            if not isinstance(record, dict):
+                error = f"error: line {number} is not a JSON object"
+                break
+            records.append(record)
+        if records:
+            inputs = np.array([_as_number(record.get(column)) for record in records], dtype=float)
+            results = convert(inputs)
+            output.writelines(
+                json.dumps({**record, output_column: result if np.isfinite(result) else None}) + "\n"
+                for record, result in zip(records, results.tolist())
+            )
+            progress.update(len(records), int(np.isnan(inputs).sum()))
+        if error:
+            # Every row before the bad line has been written
+            raise SystemExit(error)
+        if not records:
+            break
+
+def _as_number(value):
+    if isinstance(value, bool):
+        return np.nan
+    try:
+        value = float(value)
+    except (TypeError, ValueError, OverflowError):
+        return np.nan
+    return value if np.isfinite(value) else np.nan
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="commo-convert", description=__doc__.split("\n")[0])
+    parser.add_argument("--commodity", required=True, help="commodity name, e.g. \"Brent Crude\"")
+    parser.add_argument("--from", dest="from_unit", required=True, help="input unit")
+    parser.add_argument("--to", dest="to_unit", required=True, help="output unit")
+    parser.add_argument("--density", type=float, help="override the commodity's density (oil)")
+    parser.add_argument("--calorific-value", type=float, help="override the commodity's calorific value (gas)")
+    parser.add_argument("--moisture-content", type=float, help="override the commodity's moisture content (agricultural)")
+    parser.add_argument("--format", choices=FORMATS, help="input format (default: detect from the first line)")
+    parser.add_argument("--column", help="field holding the values (default: \"value\", else the first CSV column)")
+    parser.add_argument("--output-column", help="field for the results (default: the target unit)")
+    parser.add_argument("--chunk-size", type=int, default=min(CHUNK_SIZE, 50_000), help="rows per chunk")
+    parser.add_argument("--quiet", action="store_true", help="do not report progress on stderr")
+    return parser
+
+def main(argv=None, stdin=None, stdout=None, stderr=None):
+    stdin, stdout, stderr = stdin or sys.stdin, stdout or sys.stdout, stderr or sys.stderr
+    parser = build_parser()
+    args = parser.parse_args(argv)
+
+    category = COMMODITY_CATEGORIES.get(args.commodity)
+    if category is None:
+        parser.error(f"unknown commodity {args.commodity!r}")
+    units = COMMODITY_DATA[category][args.commodity]["units"]
+    for unit in [args.from_unit, args.to_unit]:
+        if unit not in units:
+            parser.error(f"unit {unit!r} is not available for {args.commodity} (choose from: {', '.join(units)})")
+
+    params = {"density": args.density, "calorific_value": args.calorific_value,
+              "moisture_content": args.moisture_content}
+    convert = lambda values: convert_batch(values, category, args.commodity, args.from_unit, args.to_unit, **params)
+    stream_format = args.format or detect_format(stdin)
+    converter = convert_json_lines if stream_format == "jsonl" else convert_csv_lines
+    progress = ProgressReporter(stderr, enabled=not args.quiet)
+
+    try:
+        converter(stdin, stdout, args.column, args.output_column or args.to_unit, args.chunk_size, progress, convert)
+        stdout.flush()
+    except BrokenPipeError:
+        # The reader went away (e.g. piped into head); stop quietly like other filters
+        if stdout is sys.stdout:
+            os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    progress.report()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Reference data for commodities, units and currencies"""
+
+# Commodity Data
+COMMODITY_DATA = {
+    "Oil & Liquids": {
+        "Brent Crude": {"density": 0.825, "api_gravity": 38.3, "units": ["barrels", "metric tons", "gallons", "liters"]},
+        "WTI Crude": {"density": 0.827, "api_gravity": 37.9, "units": ["barrels", "metric tons", "gallons", "liters"]},
+        "Gasoline": {"density": 0.74, "api_gravity": 60, "units": ["barrels", "metric tons", "gallons", "liters"]},
+        "Diesel": {"density": 0.85, "api_gravity": 35, "units": ["barrels", "metric tons", "gallons", "liters"]},
+        "Jet Fuel": {"density": 0.8, "api_gravity": 45, "units": ["barrels", "metric tons", "gallons", "liters"]},
+        "Heating Oil": {"density": 0.87, "api_gravity": 31, "units": ["barrels", "metric tons", "gallons", "liters"]}
+    },
+    "Natural Gas": {
+        "Natural Gas": {"density": 0.717, "calorific_value": 38.7, "units": ["mcf", "bcf", "mmbtu", "therms", "cubic_meters"]},
+        "LNG": {"density": 0.45, "calorific_value": 55, "units": ["metric tons", "cubic_meters", "mmbtu", "gallons"]}
+    },
+    "Coal": {
+        "Thermal Coal": {"density": 1.3, "calorific_value": 6000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]},
+        "Coking Coal": {"density": 1.35, "calorific_value": 7000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]},
+        "Anthracite": {"density": 1.4, "calorific_value": 8000, "units": ["metric tons", "short tons", "mmbtu", "kcal"]}
+    },
+    "Agricultural": {
+        "Wheat": {"density": 0.78, "moisture_content": 13.5, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
+        "Corn": {"density": 0.72, "moisture_content": 15.5, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
+        "Soybeans": {"density": 0.77, "moisture_content": 13.0, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
+        "Rice": {"density": 0.75, "moisture_content": 14.0, "units": ["bushels", "metric tons", "pounds", "kilograms"]},
+        "Sugar": {"density": 0.8, "moisture_content": 0.1, "units": ["metric tons", "pounds", "kilograms"]}
+    },
+    "Power/Electricity": {
+        "Electricity": {"units": ["mwh", "kwh", "gwh", "mmbtu", "therms"]}
+    }
+}
+
+# Energy Content (GJ per metric ton)
+# Net calorific values for oil products (IPCC 2006 defaults) and food energy at standard
+# moisture for agricultural commodities (USDA). Gas and coal use their calorific_value above.
+ENERGY_CONTENT = {
+    "Brent Crude": 42.3,
+    "WTI Crude": 42.3,
+    "Gasoline": 44.3,
+    "Diesel": 43.0,
+    "Jet Fuel": 44.1,
+    "Heating Oil": 43.0,
+    "Wheat": 13.7,
+    "Corn": 15.3,
+    "Soybeans": 18.7,
+    "Rice": 15.3,
+    "Sugar": 16.2
+}
+
+# Unit Conversions
+UNIT_CONVERSIONS = {
+    "barrels": 0.158987,
+    "gallons": 0.00378541,
+    "liters": 0.001,
+    "metric tons": 1.0,
+    "short tons": 0.907185,
+    "pounds": 0.000453592,
+    "kilograms": 0.001,
+    "bushels": {"wheat": 27.2155, "corn": 25.4012, "soybeans": 27.2155, "rice": 20.4124},
+    "mcf": 28.3168,
+    "bcf": 28316846.6,
+    "mmbtu": 1.05506,
+    "therms": 0.105506,
+    "cubic_meters": 1.0,
+    "mwh": 3.6,
+    "kwh": 0.0036,
+    "gwh": 3600,
+    "kcal": 4.184e-6
+}
+
+# Currency Data
+CURRENCY_DATA = {
+    "USD": {"region": "USA", "symbol": "$"},
+    "EUR": {"region": "Europe", "symbol": "€"},
+    "GBP": {"region": "United Kingdom", "symbol": "£"},
+    "JPY": {"region": "Japan", "symbol": "¥"},
+    "CAD": {"region": "Canada", "symbol": "C$"},
+    "AUD": {"region": "Australia", "symbol": "A$"},
+    "CHF": {"region": "Switzerland", "symbol": "CHF"},
+    "CNY": {"region": "China", "symbol": "¥"},
+    "INR": {"region": "India", "symbol": "₹"},
+    "BRL": {"region": "Brazil", "symbol": "R$"},
+    "RUB": {"region": "Russia", "symbol": "₽"},
+    "MXN": {"region": "Mexico", "symbol": "$"}
+}
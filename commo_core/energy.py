@@ -0,0 +1,73 @@
+"""Energy equivalence across every commodity (GJ, MMBtu and barrels of oil equivalent)
+
+ENERGY_TABLE holds the energy in GJ of one unit of every (commodity, unit) pair in
+COMMODITY_DATA, computed once at import. Each factor goes through the same unit graph
+as convert_units, so converting within one commodity through energy gives exactly the
+Unit Converter's result. Comparisons between commodities are then a single vectorized
+product over that table (NumPy is imported on first use).
+"""
+from functools import lru_cache
+
+from .data import COMMODITY_DATA, ENERGY_CONTENT, UNIT_CONVERSIONS
+from .units import convert_units
+
+GJ_PER_MMBTU = UNIT_CONVERSIONS["mmbtu"]
+GJ_PER_BOE = 5.8 * GJ_PER_MMBTU
+ENERGY_BASES = {"GJ": 1.0, "MMBtu": GJ_PER_MMBTU, "boe": GJ_PER_BOE}
+
+# Units whose GJ content is fixed (UNIT_CONVERSIONS gives them in GJ)
+ENERGY_UNITS = ["mmbtu", "therms", "kcal", "kwh", "mwh", "gwh"]
+
+def energy_anchor(commodity):
+    """(category, anchor unit, GJ per anchor unit) used to put a commodity's units on an energy basis
+
+    The anchor is the first energy unit the commodity is quoted in; commodities without
+    one (liquids, grains) are anchored at metric tons with their ENERGY_CONTENT.
+    """
+    category = next(c for c, commodities in COMMODITY_DATA.items() if commodity in commodities)
+    units = COMMODITY_DATA[category][commodity]["units"]
+    anchor = next((unit for unit in units if unit in ENERGY_UNITS), None)
+    if anchor is not None:
+        return category, anchor, UNIT_CONVERSIONS[anchor]
+    if "metric tons" in units and commodity in ENERGY_CONTENT:
+        return category, "metric tons", ENERGY_CONTENT[commodity]
+    return category, None, None
+
+@lru_cache(maxsize=None)
+def energy_per_unit(commodity, unit):
+    """GJ contained in one unit of a commodity, or None if the commodity has no energy content"""
+    category, anchor, gj_per_anchor = energy_anchor(commodity)
+    if anchor is None:
+        return None
+    return convert_units(1.0, category, commodity, unit, anchor) * gj_per_anchor
+
+def compile_energy_table():
+    """GJ per unit for every (commodity, unit) pair listed in COMMODITY_DATA"""
+    return {
+        (commodity, unit): energy_per_unit(commodity, unit)
+        for commodities in COMMODITY_DATA.values()
+        for commodity, properties in commodities.items()
+        for unit in properties["units"]
+    }
+
+ENERGY_TABLE = compile_energy_table()
+
+def _gj_factors(commodities, units):
+    import numpy as np
+    return np.array([ENERGY_TABLE.get((commodity, unit)) or np.nan for commodity, unit in zip(commodities, units)],
+                    dtype=float)
+
+def to_energy(values, commodities, units, basis="GJ"):
+    """Energy content of each quantity in the chosen basis ("GJ", "MMBtu" or "boe")"""
+    import numpy as np
+    return np.asarray(values, dtype=float) * _gj_factors(commodities, units) / ENERGY_BASES[basis]
+
+def equivalence_matrix(values, commodities, units, target_commodities, target_units):
+    """All-to-all energy equivalents in one outer product
+
+    matrix[i, j] is the quantity of target commodity j, in target unit j, that holds the
+    same energy as quantity i.
+    """
+    import numpy as np
+    energy = to_energy(values, commodities, units)
+    return np.outer(energy, 1 / _gj_factors(target_commodities, target_units))
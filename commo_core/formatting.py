@@ -0,0 +1,11 @@
+"""Display formatting helpers"""
+
+def format_number(value, decimals=2):
+    if value >= 1000000:
+        return f"{value:,.{decimals}f}"
+    elif value >= 1000:
+        return f"{value:,.{decimals}f}"
+    elif value >= 1:
+        return f"{value:.{decimals}f}"
+    else:
+        return f"{value:.{decimals+2}f}"
@@ -0,0 +1,325 @@
+"""Live exchange rates (requests is imported on first fetch, NumPy on first cross-rate matrix)"""
+import asyncio
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from .data import CURRENCY_DATA
+from .fx_snapshot import RATE_SNAPSHOT
+
+RATES_URL = os.environ.get("COMMO_FX_URL", "https://api.exchangerate-api.com/v4/latest/{base}")
+MATRIX_BASE = "USD"
+DEFAULT_TTL = float(os.environ.get("COMMO_FX_TTL", 600))
+POOL_SIZE = int(os.environ.get("COMMO_FX_POOL_SIZE", 32))
+FETCH_TIMEOUT = float(os.environ.get("COMMO_FX_TIMEOUT", 5))
+
+_session = None
+_fetch_executor = None
+_session_lock = threading.Lock()
+
+def get_session():
+    """Shared, connection-pooled HTTP session (created on first use)"""
+    global _session
+    with _session_lock:
+        if _session is None:
+            import requests
+            from requests.adapters import HTTPAdapter
+            session = requests.Session()
+            adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_SIZE)
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+            _session = session
+        return _session
+
+def fetch_rate_table(base_currency):
+    """Fetch the full rate table for a base currency (raises on any failure)"""
+    response = get_session().get(RATES_URL.format(base=base_currency), timeout=FETCH_TIMEOUT)
+    response.raise_for_status()
+    return response.json()['rates']
+
+class RateCache:
+    """Process-wide rate tables keyed by base currency, with stale-while-revalidate refreshes
+
+    A base that has never been fetched blocks on the first fetch. Once the TTL has
+    expired the stale table is returned immediately and a single background thread
+    refreshes it; if that refresh fails the stale table is kept. Concurrent fetches
+    of the same base are coalesced into one upstream call.
+
+    With a snapshot (see fx_snapshot), every fetched table is also written to disk. A
+    base missing from memory is then filled from the snapshot before going to the
+    network, and the snapshot is the fallback when a fetch fails.
+    """
+
+    def __init__(self, fetch=fetch_rate_table, ttl=DEFAULT_TTL, snapshot=None):
+        self.fetch = fetch
+        self.ttl = ttl
+        self.snapshot = snapshot
+        self._entries = {}
+        self._refreshing = set()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._counts = {"hits": 0, "stale_hits": 0, "misses": 0, "coalesced": 0, "fetches": 0,
+                        "refreshes": 0, "failures": 0, "snapshot_loads": 0}
+
+    def get_rates(self, base_currency):
+        """Return the rate table for a base currency, or None if it cannot be fetched"""
+        with self._lock:
+            entry = self._entries.get(base_currency)
+        if entry is None:
+            # A snapshot older than the TTL is served stale and refreshed like any expired table
+            entry = self._restore(base_currency)
+            if entry is None:
+                with self._lock:
+                    self._counts["misses"] += 1
+                return self._load(base_currency)
+        with self._lock:
+            if time.monotonic() - entry["fetched"] < self.ttl:
+                self._counts["hits"] += 1
+            else:
+                self._counts["stale_hits"] += 1
+                if base_currency not in self._refreshing:
+                    self._refreshing.add(base_currency)
+                    threading.Thread(target=self._refresh, args=(base_currency,), daemon=True).start()
+        return entry["rates"]
+
+    def _restore(self, base_currency):
+        """Cache the snapshot's table for a base currency and return its entry (None if there is none)"""
+        stored = self.snapshot.get(base_currency) if self.snapshot is not None else None
+        if stored is None:
+            return None
+        rates, fetched_at = stored
+        entry = {"rates": rates, "fetched": time.monotonic() - max(0.0, time.time() - fetched_at),
+                 "fetched_at": fetched_at, "source": "snapshot"}
+        with self._lock:
+            self._counts["snapshot_loads"] += 1
+            return self._entries.setdefault(base_currency, entry)
+
+    def _load(self, base_currency):
+        # Single flight: the first caller fetches, concurrent callers wait for its result
+        with self._lock:
+            flight = self._inflight.get(base_currency)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[base_currency] = {"done": threading.Event(), "rates": None}
+                self._counts["fetches"] += 1
+            else:
+                self._counts["coalesced"] += 1
+        if not leader:
+            flight["done"].wait()
+            return flight["rates"]
+        
+        rates = fetched_at = None
+        try:
+            rates = self.fetch(base_currency)
+            fetched_at = time.time()
+        except Exception:
+            with self._lock:
+                self._counts["failures"] += 1
+            # Another process may have stored this base since the snapshot was last checked
+            if base_currency not in self._entries:
+                restored = self._restore(base_currency)
+                rates = restored["rates"] if restored is not None else None
+        finally:
+            with self._lock:
+                if fetched_at is not None:
+                    self._entries[base_currency] = {"rates": rates, "fetched": time.monotonic(),
+                                                    "fetched_at": fetched_at, "source": "live"}
+                del self._inflight[base_currency]
+            flight["rates"] = rates
+            flight["done"].set()
+        if fetched_at is not None and self.snapshot is not None:
+            try:
+                self.snapshot.store(base_currency, rates, fetched_at)
+            except OSError:
+                # The snapshot is best effort; a read-only disk must not fail the fetch
+                pass
+        return rates
+
+    def _refresh(self, base_currency):
+        try:
+            if self._load(base_currency) is not None:
+                with self._lock:
+                    self._counts["refreshes"] += 1
+        finally:
+            with self._lock:
+                self._refreshing.discard(base_currency)
+
+    def age(self, base_currency):
+        """Seconds since the base currency's table was fetched, or None if not cached"""
+        with self._lock:
+            entry = self._entries.get(base_currency)
+            return time.monotonic() - entry["fetched"] if entry else None
+
+    def fetched_at(self, base_currency):
+        """Wall-clock timestamp of the base currency's last successful fetch, or None"""
+        with self._lock:
+            entry = self._entries.get(base_currency)
+            return entry["fetched_at"] if entry else None
+
+    def source(self, base_currency):
+        """Where the cached table came from: "live", "snapshot" (offline copy) or None if not cached"""
+        with self._lock:
+            entry = self._entries.get(base_currency)
+            return entry["source"] if entry else None
+
+    def stats(self):
+        """Hit/miss counters plus the age in seconds and source of every cached base"""
+        with self._lock:
+            now = time.monotonic()
+            return {
+                **self._counts,
+                "ttl": self.ttl,
+                "ages": {base: now - entry["fetched"] for base, entry in self._entries.items()},
+                "sources": {base: entry["source"] for base, entry in self._entries.items()}
+            }
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+RATE_CACHE = RateCache(snapshot=RATE_SNAPSHOT)
+
+# Concurrent Multi-Base Fetching
+def get_fetch_executor():
+    """Thread pool for concurrent fetches, sized like the connection pool (created on first use)"""
+    global _fetch_executor
+    with _session_lock:
+        if _fetch_executor is None:
+            _fetch_executor = ThreadPoolExecutor(max_workers=POOL_SIZE, thread_name_prefix="commo-fx")
+        return _fetch_executor
+
+async def fetch_rate_tables(base_currencies, timeout=FETCH_TIMEOUT, cache=RATE_CACHE):
+    """Fetch several base-currency tables concurrently through the rate cache
+
+    Every base has its own timeout, so the total wait is bounded by the slowest single
+    fetch rather than the sum. Returns (tables, errors): tables maps each base that was
+    fetched to its rates, errors maps each base that failed or timed out to a reason.
+    """
+    loop = asyncio.get_running_loop()
+    bases = list(dict.fromkeys(base_currencies))
+
+    async def fetch(base_currency):
+        return await asyncio.wait_for(loop.run_in_executor(get_fetch_executor(), cache.get_rates, base_currency),
+                                      timeout)
+
+    outcomes = await asyncio.gather(*(fetch(base) for base in bases), return_exceptions=True)
+    tables, errors = {}, {}
+    for base, outcome in zip(bases, outcomes):
+        if isinstance(outcome, asyncio.TimeoutError):
+            errors[base] = f"timed out after {timeout:g}s"
+        elif isinstance(outcome, Exception):
+            errors[base] = str(outcome) or type(outcome).__name__
+        elif outcome is None:
+            errors[base] = "fetch failed"
+        else:
+            tables[base] = outcome
+    return tables, errors
+
+def get_rate_tables(base_currencies, timeout=FETCH_TIMEOUT):
+    """Blocking wrapper around fetch_rate_tables for code without a running event loop"""
+    return asyncio.run(fetch_rate_tables(base_currencies, timeout))
+
+class RateMatrix:
+    """Cross rates between every pair of currencies, derived from a single base-currency table
+
+    matrix[i, j] is the number of units of currency j bought by one unit of currency i.
+    """
+
+    def __init__(self, base_rates, base_currency=MATRIX_BASE, currencies=None):
+        import numpy as np
+        self.source = base_rates
+        self.base_currency = base_currency
+        self.currencies = list(currencies or CURRENCY_DATA)
+        self.index = {code: i for i, code in enumerate(self.currencies)}
+        per_base = np.array([base_rates.get(code, np.nan) for code in self.currencies], dtype=float)
+        if base_currency in self.index:
+            per_base[self.index[base_currency]] = 1.0
+        self.matrix = per_base[np.newaxis, :] / per_base[:, np.newaxis]
+
+    def rate(self, from_currency, to_currency):
+        """Cross rate for one pair, or None if either currency is not quoted"""
+        rate = float(self.matrix[self.index[from_currency], self.index[to_currency]])
+        return None if math.isnan(rate) else rate
+
+    def indices(self, currencies):
+        """Map an array of currency codes to matrix indices (-1 for unknown codes)"""
+        import numpy as np
+        codes, inverse = np.unique(np.asarray(currencies, dtype=str), return_inverse=True)
+        lookup = np.array([self.index.get(code, -1) for code in codes], dtype=np.intp)
+        return lookup[inverse]
+
+    def convert(self, amounts, from_currencies, to_currencies):
+        """Convert amounts between currencies by indexing the matrix (codes may be scalars or arrays)"""
+        import numpy as np
+        amounts = np.asarray(amounts, dtype=float)
+        from_idx = self.indices(np.broadcast_to(from_currencies, amounts.shape))
+        to_idx = self.indices(np.broadcast_to(to_currencies, amounts.shape))
+        rates = np.where((from_idx < 0) | (to_idx < 0), np.nan, self.matrix[from_idx, to_idx])
+        return amounts * rates
+
+    def rate_vector(self, to_currency):
+        """Units of to_currency bought by one unit of every currency, in self.currencies order"""
+        return self.matrix[:, self.index[to_currency]]
+
+    def ledger(self, amounts, currencies, to_currency):
+        """Convert a ledger of (amount, currency) rows into one reporting currency
+
+        Each distinct code is resolved once (case and surrounding spaces are ignored), then
+        every row gathers its rate from the reporting currency's rate vector. Returns
+        (converted, subtotals): the converted amounts (NaN for unknown currencies) and a frame
+        of row count, native total, rate and converted total per currency, where blank
+        amounts count as zero. Blank or missing codes are subtotalled under "" with a NaN
+        rate, so every row appears in exactly one subtotal.
+        """
+        import numpy as np
+        import pandas as pd
+        amounts = np.asarray(amounts, dtype=float)
+        codes, raw_codes = pd.factorize(np.asarray(currencies, dtype=object), use_na_sentinel=False)
+        merged, codes_seen = pd.factorize(pd.Index(raw_codes, dtype=object).fillna("").astype(str)
+                                          .str.strip().str.upper())
+        codes = merged[codes]
+        # Unknown codes select the trailing NaN rate
+        rows = np.array([self.index.get(code, -1) for code in codes_seen], dtype=np.intp)
+        rates = np.append(self.rate_vector(to_currency), np.nan)[rows]
+        converted = amounts * rates[codes]
+
+        counts = np.bincount(codes, minlength=len(codes_seen))
+        totals = np.bincount(codes, weights=np.where(np.isnan(amounts), 0.0, amounts), minlength=len(codes_seen))
+        subtotals = pd.DataFrame({"currency": codes_seen, "rows": counts, "amount": totals,
+                                  "rate": rates, "converted": totals * rates})
+        return converted, subtotals.sort_values("currency", ignore_index=True)
+
+    def to_frame(self):
+        """The matrix as a labelled DataFrame (rows: from, columns: to)"""
+        import pandas as pd
+        return pd.DataFrame(self.matrix, index=self.currencies, columns=self.currencies)
+
+_matrices = {}
+_matrix_lock = threading.Lock()
+
+def get_rate_matrix(base_currency=MATRIX_BASE):
+    """Cross-rate matrix for CURRENCY_DATA, rebuilt only when the cached base table changes"""
+    rates = RATE_CACHE.get_rates(base_currency)
+    if rates is None:
+        return None
+    with _matrix_lock:
+        matrix = _matrices.get(base_currency)
+        if matrix is None or matrix.source is not rates:
+            matrix = RateMatrix(rates, base_currency)
+            _matrices[base_currency] = matrix
+    return matrix
+
+def get_exchange_rate(from_currency, to_currency):
+    if from_currency in CURRENCY_DATA and to_currency in CURRENCY_DATA:
+        matrix = get_rate_matrix()
+        return matrix.rate(from_currency, to_currency) if matrix is not None else None
+    rates = RATE_CACHE.get_rates(from_currency)
+    if rates is None:
+        return None
+    return rates.get(to_currency, None)
+
+def get_rate_cache_stats():
+    """Cache counters and ages for display"""
+    return RATE_CACHE.stats()
@@ -0,0 +1,161 @@
+"""Historical exchange rates on disk, with vectorized as-of conversion of dated amounts
+
+Rates are stored in one Parquet file laid out column-per-currency: a sorted `date`
+column plus one column of units-per-MATRIX_BASE for every currency. Columns are
+read lazily, only when a conversion first needs that currency. Bulk conversion
+is an as-of join: one searchsorted over the date column finds the rate row in
+force on every amount's date, then the cross rates come from one fancy-indexing
+lookup per side.
+"""
+import os
+import threading
+
+import numpy as np
+
+from .fx import MATRIX_BASE
+
+FX_HISTORY_PATH = os.environ.get("COMMO_FX_HISTORY", "fx_history.parquet")
+
+class RateHistory:
+    """Daily rate tables against MATRIX_BASE, one Parquet column per currency"""
+
+    def __init__(self, path=FX_HISTORY_PATH, base_currency=MATRIX_BASE):
+        self.path = path
+        self.base_currency = base_currency
+        self._dates = None
+        self._columns = {}
+        self._lock = threading.Lock()
+
+    # Reading
+    def _read(self, columns):
+        import pyarrow.parquet as pq
+        return pq.read_table(self.path, columns=columns)
+
+    def exists(self):
+        return os.path.exists(self.path)
+
+    def currencies(self):
+        """Currencies with stored history (reads only the file schema)"""
+        if not self.exists():
+            return []
+        import pyarrow.parquet as pq
+        names = pq.read_schema(self.path).names
+        return sorted(set(name for name in names if name != "date") | {self.base_currency})
+
+    def dates(self):
+        """Sorted datetime64[D] array of the stored dates (loaded on first use)"""
+        with self._lock:
+            if self._dates is None:
+                self._dates = (self._read(["date"]).column("date").to_numpy().astype("datetime64[D]")
+                               if self.exists() else np.array([], dtype="datetime64[D]"))
+            return self._dates
+
+    def column(self, currency):
+        """Units of `currency` per base currency on every stored date (NaN where not quoted)"""
+        dates = self.dates()
+        if currency == self.base_currency:
+            return np.ones(len(dates))
+        with self._lock:
+            if currency not in self._columns:
+                available = self.currencies()
+                self._columns[currency] = (self._read([currency]).column(currency).to_numpy(zero_copy_only=False)
+                                           .astype(float) if currency in available else np.full(len(dates), np.nan))
+            return self._columns[currency]
+
+    # Writing
+    def _invalidate(self):
+        with self._lock:
+            self._dates = None
+            self._columns = {}
+
+    def write_frame(self, frame):
+        """Merge a wide frame (a date column plus one column per currency) into the store
+
+        Rows for dates already stored are replaced. The file is rewritten atomically.
+        """
+        import pandas as pd
+        frame = frame.assign(date=pd.to_datetime(frame["date"]).dt.normalize())
+        if self.exists():
+            stored = self._read(None).to_pandas()
+            stored["date"] = pd.to_datetime(stored["date"])
+            frame = pd.concat([stored[~stored["date"].isin(frame["date"])], frame], ignore_index=True)
+        frame = frame.sort_values("date").drop_duplicates("date", keep="last")
+        frame["date"] = frame["date"].dt.date
+        columns = ["date"] + sorted(c for c in frame.columns if c not in ["date", self.base_currency])
+
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        temporary = f"{self.path}.tmp"
+        pq.write_table(pa.Table.from_pandas(frame[columns], preserve_index=False), temporary, compression="zstd")
+        os.replace(temporary, self.path)
+        self._invalidate()
+
+    def record(self, rates, date=None):
+        """Store one rate table (units per base currency, as returned by the live API) for a date"""
+        import pandas as pd
+        date = pd.Timestamp(date or pd.Timestamp.today()).normalize()
+        self.write_frame(pd.DataFrame([{"date": date, **{code: float(rate) for code, rate in rates.items()}}]))
+
+    def import_long(self, frame, date_column="date", currency_column="currency", rate_column="rate"):
+        """Import rows of (date, currency, units per base currency), e.g. a downloaded rate history"""
+        wide = frame.pivot_table(index=date_column, columns=currency_column, values=rate_column, aggfunc="last")
+        self.write_frame(wide.reset_index().rename(columns={date_column: "date"}))
+
+    # As-of Conversion
+    def asof_index(self, dates, tolerance_days=None):
+        """Row of the latest stored date on or before each date
+
+        -1 where there is none, where the latest is older than the tolerance, or where the
+        date itself is missing (NaT).
+        """
+        stored = self.dates()
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        index = np.searchsorted(stored, dates, side="right") - 1
+        # NaT sorts after every date and would otherwise pick the latest rate
+        index[np.isnat(dates)] = -1
+        if tolerance_days is not None and len(stored):
+            stale = dates - stored[np.maximum(index, 0)] > np.timedelta64(int(tolerance_days), "D")
+            index = np.where(stale, -1, index)
+        return index
+
+    def _side(self, currencies, rows):
+        """Units of each row's currency per base currency, at the given history rows
+
+        Codes are matched after stripping and upper-casing, as in the rate matrix ledger.
+        """
+        import pandas as pd
+        if np.ndim(currencies) == 0:
+            codes, currencies = np.zeros(len(rows), dtype=np.intp), [currencies]
+        else:
+            codes, currencies = pd.factorize(np.asarray(currencies, dtype=object))
+        # The extra row catches dates before the history, the extra column missing codes (-1)
+        block = np.full((len(self.dates()) + 1, len(currencies) + 1), np.nan)
+        for position, currency in enumerate(currencies):
+            block[:-1, position] = self.column(str(currency).strip().upper())
+        return block[rows, codes]
+
+    def rates_asof(self, dates, from_currencies, to_currencies, tolerance_days=None):
+        """Cross rate in force on each date, for scalar or per-row currency codes (NaN if unknown)"""
+        index = self.asof_index(dates, tolerance_days)
+        rows = np.where(index < 0, len(self.dates()), index)
+        return self._side(to_currencies, rows) / self._side(from_currencies, rows)
+
+    def convert(self, amounts, dates, from_currencies, to_currencies, tolerance_days=None):
+        """Convert dated amounts at the rate in force on each date"""
+        return np.asarray(amounts, dtype=float) * self.rates_asof(dates, from_currencies, to_currencies,
+                                                                 tolerance_days)
+
+def convert_dated_frame(frame, to_currency, amount_column="amount", date_column="date",
+                        currency_column="currency", history=None, tolerance_days=None):
+    """Add `rate` and `converted` columns to a frame of dated amounts
+
+    Both are NaN where no rate applies, including rows whose date is blank or unparsable.
+    """
+    import pandas as pd
+    history = history or RATE_HISTORY
+    dates = pd.to_datetime(frame[date_column], errors="coerce").to_numpy().astype("datetime64[D]")
+    rates = history.rates_asof(dates, frame[currency_column].to_numpy(), to_currency, tolerance_days)
+    amounts = pd.to_numeric(frame[amount_column], errors="coerce").to_numpy(dtype=float)
+    return frame.assign(rate=rates, converted=amounts * rates)
+
+RATE_HISTORY = RateHistory()
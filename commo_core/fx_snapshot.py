@@ -0,0 +1,133 @@
+"""Offline copy of the latest rate tables in a compact binary file, read through a memory map
+
+Every table fetched from the rate API is written to one local file, so a cold worker
+has rates without a network round-trip and rates are still served while the API is
+unreachable. Layout (little-endian, every field 8-byte aligned):
+
+    header      b"COMMOFX1", uint32 currency count n, uint32 table count
+    currencies  n codes, ASCII padded to 8 bytes
+    tables      per base currency: code (8 bytes), float64 fetch time (Unix seconds),
+                n float64 rates (NaN where not quoted)
+
+Readers map the file instead of reading it, so worker processes share its pages
+through the OS page cache, and only the requested table is decoded.
+"""
+import math
+import mmap
+import os
+import struct
+import threading
+import time
+
+FX_SNAPSHOT_PATH = os.environ.get("COMMO_FX_SNAPSHOT", "fx_snapshot.bin")
+MAGIC = b"COMMOFX1"
+HEADER = struct.Struct("<8sII")
+CODE_SIZE = 8
+
+def _code(code):
+    return code.encode("ascii").ljust(CODE_SIZE, b"\0")
+
+def _decode(data, offset):
+    return bytes(data[offset:offset + CODE_SIZE]).rstrip(b"\0").decode("ascii")
+
+class RateSnapshot:
+    """Base-currency rate tables persisted to one memory-mapped file (created on first store)"""
+
+    def __init__(self, path=FX_SNAPSHOT_PATH):
+        self.path = path
+        self._lock = threading.Lock()
+        self._map = None
+        self._stamp = None
+        self._currencies = []
+        self._offsets = {}
+
+    # Reading
+    def _close(self):
+        if self._map is not None:
+            self._map.close()
+        self._map, self._stamp, self._currencies, self._offsets = None, None, [], {}
+
+    def _open(self):
+        """Map the file, remapping it if another process has replaced it (call with the lock held)"""
+        try:
+            status = os.stat(self.path)
+            stamp = (status.st_ino, status.st_mtime_ns, status.st_size)
+            if stamp != self._stamp:
+                self._close()
+                with open(self.path, "rb") as handle:
+                    self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+                self._stamp = stamp
+                self._parse()
+        except (OSError, ValueError, struct.error):
+            # Missing, empty or corrupt: behave as if there were no snapshot
+            self._close()
+        return self._map is not None
+
+    def _parse(self):
+        magic, count, tables = HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{self.path} is not an FX snapshot")
+        offset = HEADER.size
+        self._currencies = [_decode(self._map, offset + i * CODE_SIZE) for i in range(count)]
+        offset += count * CODE_SIZE
+        row_size = CODE_SIZE + 8 * (count + 1)
+        if len(self._map) < offset + tables * row_size:
+            raise ValueError(f"{self.path} is truncated")
+        for row in range(tables):
+            self._offsets[_decode(self._map, offset + row * row_size)] = offset + row * row_size
+
+    def _table(self, base_currency):
+        offset = self._offsets[base_currency] + CODE_SIZE
+        fetched_at, *values = struct.unpack_from(f"<{len(self._currencies) + 1}d", self._map, offset)
+        return {code: value for code, value in zip(self._currencies, values) if not math.isnan(value)}, fetched_at
+
+    def get(self, base_currency):
+        """(rates, fetch time in Unix seconds) for a base currency, or None if it is not in the snapshot"""
+        with self._lock:
+            if not self._open() or base_currency not in self._offsets:
+                return None
+            return self._table(base_currency)
+
+    def tables(self):
+        """Fetch time (Unix seconds) of every stored base currency"""
+        with self._lock:
+            if not self._open():
+                return {}
+            return {base: self._table(base)[1] for base in self._offsets}
+
+    # Writing
+    def store(self, base_currency, rates, fetched_at=None):
+        """Add or replace one base currency's table and rewrite the file atomically
+
+        Tables written by other processes since this one last read the file are kept.
+        """
+        with self._lock:
+            tables = {base: self._table(base) for base in self._offsets} if self._open() else {}
+            tables[base_currency] = ({code: float(rate) for code, rate in rates.items()},
+                                     time.time() if fetched_at is None else fetched_at)
+            self._write(tables)
+
+    def _write(self, tables):
+        tables = {base: table for base, table in tables.items() if base.isascii() and len(base) <= CODE_SIZE}
+        currencies = sorted({code for rates, _ in tables.values() for code in rates
+                             if code.isascii() and len(code) <= CODE_SIZE})
+        parts = [HEADER.pack(MAGIC, len(currencies), len(tables)), b"".join(_code(code) for code in currencies)]
+        row = struct.Struct(f"<{len(currencies) + 1}d")
+        for base, (rates, fetched_at) in tables.items():
+            parts.append(_code(base) + row.pack(fetched_at, *(rates.get(code, math.nan) for code in currencies)))
+
+        temporary = f"{self.path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(temporary, "wb") as handle:
+            handle.write(b"".join(parts))
+        os.replace(temporary, self.path)
+
+    def clear(self):
+        """Delete the snapshot file"""
+        with self._lock:
+            self._close()
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
+
+RATE_SNAPSHOT = RateSnapshot() if FX_SNAPSHOT_PATH else None
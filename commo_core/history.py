@@ -0,0 +1,212 @@
+"""Persistent conversion history in a local SQLite file
+
+Writes are queued and committed in batches by a background thread, so recording a
+conversion never waits on disk. Like bookmarks, every row belongs to an owner (a user
+or desk name). Reads page through one owner's history newest first with keyset
+cursors, so the cost of a page does not grow with the size of the history.
+"""
+import atexit
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+from datetime import datetime
+
+from .bookmarks import DEFAULT_OWNER
+
+HISTORY_DB_PATH = os.environ.get("COMMO_HISTORY_DB", "conversion_history.sqlite3")
+FLUSH_INTERVAL = 0.25
+WRITE_BATCH_SIZE = 1000
+log = logging.getLogger(__name__)
+HISTORY_FIELDS = ["category", "commodity", "input_value", "from_unit", "to_unit", "result"]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS conversions (
+    id INTEGER PRIMARY KEY,
+    owner TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    category TEXT,
+    commodity TEXT,
+    input_value REAL,
+    from_unit TEXT,
+    to_unit TEXT,
+    result REAL,
+    params TEXT
+);
+"""
+
+INDEXES = """
+DROP INDEX IF EXISTS idx_conversions_timestamp;
+DROP INDEX IF EXISTS idx_conversions_commodity;
+DROP INDEX IF EXISTS idx_conversions_units;
+CREATE INDEX IF NOT EXISTS idx_conversions_owner ON conversions (owner, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_conversions_owner_commodity ON conversions (owner, commodity, timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_conversions_owner_units ON conversions (owner, from_unit, to_unit, timestamp, id);
+"""
+
+class HistoryStore:
+    """Conversion history backed by SQLite, with batched background writes
+
+    The database file is created on first use. `add` only enqueues; a writer thread
+    commits queued rows every FLUSH_INTERVAL seconds (or WRITE_BATCH_SIZE rows) in one
+    transaction. WAL journaling lets readers run while a batch is being written. If the
+    file cannot be opened, recording is turned off (`enabled` becomes False) and queued
+    rows are dropped, so `flush` never waits on a writer that is gone.
+    """
+
+    def __init__(self, path=HISTORY_DB_PATH, flush_interval=FLUSH_INTERVAL, batch_size=WRITE_BATCH_SIZE):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._queue = queue.Queue()
+        self._writer = None
+        self._lock = threading.Lock()
+        self._queue_lock = threading.Lock()
+        self._initialized = False
+        self.enabled = True
+
+    def _connect(self):
+        connection = sqlite3.connect(self.path, timeout=30)
+        connection.row_factory = sqlite3.Row
+        with self._lock:
+            if not self._initialized:
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.executescript(SCHEMA)
+                columns = [row["name"] for row in connection.execute("PRAGMA table_info(conversions)")]
+                if "owner" not in columns:
+                    # Files written before history was scoped: existing rows go to the default owner
+                    with connection:
+                        connection.execute("ALTER TABLE conversions ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+                        connection.execute("UPDATE conversions SET owner = ?", (DEFAULT_OWNER,))
+                connection.executescript(INDEXES)
+                self._initialized = True
+        return connection
+
+    def _start_writer(self):
+        with self._lock:
+            if self._writer is None:
+                self._writer = threading.Thread(target=self._write_loop, name="commo-history", daemon=True)
+                self._writer.start()
+                atexit.register(self.flush)
+
+    def add(self, conversion, timestamp=None, owner=DEFAULT_OWNER):
+        """Queue one conversion (a dict with HISTORY_FIELDS; other keys are kept as params)"""
+        timestamp = timestamp or datetime.now().isoformat(sep=" ", timespec="seconds")
+        params = {key: value for key, value in conversion.items() if key not in HISTORY_FIELDS}
+        row = (owner, timestamp, *(conversion.get(field) for field in HISTORY_FIELDS),
+               json.dumps(params) if params else None)
+        with self._queue_lock:
+            if not self.enabled:
+                return
+            self._start_writer()
+            self._queue.put(row)
+
+    def _disable(self):
+        """Stop recording and drop every queued row (marking it done, so flush returns)"""
+        with self._queue_lock:
+            self.enabled = False
+        while True:
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._queue.task_done()
+
+    def _write_loop(self):
+        try:
+            connection = self._connect()
+        except (sqlite3.Error, OSError):
+            log.exception("Cannot open conversion history %s; history recording is off", self.path)
+            self._disable()
+            return
+        while True:
+            rows = [self._queue.get()]
+            try:
+                while len(rows) < self.batch_size:
+                    rows.append(self._queue.get(timeout=self.flush_interval))
+            except queue.Empty:
+                pass
+            try:
+                with connection:
+                    connection.executemany(
+                        "INSERT INTO conversions (owner, timestamp, category, commodity, input_value, from_unit, "
+                        "to_unit, result, params) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", rows)
+            except sqlite3.Error:
+                # History is best effort; a failed batch must not stop later writes
+                pass
+            finally:
+                for _ in rows:
+                    self._queue.task_done()
+
+    def flush(self):
+        """Block until every queued conversion has been written"""
+        if self._writer is not None:
+            self._queue.join()
+
+    @staticmethod
+    def _filters(owner=DEFAULT_OWNER, commodity=None, from_unit=None, to_unit=None):
+        """WHERE clauses for one owner (None for every owner) and the optional filters"""
+        clauses, args = [], []
+        for column, value in [("owner", owner), ("commodity", commodity), ("from_unit", from_unit),
+                              ("to_unit", to_unit)]:
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                args.append(value)
+        return clauses, args
+
+    def page(self, limit=10, before=None, owner=DEFAULT_OWNER, commodity=None, from_unit=None, to_unit=None):
+        """One page of an owner's history, newest first
+
+        `before` is the cursor returned with the previous page. Returns (rows, cursor),
+        where cursor is None once there are no older rows.
+        """
+        clauses, args = self._filters(owner, commodity, from_unit, to_unit)
+        if before is not None:
+            clauses.append("(timestamp, id) < (?, ?)")
+            args.extend(before)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        connection = self._connect()
+        try:
+            rows = connection.execute(
+                f"SELECT * FROM conversions {where} ORDER BY timestamp DESC, id DESC LIMIT ?", [*args, limit + 1]
+            ).fetchall()
+        finally:
+            connection.close()
+
+        entries = [self._entry(row) for row in rows[:limit]]
+        cursor = (rows[limit - 1]["timestamp"], rows[limit - 1]["id"]) if len(rows) > limit else None
+        return entries, cursor
+
+    def recent(self, limit=5, **filters):
+        """The newest `limit` conversions"""
+        return self.page(limit, **filters)[0]
+
+    def count(self, owner=DEFAULT_OWNER, commodity=None, from_unit=None, to_unit=None):
+        clauses, args = self._filters(owner, commodity, from_unit, to_unit)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        connection = self._connect()
+        try:
+            return connection.execute(f"SELECT COUNT(*) FROM conversions {where}", args).fetchone()[0]
+        finally:
+            connection.close()
+
+    def clear(self, owner=DEFAULT_OWNER):
+        """Delete one owner's history (after writing anything still queued)"""
+        self.flush()
+        connection = self._connect()
+        try:
+            with connection:
+                return connection.execute("DELETE FROM conversions WHERE owner = ?", (owner,)).rowcount
+        finally:
+            connection.close()
+
+    @staticmethod
+    def _entry(row):
+        entry = {key: row[key] for key in ["id", "owner", "timestamp", *HISTORY_FIELDS]}
+        if row["params"]:
+            entry.update(json.loads(row["params"]))
+        return entry
+
+HISTORY = HistoryStore()
@@ -0,0 +1,67 @@
+"""Opt-in section timing for Streamlit reruns"""
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+TIMING_LOG_PATH = os.environ.get("COMMO_TIMING_LOG", "rerun_timings.jsonl")
+
+_log_lock = threading.Lock()
+
+class RerunTimer:
+    """Collect wall-clock timings of named sections during one script run
+
+    Sections may nest; nested names are joined with " / " so the breakdown keeps
+    its hierarchy. When disabled every section is a no-op.
+    """
+
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        self.started = time.perf_counter()
+        self.sections = []
+        self.finished = False
+        self._stack = []
+
+    @contextmanager
+    def section(self, name):
+        if not self.enabled:
+            yield
+            return
+        self._stack.append(name)
+        entry = {"section": " / ".join(self._stack), "depth": len(self._stack) - 1, "ms": 0.0}
+        self.sections.append(entry)
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            entry["ms"] = (time.perf_counter() - started) * 1e3
+            self._stack.pop()
+
+    def total_ms(self):
+        return (time.perf_counter() - self.started) * 1e3
+
+    def breakdown(self):
+        """Sections in start order with their share of the total rerun time"""
+        total = self.total_ms()
+        return [{**s, "share": s["ms"] / total if total else 0.0} for s in self.sections]
+
+    def as_record(self, **extra):
+        return {
+            "timestamp": datetime.now().isoformat(timespec="milliseconds"),
+            "total_ms": round(self.total_ms(), 3),
+            "sections": {s["section"]: round(s["ms"], 3) for s in self.sections},
+            **extra
+        }
+
+    def finish(self, **extra):
+        """Mark the run as reported and return its record"""
+        self.finished = True
+        return self.as_record(**extra)
+
+def log_timings(record, path=TIMING_LOG_PATH):
+    """Append one rerun's timings to a JSON-lines log file"""
+    with _log_lock:
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(record) + "\n")
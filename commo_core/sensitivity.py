@@ -0,0 +1,112 @@
+"""Quality-parameter sensitivity: sweeps and Monte Carlo draws evaluated in one vectorized pass
+
+Every unit conversion factor scales with the commodity's quality parameter as a power
+law (exponent -1, 0 or 1) of density, calorific value or, for grains, the dry-matter
+ratio implied by the moisture content. The exponent is found once by probing the
+unit graph, after which any number of parameter values is a single NumPy expression
+(NumPy is imported on first use, so the app can check quality_parameter cheaply).
+"""
+import math
+
+from .data import COMMODITY_DATA
+from .units import get_conversion_factor
+
+QUALITY_PARAMETERS = {
+    "Oil & Liquids": "density",
+    "Natural Gas": "calorific_value",
+    "Agricultural": "moisture_content"
+}
+# Physical limits that sampled values are clipped to
+PARAMETER_BOUNDS = {
+    "density": (0.01, None),
+    "calorific_value": (0.01, None),
+    "moisture_content": (0.0, 99.0)
+}
+DISTRIBUTIONS = ["normal", "uniform", "triangular"]
+PERCENTILES = [5, 25, 50, 75, 95]
+
+def quality_parameter(category):
+    """Name of the category's uncertain quality parameter, or None"""
+    return QUALITY_PARAMETERS.get(category)
+
+def _scale(category, commodity, values):
+    # The quantity unit-graph edges are proportional to (dry-matter ratio for moisture)
+    if category == "Agricultural":
+        standard = COMMODITY_DATA[category][commodity]["moisture_content"]
+        return (100 - standard) / (100 - values)
+    return values
+
+def factor_law(category, commodity, from_unit, to_unit, reference):
+    """(factor at the reference value, exponent) so that factor(p) = f0 * (scale(p) / scale(reference)) ** k"""
+    parameter = quality_parameter(category)
+    probe = reference * 0.9
+    f0 = get_conversion_factor(category, from_unit, to_unit, commodity, **{parameter: reference})
+    f1 = get_conversion_factor(category, from_unit, to_unit, commodity, **{parameter: probe})
+    if f0 == f1:
+        return f0, 0
+    ratio = _scale(category, commodity, probe) / _scale(category, commodity, reference)
+    return f0, round(math.log(f1 / f0) / math.log(ratio))
+
+def convert_with_parameters(value, category, commodity, from_unit, to_unit, parameter_values, reference=None):
+    """Convert one value under every parameter value at once"""
+    import numpy as np
+    parameter = quality_parameter(category)
+    if reference is None:
+        reference = COMMODITY_DATA[category][commodity][parameter]
+    f0, exponent = factor_law(category, commodity, from_unit, to_unit, reference)
+    parameter_values = np.asarray(parameter_values, dtype=float)
+    if exponent == 0:
+        return np.full(parameter_values.shape, value * f0)
+    scale = _scale(category, commodity, parameter_values) / _scale(category, commodity, reference)
+    return value * f0 * scale ** exponent
+
+def sample_parameter(center, spread, draws, distribution="normal", low=None, high=None, seed=None):
+    """Draw parameter values around a center (spread is the std dev, or the half-width)
+
+    Draws are clipped to [low, high] when given, so physically impossible values
+    (negative density, moisture of 100%) never reach the conversion.
+    """
+    import numpy as np
+    rng = np.random.default_rng(seed)
+    if distribution == "normal":
+        samples = rng.normal(center, spread, draws)
+    elif distribution == "uniform":
+        samples = rng.uniform(center - spread, center + spread, draws)
+    elif distribution == "triangular":
+        samples = rng.triangular(center - spread, center, center + spread, draws)
+    else:
+        raise ValueError(f"Unknown distribution: {distribution}")
+    if low is not None or high is not None:
+        samples = np.clip(samples, low, high)
+    return samples
+
+def summarize(results, percentiles=PERCENTILES, bins=50):
+    """Percentile bands, mean/std and a histogram of simulated results"""
+    import numpy as np
+    counts, edges = np.histogram(results, bins=bins)
+    return {
+        "mean": float(results.mean()),
+        "std": float(results.std()),
+        "percentiles": dict(zip(percentiles, np.percentile(results, percentiles).tolist())),
+        "histogram": {"counts": counts, "edges": edges}
+    }
+
+def monte_carlo(value, category, commodity, from_unit, to_unit, center=None, spread=None, draws=1_000_000,
+                distribution="normal", seed=None):
+    """Simulate a conversion under an uncertain quality parameter and summarize the spread
+
+    The center defaults to the commodity's reference value and the spread to 2% of it.
+    """
+    parameter = quality_parameter(category)
+    reference = COMMODITY_DATA[category][commodity][parameter]
+    center = reference if center is None else center
+    spread = 0.02 * center if spread is None else spread
+    samples = sample_parameter(center, spread, draws, distribution, *PARAMETER_BOUNDS[parameter], seed=seed)
+    results = convert_with_parameters(value, category, commodity, from_unit, to_unit, samples, reference)
+    return {"parameter": parameter, "draws": draws, **summarize(results)}
+
+def sweep(value, category, commodity, from_unit, to_unit, low, high, steps=101):
+    """Results across an evenly spaced grid of parameter values, as (parameter_values, results)"""
+    import numpy as np
+    grid = np.linspace(low, high, steps)
+    return grid, convert_with_parameters(value, category, commodity, from_unit, to_unit, grid)
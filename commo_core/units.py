@@ -0,0 +1,219 @@
+"""Scalar unit conversions resolved through per-category unit graphs
+
+Every converter is a single multiplication, so passing a NumPy array instead
+of a float converts the whole array at once.
+"""
+from functools import lru_cache
+
+from .data import COMMODITY_DATA, UNIT_CONVERSIONS
+
+# Unit Graph
+# Each category is a graph of unit nodes; an edge (unit, neighbour, factor) means 1 unit = factor neighbour.
+# Edge factors depend on the quality parameters (density, calorific value, moisture), so a graph is
+# compiled per parameter set and every (from_unit, to_unit) pair is resolved to a single multiplier.
+BASE_UNITS = {
+    "Oil & Liquids": "cubic_meters",
+    "Natural Gas": "cubic_meters",
+    "Agricultural": "kilograms",
+    "Power/Electricity": "gj"
+}
+# Gases quoted as liquids: calorific value in MJ/kg, and volumes are liquid volumes at the reference density
+LIQUEFIED_GASES = {"LNG"}
+
+def get_unit_edges(category, commodity=None, density=None, calorific_value=None, moisture_content=None):
+    """List the (unit, neighbour, factor) edges of a category's unit graph"""
+    if category == "Oil & Liquids":
+        if density is None:
+            density = 0.85
+        return [
+            ("barrels", "cubic_meters", UNIT_CONVERSIONS["barrels"]),
+            ("gallons", "cubic_meters", UNIT_CONVERSIONS["gallons"]),
+            ("liters", "cubic_meters", UNIT_CONVERSIONS["liters"]),
+            ("metric tons", "cubic_meters", 1 / density)
+        ]
+    elif category == "Natural Gas" and commodity in LIQUEFIED_GASES:
+        properties = COMMODITY_DATA[category][commodity]
+        if calorific_value is None:
+            calorific_value = properties["calorific_value"]
+        return [
+            ("gallons", "cubic_meters", UNIT_CONVERSIONS["gallons"]),
+            ("metric tons", "cubic_meters", 1 / properties["density"]),
+            ("mmbtu", "metric tons", UNIT_CONVERSIONS["mmbtu"] / calorific_value),
+            ("therms", "metric tons", UNIT_CONVERSIONS["therms"] / calorific_value)
+        ]
+    elif category == "Natural Gas":
+        if calorific_value is None:
+            calorific_value = 38.7
+        return [
+            ("mcf", "cubic_meters", UNIT_CONVERSIONS["mcf"]),
+            ("bcf", "cubic_meters", UNIT_CONVERSIONS["bcf"]),
+            ("mmbtu", "cubic_meters", 1000 / calorific_value),
+            ("therms", "cubic_meters", 100 / calorific_value)
+        ]
+    elif category == "Agricultural":
+        moisture_factor = 1.0
+        if moisture_content is not None:
+            standard_moisture = COMMODITY_DATA["Agricultural"][commodity]["moisture_content"]
+            moisture_factor = (100 - standard_moisture) / (100 - moisture_content)
+        kg_per_bushel = UNIT_CONVERSIONS["bushels"].get(commodity.lower(), 25.4) if commodity else 25.4
+        return [
+            ("bushels", "kilograms", kg_per_bushel * moisture_factor),
+            ("metric tons", "kilograms", 1000),
+            ("pounds", "kilograms", 0.453592)
+        ]
+    elif category == "Power/Electricity":
+        return [(unit, "gj", UNIT_CONVERSIONS[unit]) for unit in ["mwh", "kwh", "gwh", "mmbtu", "therms"]]
+    elif category == "Coal":
+        if calorific_value is None:
+            calorific_value = 6000
+        # The calorific value (kcal/kg) ties mass to energy, as it ties volume to energy for gas
+        return [
+            ("short tons", "metric tons", UNIT_CONVERSIONS["short tons"]),
+            ("metric tons", "kcal", calorific_value * 1000),
+            ("mmbtu", "kcal", UNIT_CONVERSIONS["mmbtu"] / UNIT_CONVERSIONS["kcal"])
+        ]
+    return []
+
+@lru_cache(maxsize=512)
+def compile_unit_graph(category, commodity=None, density=None, calorific_value=None, moisture_content=None):
+    """Compile a category's unit graph into node weights and a pairwise factor table"""
+    adjacency = {}
+    for unit, neighbour, factor in get_unit_edges(category, commodity, density, calorific_value, moisture_content):
+        adjacency.setdefault(unit, []).append((neighbour, factor))
+        adjacency.setdefault(neighbour, []).append((unit, 1 / factor))
+    
+    # Walk each connected component once, weighting every node in units of the component root
+    nodes = {}
+    for root in adjacency:
+        if root in nodes:
+            continue
+        nodes[root] = (root, 1.0)
+        stack = [root]
+        while stack:
+            unit = stack.pop()
+            weight = nodes[unit][1]
+            for neighbour, factor in adjacency[unit]:
+                if neighbour not in nodes:
+                    nodes[neighbour] = (root, weight / factor)
+                    stack.append(neighbour)
+    
+    units = set(nodes)
+    for properties in COMMODITY_DATA.get(category, {}).values():
+        units.update(properties["units"])
+    
+    graph = {"category": category, "nodes": nodes, "factors": {}}
+    for from_unit in units:
+        for to_unit in units:
+            graph["factors"][(from_unit, to_unit)] = _resolve_factor(graph, from_unit, to_unit)
+    return graph
+
+def _resolve_factor(graph, from_unit, to_unit):
+    """Multiplier between two nodes; units in different components pass values through unchanged"""
+    if from_unit == to_unit:
+        return 1.0
+    # Units without an edge are read as the category's base unit (Coal has none, so they pass through)
+    nodes = graph["nodes"]
+    base = BASE_UNITS.get(graph["category"])
+    from_root, from_weight = nodes.get(from_unit, nodes.get(base, (from_unit, 1.0)))
+    to_root, to_weight = nodes.get(to_unit, nodes.get(base, (to_unit, 1.0)))
+    if from_root != to_root:
+        return 1.0
+    return from_weight / to_weight
+
+def _graph_key(category, commodity=None, density=None, calorific_value=None, moisture_content=None):
+    """The compile_unit_graph arguments a category's edges depend on, so equal graphs share one cache entry"""
+    if category == "Oil & Liquids":
+        return (category, None, density, None, None)
+    elif category == "Natural Gas":
+        return (category, commodity if commodity in LIQUEFIED_GASES else None, None, calorific_value, None)
+    elif category == "Coal":
+        return (category, None, None, calorific_value, None)
+    elif category == "Agricultural":
+        return (category, commodity, None, None, moisture_content)
+    return (category, None, None, None, None)
+
+def get_conversion_factor(category, from_unit, to_unit, commodity=None, density=None,
+                          calorific_value=None, moisture_content=None):
+    """Look up the single multiplier converting from_unit to to_unit"""
+    key = _graph_key(category, commodity, density, calorific_value, moisture_content)
+    # Default quality parameters hit the precompiled index; overrides compile (and cache) their own graph
+    factors = UNIT_FACTOR_INDEX.get(key)
+    if factors is None:
+        factors = compile_unit_graph(*key)["factors"]
+    factor = factors.get((from_unit, to_unit))
+    if factor is None:
+        factor = _resolve_factor(compile_unit_graph(*key), from_unit, to_unit)
+    return factor
+
+def compile_factor_index():
+    """Precompile the factor table of every commodity at its default quality parameters, keyed by _graph_key"""
+    index = {}
+    for category, commodities in COMMODITY_DATA.items():
+        for commodity, properties in commodities.items():
+            key = _graph_key(category, commodity, properties.get("density"), properties.get("calorific_value"),
+                            properties.get("moisture_content"))
+            index[key] = compile_unit_graph(*key)["factors"]
+    return index
+
+UNIT_FACTOR_INDEX = compile_factor_index()
+
+# Unit Conversion Functions
+def calculate_density_from_api(api_gravity):
+    """Calculate density from API gravity"""
+    return 141.5 / (131.5 + api_gravity)
+
+def calculate_api_from_density(density):
+    """Calculate API gravity from density"""
+    return 141.5 / density - 131.5
+
+def convert_oil_units(value, from_unit, to_unit, density=None, api_gravity=None):
+    if density is None and api_gravity is not None:
+        density = calculate_density_from_api(api_gravity)
+    elif density is None:
+        density = 0.85
+    
+    return value * get_conversion_factor("Oil & Liquids", from_unit, to_unit, density=density)
+
+def convert_gas_units(value, from_unit, to_unit, calorific_value=None, commodity=None):
+    if calorific_value is None and commodity not in LIQUEFIED_GASES:
+        calorific_value = 38.7
+    
+    return value * get_conversion_factor("Natural Gas", from_unit, to_unit, commodity, calorific_value=calorific_value)
+
+def convert_agricultural_units(value, from_unit, to_unit, commodity, moisture_content=None):
+    return value * get_conversion_factor("Agricultural", from_unit, to_unit, commodity,
+                                         moisture_content=moisture_content)
+
+def convert_power_units(value, from_unit, to_unit):
+    return value * get_conversion_factor("Power/Electricity", from_unit, to_unit)
+
+def convert_coal_units(value, from_unit, to_unit, calorific_value=None):
+    if calorific_value is None:
+        calorific_value = 6000
+    
+    return value * get_conversion_factor("Coal", from_unit, to_unit, calorific_value=calorific_value)
+
+def convert_units(value, category, commodity, from_unit, to_unit, density=None, calorific_value=None,
+                  moisture_content=None):
+    """Convert a value for any commodity, using its default quality parameters unless overridden"""
+    if from_unit == to_unit:
+        return value
+    
+    properties = COMMODITY_DATA[category][commodity]
+    if category == "Oil & Liquids":
+        return convert_oil_units(value, from_unit, to_unit,
+                                 density=density if density is not None else properties["density"])
+    elif category == "Natural Gas":
+        return convert_gas_units(value, from_unit, to_unit,
+                                 calorific_value=calorific_value if calorific_value is not None else properties["calorific_value"],
+                                 commodity=commodity)
+    elif category == "Agricultural":
+        return convert_agricultural_units(value, from_unit, to_unit, commodity,
+                                          moisture_content=moisture_content if moisture_content is not None else properties["moisture_content"])
+    elif category == "Power/Electricity":
+        return convert_power_units(value, from_unit, to_unit)
+    elif category == "Coal":
+        return convert_coal_units(value, from_unit, to_unit,
+                                  calorific_value=calorific_value if calorific_value is not None else properties["calorific_value"])
+    else:
+        return value
@@ -0,0 +1,42 @@
+"""Shared test setup: every persistent store lives in a temporary directory and no test reaches the network"""
+import io
+import os
+import sys
+import tempfile
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+STATE_DIR = tempfile.mkdtemp(prefix="commo-tests-")
+os.environ.update({
+    "COMMO_HISTORY_DB": os.path.join(STATE_DIR, "conversion_history.sqlite3"),
+    "COMMO_BOOKMARKS_DB": os.path.join(STATE_DIR, "bookmarks.sqlite3"),
+    "COMMO_FX_HISTORY": os.path.join(STATE_DIR, "fx_history.parquet"),
+    "COMMO_FX_SNAPSHOT": os.path.join(STATE_DIR, "fx_snapshot.bin"),
+    "COMMO_FX_URL": "http://127.0.0.1:9/latest/{base}"
+})
+
+class Upload(io.BytesIO):
+    """In-memory stand-in for a Streamlit UploadedFile"""
+
+    def __init__(self, name, data):
+        super().__init__(data)
+        self.name = name
+
+@pytest.fixture
+def uploads(monkeypatch):
+    """Files handed to the apps' uploaders, keyed by widget key (or label when there is none)
+
+    AppTest cannot drive st.file_uploader, so the uploader is replaced for the test.
+    """
+    import streamlit as st
+    files = {}
+
+    def file_uploader(label, *args, **kwargs):
+        upload = files.get(kwargs.get("key") or label)
+        return Upload(*upload) if upload else None
+
+    monkeypatch.setattr(st, "file_uploader", file_uploader)
+    return files
@@ -0,0 +1,115 @@
+import asyncio
+import json
+
+import pytest
+
+from commo_core import api, convert_units, fx
+from commo_core.api import ConversionServer, MicroBatcher, RequestError, parse_unit_request
+
+BRENT = {"commodity": "Brent Crude", "from_unit": "barrels", "to_unit": "metric tons"}
+
+def dispatch(payload, path="/convert", method="POST"):
+    async def run():
+        server = ConversionServer(window=0.001)
+        return await server.dispatch(method, path, payload if isinstance(payload, bytes) else json.dumps(payload))
+    return asyncio.run(run())
+
+def test_convert_matches_convert_units():
+    status, body = dispatch({**BRENT, "value": 1000, "density": 0.9})
+    assert status == 200
+    assert body["result"] == pytest.approx(convert_units(1000, "Oil & Liquids", "Brent Crude", "barrels",
+                                                         "metric tons", density=0.9))
+
+@pytest.mark.parametrize("body, message", [
+    (b'{"commodity": "Brent Crude", "from_unit": "barrels", "to_unit": "metric tons", "value": NaN}',
+     "'value' must be a finite number"),
+    (b'{"commodity": "Brent Crude", "from_unit": "barrels", "to_unit": "metric tons", "value": -Infinity}',
+     "'value' must be a finite number"),
+    (b'{"commodity": "Brent Crude", "from_unit": "barrels", "to_unit": "metric tons", "value": 1' + b"0" * 400 + b"}",
+     "'value' is too large"),
+    (json.dumps({**BRENT, "value": "1000"}).encode(), "'value' must be a number"),
+    (json.dumps({**BRENT, "value": True}).encode(), "'value' must be a number"),
+    (json.dumps({**BRENT, "value": 1, "density": 0}).encode(), "'density' must be positive"),
+    (json.dumps({"commodity": "Wheat", "from_unit": "bushels", "to_unit": "metric tons", "value": 1,
+                 "moisture_content": 100}).encode(), "'moisture_content' must be a percentage below 100"),
+    (json.dumps({**BRENT, "from_unit": "kwh", "value": 1}).encode(), "'from_unit' must be one of"),
+    (b"[1, 2]", "Request body must be a JSON object"),
+    (b"{", "Invalid JSON")
+])
+def test_bad_requests_are_answered_with_400(body, message):
+    status, payload = dispatch(body)
+    assert status == 400
+    assert payload["error"].startswith(message)
+
+@pytest.mark.filterwarnings("ignore:overflow")
+def test_overflowing_results_are_rejected():
+    status, payload = dispatch({**BRENT, "from_unit": "metric tons", "to_unit": "barrels", "value": 1.7e308})
+    assert (status, payload) == (400, {"error": "Result is out of range"})
+
+def test_unexpected_errors_are_answered_with_500(monkeypatch):
+    def broken(payload):
+        raise KeyError("boom")
+    monkeypatch.setattr(api, "parse_unit_request", broken)
+    assert dispatch({**BRENT, "value": 1}) == (500, {"error": "Internal error: KeyError"})
+
+def test_routing():
+    assert dispatch({}, "/nowhere")[0] == 404
+    assert dispatch({}, "/convert", "GET")[0] == 405
+    assert dispatch(b"", "/health", "GET")[0] == 200
+
+def test_currency_uses_the_rate_matrix(monkeypatch):
+    monkeypatch.setattr(fx, "get_rate_matrix", lambda: fx.RateMatrix({"EUR": 0.5}, "USD"))
+    status, body = dispatch({"from_currency": "USD", "to_currency": "EUR", "amount": 10}, "/currency")
+    assert (status, body["result"]) == (200, 5.0)
+    status, body = dispatch({"from_currency": "USD", "to_currency": "JPY", "amount": 10}, "/currency")
+    assert status == 503
+    monkeypatch.setattr(fx, "get_rate_matrix", lambda: None)
+    assert dispatch({"from_currency": "USD", "to_currency": "EUR", "amount": 10}, "/currency")[0] == 503
+
+def test_micro_batcher_groups_concurrent_items_and_fails_them_individually():
+    calls = []
+
+    def process(items):
+        calls.append(items)
+        return [RequestError("odd") if item % 2 else item * 10 for item in items]
+
+    async def run():
+        batcher = MicroBatcher(process, window=0.01, max_batch=100)
+        return await asyncio.gather(*(batcher.submit(item) for item in range(4)), return_exceptions=True)
+
+    results = asyncio.run(run())
+    assert calls == [[0, 1, 2, 3]]
+    assert results[0] == 0 and results[2] == 20
+    assert all(isinstance(results[i], RequestError) for i in [1, 3])
+
+def test_parse_unit_request_fills_optional_quality():
+    item = parse_unit_request({**BRENT, "value": 5})
+    assert item["value"] == 5.0 and item["density"] is None and item["category"] == "Oil & Liquids"
+
+def test_non_finite_payloads_are_not_serialized():
+    class Writer:
+        def write(self, data):
+            self.data = data
+
+    writer = Writer()
+    ConversionServer.write_response(writer, 200, {"result": float("nan")})
+    head, body = writer.data.split(b"\r\n\r\n")
+    assert head.startswith(b"HTTP/1.1 500 ") and json.loads(body) == {"error": "Internal error: non-finite result"}
+
+def test_micro_batcher_holds_running_batches_until_they_finish():
+    async def process(items):
+        await asyncio.sleep(0.01)
+        return items
+
+    async def run():
+        batcher = MicroBatcher(process, window=0.001, max_batch=2)
+        submitted = [asyncio.ensure_future(batcher.submit(item)) for item in range(5)]
+        await asyncio.sleep(0)
+        running = len(batcher._tasks)
+        results = await asyncio.gather(*submitted)
+        await asyncio.sleep(0)
+        return running, results, batcher
+
+    running, results, batcher = asyncio.run(run())
+    assert running == 2 and results == [0, 1, 2, 3, 4]
+    assert batcher.batches == 3 and not batcher._tasks
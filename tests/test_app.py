@@ -0,0 +1,164 @@
+"""Smoke tests that run the Streamlit apps headless with AppTest"""
+import os
+import tempfile
+
+import pytest
+from streamlit.testing.v1 import AppTest
+
+from commo_core import batch_options
+from conftest import ROOT
+
+ENHANCED_APP = os.path.join(ROOT, "CONVERSION_APP_ENHANCED.py")
+BATCH_UPLOAD = "Upload CSV, Parquet or Arrow file"
+
+def run_app(path=ENHANCED_APP):
+    at = AppTest.from_file(path, default_timeout=120).run()
+    assert not at.exception
+    return at
+
+def widget(elements, label):
+    return next(element for element in elements if element.label == label)
+
+def click(at, label):
+    widget(at.button, label).click().run()
+    assert not at.exception
+    return at
+
+@pytest.mark.parametrize("path", ["CONVERSION_APP.py", "CONVERSION_APP_ENHANCED.py"])
+def test_apps_render(path):
+    run_app(os.path.join(ROOT, path))
+
+def test_streaming_batch_serves_result_file_from_disk(uploads):
+    uploads[BATCH_UPLOAD] = ("volumes.csv", b"volume\n1000\n2000\nabc\n")
+    at = run_app()
+    widget(at.radio, "Input Method:").set_value("Upload File").run()
+    at.checkbox(key="batch_stream").check().run()
+    click(at, "🔄 Convert Batch")
+
+    assert [error.value for error in at.error] == ["Skipped 1 non-numeric value(s)"]
+    assert at.get("download_button")
+    path = at.session_state["batch_result_path"]
+    with open(path) as f:
+        assert f.read().splitlines() == ["Input,From Unit,Result,To Unit", "1000.0,barrels,1000.0,barrels",
+                                         "2000.0,barrels,2000.0,barrels"]
+
+    # The file outlives reruns, so the button can be clicked again, and is removed at exit
+    at.run()
+    assert os.path.exists(path) and path in batch_options.RESULT_FILES
+
+    # A new conversion replaces the previous result file
+    click(at, "🔄 Convert Batch")
+    assert at.session_state["batch_result_path"] != path
+    assert not os.path.exists(path) and path not in batch_options.RESULT_FILES
+    assert at.session_state["batch_result_path"] in batch_options.RESULT_FILES
+
+def test_parallel_batch_serves_result_file_and_removes_upload_copy(uploads, monkeypatch):
+    # The workers input is capped at DEFAULT_WORKERS; two processes also run on a single CPU
+    monkeypatch.setattr(batch_options, "DEFAULT_WORKERS", max(batch_options.DEFAULT_WORKERS, 2))
+    uploads[BATCH_UPLOAD] = ("volumes.csv", b"volume\n" + b"".join(b"%d\n" % i for i in range(1, 1001)))
+    temp_files = set(os.listdir(tempfile.gettempdir()))
+    at = run_app()
+    widget(at.radio, "Input Method:").set_value("Upload File").run()
+    at.checkbox(key="batch_stream").check().run()
+    at.number_input(key="batch_workers").set_value(2).run()
+    click(at, "🔄 Convert Batch")
+
+    assert at.get("download_button")
+    path = at.session_state["batch_result_path"]
+    with open(path) as f:
+        lines = f.read().splitlines()
+    assert len(lines) == 1001 and lines[1] == "1.0,barrels,1.0,barrels" and lines[-1] == "1000.0,barrels,1000.0,barrels"
+    # Only the result file is left behind, and it is closed
+    assert set(os.listdir(tempfile.gettempdir())) - temp_files == {os.path.basename(path)}
+
+def test_dated_conversion_reports_unconverted_rows(uploads):
+    import pandas as pd
+    from commo_core.fx_history import RATE_HISTORY
+    RATE_HISTORY.import_long(pd.DataFrame({"date": ["2024-01-01"], "currency": ["EUR"], "rate": [0.5]}))
+    uploads["fx_dated_file"] = ("amounts.csv", b"date,amount,currency\n2024-01-02,10,EUR\n,10,EUR\n"
+                                               b"garbage,10,EUR\n2023-12-31,10,EUR\n")
+    try:
+        at = run_app()
+        at.selectbox(key="fx_dated_target").set_value("USD").run()
+        click(at, "📅 Convert at Historical Rates")
+    finally:
+        os.remove(RATE_HISTORY.path)
+        RATE_HISTORY._invalidate()
+
+    assert [warning.value for warning in at.warning] == [
+        "3 row(s) were not converted and are excluded from the total: 2 with a blank or unparsable date, "
+        "1 with no rate for their currency on or before their date"]
+    assert widget(at.metric, "Total (USD)").value == "20.00"
+
+def test_auto_calculate_records_history_only_when_inputs_change():
+    from commo_core.history import HISTORY
+
+    def recorded(at):
+        HISTORY.flush()
+        return HISTORY.count()
+
+    at = run_app()
+    start = recorded(at)
+    at.run()
+    at.run()
+    assert recorded(at) == start
+    widget(at.number_input, "Value:").set_value(2.0).run()
+    assert recorded(at) == start + 1
+    assert HISTORY.recent(1)[0]["input_value"] == 2.0
+
+    # Without auto-calculate every click on Convert is recorded
+    widget(at.checkbox, "Auto-calculate on input change").uncheck().run()
+    click(at, "🔄 Convert")
+    click(at, "🔄 Convert")
+    assert recorded(at) == start + 3
+
+def test_deleting_bookmarks_needs_confirmation_and_spares_unlisted_ones():
+    from commo_core.bookmarks import BOOKMARKS, DEFAULT_OWNER
+    for name in ["brent daily", "brent monthly", "wti daily"]:
+        BOOKMARKS.save({"name": name, "category": "Oil", "commodity": "Brent Crude", "from_unit": "barrels",
+                        "to_unit": "metric tons", "value": 1000})
+    try:
+        at = run_app()
+        widget(at.text_input, "Search bookmarks:").input("brent").run()
+        click(at, "🗑️ Delete Shown Bookmarks")
+        assert BOOKMARKS.count() == 3
+        click(at, "Cancel")
+        assert BOOKMARKS.count() == 3
+
+        click(at, "🗑️ Delete Shown Bookmarks")
+        click(at, "Delete")
+        assert [bookmark["name"] for bookmark in BOOKMARKS.search()] == ["wti daily"]
+    finally:
+        BOOKMARKS.clear(DEFAULT_OWNER)
+
+@pytest.fixture
+def live_rates(monkeypatch):
+    """Serve fixed USD rates instead of the rate API, recording every fetch"""
+    from commo_core import fx
+    fetches = []
+
+    def get_rates(base_currency):
+        fetches.append(base_currency)
+        return {"EUR": 0.5, "GBP": 0.25}
+
+    monkeypatch.setattr(fx.RATE_CACHE, "get_rates", get_rates)
+    return fetches
+
+def test_ledger_checks_columns_before_fetching_rates(uploads, live_rates):
+    uploads["ledger_file"] = ("ledger.csv", b"amt,ccy\n1,USD\n")
+    at = click(run_app(), "📒 Convert Ledger")
+    assert [error.value for error in at.error] == ["Missing column(s): amount, currency"]
+    assert live_rates == []
+
+def test_ledger_reports_unconverted_rows_next_to_the_total(uploads, live_rates):
+    uploads["ledger_file"] = ("ledger.csv", b"amount,currency\n100,USD\n50,eur\n7,XXX\n3,\nabc,GBP\n")
+    at = run_app()
+    at.selectbox(key="ledger_currency").set_value("USD").run()
+    click(at, "📒 Convert Ledger")
+    assert live_rates
+    assert widget(at.metric, "Total (USD)").value == "200.00"
+    assert widget(at.metric, "Rows converted").value == "2 of 5"
+    assert widget(at.metric, "Unconverted rows").value == "3"
+    assert [warning.value for warning in at.warning] == [
+        "2 row(s) excluded from the total, no rate for: (blank) (1 rows, 3.00), XXX (1 rows, 7.00)",
+        "1 row(s) with a blank or non-numeric amount excluded from the total"]
@@ -0,0 +1,143 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from commo_core import convert_units
+from commo_core.batch import (
+    BatchResult,
+    convert_batch,
+    convert_csv_parallel,
+    convert_csv_stream,
+    convert_mixed_batch,
+    merge_batch_summaries,
+    read_column_names,
+    read_table,
+    read_value_column,
+    summarize_batch,
+    to_value_array,
+    write_result_frame
+)
+from commo_core.batch_options import (
+    OUTPUT_FORMATS,
+    RESULT_FILES,
+    detect_file_format,
+    keep_result_file,
+    remove_result_file,
+    remove_result_files
+)
+
+TONNES = convert_units(1.0, "Oil & Liquids", "Brent Crude", "barrels", "metric tons")
+
+def brent(values):
+    inputs = to_value_array(values)
+    return BatchResult(inputs, convert_batch(inputs, "Oil & Liquids", "Brent Crude", "barrels", "metric tons"),
+                       "barrels", "metric tons")
+
+def test_values_are_coerced_to_floats():
+    np.testing.assert_array_equal(to_value_array(["1", " 2", "x", None, 3]), [1, 2, np.nan, np.nan, 3])
+
+def test_batch_result_keeps_valid_rows_in_one_float64_block():
+    batch = brent(["10", "abc", 30, None, 0])
+    assert (len(batch), batch.invalid) == (3, 2)
+    assert batch.values.dtype == np.float64 and batch.values.nbytes == 16 * len(batch)
+    np.testing.assert_allclose(batch.results, np.array([10, 30, 0]) * TONNES)
+    frame = batch.frame()
+    assert frame.columns.tolist() == ["Input", "From Unit", "Result", "To Unit"]
+    assert frame["From Unit"].tolist() == ["barrels"] * 3 and frame["To Unit"].cat.categories.tolist() == ["metric tons"]
+
+def test_summary_matches_numpy_and_skips_zero_inputs_in_the_mean_ratio():
+    inputs = np.array([0.0, 2.0, 4.0, 8.0])
+    results = np.array([1.0, 1.0, 1.0, 4.0])
+    summary = summarize_batch(np.stack([inputs, results]))
+    assert summary["rows"] == 4 and summary["ratio_rows"] == 3
+    assert (summary["total_input"], summary["total_output"]) == (14.0, 7.0)
+    assert summary["ratio"] == 0.5
+    assert summary["mean_ratio"] == pytest.approx(np.mean([0.5, 0.25, 0.5]))
+    assert (summary["min_input"], summary["max_input"], summary["min_output"], summary["max_output"]) == (0, 8, 1, 4)
+    assert summary["input_percentiles"] == dict(zip([5, 25, 50, 75, 95], np.percentile(inputs, [5, 25, 50, 75, 95])))
+
+def test_empty_summary():
+    summary = summarize_batch(np.empty((2, 0)))
+    assert summary["rows"] == 0 and np.isnan(summary["ratio"]) and np.isnan(summary["mean_ratio"])
+    assert merge_batch_summaries([summary])["rows"] == 0
+
+def test_merged_chunk_summaries_equal_the_whole_batch():
+    values = np.random.default_rng(1).uniform(-10, 1000, 1000)
+    values[::97] = 0
+    whole = brent(values).summary()
+    merged = merge_batch_summaries([brent(chunk).summary(percentiles=[]) for chunk in np.array_split(values, 7)])
+    for key, value in merged.items():
+        assert value == pytest.approx(whole[key]), key
+
+def test_mixed_batch_converts_each_row_with_its_own_commodity_and_quality():
+    frame = pd.DataFrame({
+        "value": [1000, 1000, "x", 1000, 1000],
+        "commodity": ["Brent Crude", "Brent Crude", "Brent Crude", "Nope", "Wheat"],
+        "from_unit": ["barrels", "barrels", "barrels", "barrels", "barrels"],
+        "to_unit": ["metric tons", "metric tons", "metric tons", "metric tons", "metric tons"],
+        "density": [None, 0.9, None, None, None]
+    })
+    results = convert_mixed_batch(frame)
+    assert results[0] == pytest.approx(1000 * TONNES)
+    assert results[1] == pytest.approx(convert_units(1000, "Oil & Liquids", "Brent Crude", "barrels",
+                                                     "metric tons", density=0.9))
+    assert np.isnan(results[2:]).all()
+
+def test_stream_and_parallel_conversions_agree(tmp_path):
+    text = "volume\n" + "".join(f"{i}\n" for i in range(1, 2001)) + "abc\n"
+    path = tmp_path / "volumes.csv"
+    path.write_text(text)
+    conversion = ("volume", "Oil & Liquids", "Brent Crude", "barrels", "metric tons")
+    streamed, stream_summary = convert_csv_stream(io.StringIO(text), *conversion, chunk_size=300)
+    parallel, parallel_summary = convert_csv_parallel(str(path), *conversion, workers=2, shards=3)
+    assert streamed.read() == parallel.read()
+    for key in ["rows", "invalid", "total_input", "total_output", "mean_ratio", "min_input", "max_output"]:
+        assert stream_summary[key] == pytest.approx(parallel_summary[key]), key
+    assert (stream_summary["rows"], stream_summary["invalid"]) == (2000, 1)
+    assert stream_summary["total_input"] == 2000 * 2001 / 2
+    assert len(stream_summary["preview"]) == 20
+    assert len(parallel_summary["shards"]) == 3
+    assert sum(shard["rows"] for shard in parallel_summary["shards"]) == 2000
+
+@pytest.mark.parametrize("file_format", ["csv", "parquet", "arrow"])
+def test_result_files_round_trip(file_format):
+    frame = brent([10, 20.5, "x", 1e9]).frame()
+    data = write_result_frame(frame, file_format)
+    assert isinstance(data, str if file_format == "csv" else bytes)
+    source = io.StringIO(data) if file_format == "csv" else io.BytesIO(data)
+    assert read_column_names(source, file_format) == ["Input", "From Unit", "Result", "To Unit"]
+    # Reading the names rewinds the source for the next read
+    table = read_table(source, file_format)
+    pd.testing.assert_frame_equal(table.astype({"From Unit": str, "To Unit": str}),
+                                  frame.astype({"From Unit": str, "To Unit": str}), check_exact=False)
+    source.seek(0)
+    values = read_value_column(source, "Result", file_format)
+    np.testing.assert_allclose(values, frame["Result"])
+
+def test_columnar_files_read_only_the_requested_column(tmp_path):
+    frame = pd.DataFrame({"value": [1.0, 2.0], "commodity": ["Wheat", "Corn"], "note": ["a", "b"]})
+    for file_format, extension in [("parquet", ".parquet"), ("arrow", ".feather")]:
+        path = tmp_path / f"lots{extension}"
+        path.write_bytes(write_result_frame(frame, file_format))
+        assert detect_file_format(path.name) == file_format
+        assert read_column_names(str(path), file_format) == ["value", "commodity", "note"]
+        assert read_table(str(path), file_format, columns=["value"]).columns.tolist() == ["value"]
+        pd.testing.assert_frame_equal(read_table(str(path), file_format), frame)
+
+def test_output_formats_match_the_writers():
+    assert [options["format"] for options in OUTPUT_FORMATS.values()] == ["csv", "parquet", "arrow"]
+    assert detect_file_format("LOTS.PQ") == "parquet" and detect_file_format("lots.ipc") == "arrow"
+    assert detect_file_format("lots.txt") == "csv"
+
+def test_result_files_are_removed_at_exit(tmp_path):
+    paths = [tmp_path / f"result{i}.csv" for i in range(3)]
+    for path in paths:
+        path.write_text("Input\n")
+        keep_result_file(str(path))
+    remove_result_file(str(paths[0]))
+    remove_result_file(str(paths[0]))
+    remove_result_files()
+    assert not any(path.exists() for path in paths)
+    assert not RESULT_FILES & {str(path) for path in paths}
@@ -0,0 +1,35 @@
+import pytest
+
+from commo_core.bookmarks import BookmarkStore
+
+def bookmark(name, commodity="Brent Crude", value=1000):
+    return {"name": name, "category": "Oil", "commodity": commodity, "from_unit": "barrels",
+            "to_unit": "metric tons", "value": value}
+
+@pytest.fixture
+def bookmarks(tmp_path):
+    bookmarks = BookmarkStore(str(tmp_path / "bookmarks.sqlite3"))
+    for name in ["brent daily", "brent monthly", "wti daily"]:
+        bookmarks.save(bookmark(name), owner="crude")
+    bookmarks.save(bookmark("henry hub", "Henry Hub"), owner="gas")
+    return bookmarks
+
+def test_save_replaces_by_owner_and_name(bookmarks):
+    bookmarks.save({**bookmark("brent daily", value=5), "density": 0.82}, owner="crude")
+    bookmarks.save(bookmark("brent daily", value=7), owner="gas")
+    assert bookmarks.get("brent daily", "crude") == {**bookmark("brent daily", value=5), "density": 0.82}
+    assert bookmarks.count("crude") == 3 and bookmarks.count("gas") == 2
+
+def test_search(bookmarks):
+    assert [b["name"] for b in bookmarks.search("crude", prefix="brent")] == ["brent daily", "brent monthly"]
+    assert [b["name"] for b in bookmarks.search("crude", limit=1)] == ["brent daily"]
+    assert [b["name"] for b in bookmarks.search(None, commodity="Henry Hub")] == ["henry hub"]
+    assert bookmarks.search("nobody") == []
+
+def test_delete_many_and_clear_are_scoped_to_one_owner(bookmarks):
+    bookmarks.save(bookmark("brent daily"), owner="gas")
+    assert bookmarks.delete_many(["brent daily", "brent monthly", "missing"], "crude") == 2
+    assert bookmarks.delete_many([], "crude") == 0
+    assert [b["name"] for b in bookmarks.search("crude")] == ["wti daily"]
+    assert bookmarks.clear("crude") == 1
+    assert [b["name"] for b in bookmarks.search("gas")] == ["brent daily", "henry hub"]
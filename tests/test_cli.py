@@ -0,0 +1,52 @@
+import io
+import json
+
+import pytest
+
+from commo_core import convert_units
+from commo_core.cli import main
+
+ARGS = ["--commodity", "Brent Crude", "--from", "barrels", "--to", "metric tons", "--quiet"]
+TONNES = convert_units(1.0, "Oil & Liquids", "Brent Crude", "barrels", "metric tons")
+
+def run(text, *args):
+    stdout = io.StringIO()
+    main([*ARGS, *args], stdin=io.StringIO(text), stdout=stdout, stderr=io.StringIO())
+    return stdout.getvalue()
+
+def test_csv_rows_pass_through_with_a_result_column():
+    output = run("id,value\na,1000\nb, 2 \nc,abc\nd,\n", "--format", "csv", "--chunk-size", "2")
+    lines = output.splitlines()
+    assert lines[0] == "id,value,metric tons"
+    assert lines[1] == f"a,1000,{1000 * TONNES}"
+    assert lines[2].startswith("b, 2 ,") and float(lines[2].split(",")[2]) == pytest.approx(2 * TONNES)
+    assert lines[3:] == ["c,abc,", "d,,"]
+
+def test_csv_missing_column_exits_with_an_error():
+    with pytest.raises(SystemExit, match="column 'volume' not found"):
+        run("value\n1\n", "--format", "csv", "--column", "volume")
+
+def test_json_lines_get_a_result_key():
+    text = '{"id": 1, "value": 10}\n\n{"id": 2, "value": "x"}\n{"id": 3, "value": Infinity}\n{"id": 4}\n'
+    records = [json.loads(line) for line in run(text, "--format", "jsonl", "--chunk-size", "3").splitlines()]
+    assert [record["id"] for record in records] == [1, 2, 3, 4]
+    assert records[0]["metric tons"] == pytest.approx(10 * TONNES)
+    assert [record["metric tons"] for record in records[1:]] == [None, None, None]
+
+@pytest.mark.parametrize("bad_line, message", [
+    ("{not json", "line 3 is not valid JSON"),
+    ("[1, 2]", "line 3 is not a JSON object")
+])
+@pytest.mark.parametrize("chunk_size", ["2", "3"])
+def test_bad_json_lines_stop_after_the_rows_before_them(bad_line, message, chunk_size):
+    stdout = io.StringIO()
+    text = f'{{"value": 1}}\n{{"value": 2}}\n{bad_line}\n{{"value": 4}}\n'
+    with pytest.raises(SystemExit, match=message) as exit_info:
+        main([*ARGS, "--format", "jsonl", "--chunk-size", chunk_size], stdin=io.StringIO(text), stdout=stdout)
+    assert str(exit_info.value).startswith("error: ")
+    assert [json.loads(line)["value"] for line in stdout.getvalue().splitlines()] == [1, 2]
+
+def test_unknown_units_are_rejected():
+    with pytest.raises(SystemExit):
+        main(["--commodity", "Brent Crude", "--from", "barrels", "--to", "kwh"], stdin=io.StringIO(""),
+             stderr=io.StringIO())
@@ -0,0 +1,62 @@
+import itertools
+
+import numpy as np
+import pytest
+
+from commo_core import COMMODITY_DATA, UNIT_CONVERSIONS, convert_units
+from commo_core.energy import ENERGY_BASES, ENERGY_TABLE, equivalence_matrix, to_energy
+
+PAIRS = [(category, commodity, from_unit, to_unit)
+         for category, commodities in COMMODITY_DATA.items()
+         for commodity, properties in commodities.items()
+         for from_unit, to_unit in itertools.product(properties["units"], repeat=2)]
+
+def test_every_listed_unit_has_energy_content():
+    assert all(gj and gj > 0 for gj in ENERGY_TABLE.values())
+
+def test_equivalence_diagonal_matches_convert_units():
+    _, commodities, from_units, to_units = zip(*PAIRS)
+    diagonal = np.diag(equivalence_matrix([1000.0] * len(PAIRS), commodities, from_units, commodities, to_units))
+    expected = [convert_units(1000.0, *pair) for pair in PAIRS]
+    np.testing.assert_allclose(diagonal, expected, rtol=1e-12)
+
+def test_gas_energy_matches_unit_converter():
+    matrix = equivalence_matrix([1000], ["Natural Gas"], ["mcf"], ["Natural Gas"], ["mmbtu"])
+    assert matrix[0, 0] == pytest.approx(convert_units(1000, "Natural Gas", "Natural Gas", "mcf", "mmbtu"), rel=1e-12)
+
+def test_coal_tonnes_convert_through_calorific_value():
+    gj_per_tonne = 6000 * 1000 * UNIT_CONVERSIONS["kcal"]
+    assert convert_units(1, "Coal", "Thermal Coal", "metric tons", "mmbtu") == pytest.approx(
+        gj_per_tonne / UNIT_CONVERSIONS["mmbtu"])
+    assert convert_units(1, "Coal", "Thermal Coal", "metric tons", "mmbtu", calorific_value=5000) == pytest.approx(
+        5000 * 1000 * UNIT_CONVERSIONS["kcal"] / UNIT_CONVERSIONS["mmbtu"])
+    assert to_energy([1], ["Thermal Coal"], ["metric tons"])[0] == pytest.approx(gj_per_tonne)
+
+def test_energy_bases_and_cross_commodity_equivalence():
+    assert to_energy([1], ["Electricity"], ["mwh"], basis="MMBtu")[0] == pytest.approx(3.6 / ENERGY_BASES["MMBtu"])
+    assert to_energy([1], ["Brent Crude"], ["metric tons"], basis="boe")[0] == pytest.approx(42.3 / ENERGY_BASES["boe"])
+    matrix = equivalence_matrix([1, 2], ["Natural Gas", "Electricity"], ["mmbtu", "mwh"],
+                                ["Electricity", "Thermal Coal"], ["mmbtu", "kcal"])
+    assert matrix[0, 0] == pytest.approx(1.0)
+    assert matrix[1, 1] == pytest.approx(7.2 / UNIT_CONVERSIONS["kcal"])
+
+def test_unknown_units_are_nan():
+    assert np.isnan(to_energy([1], ["Brent Crude"], ["mwh"])[0])
+    assert np.isnan(equivalence_matrix([1], ["Wheat"], ["bushels"], ["Unknown"], ["barrels"])[0, 0])
+
+def test_lng_is_converted_as_a_liquid():
+    lng = COMMODITY_DATA["Natural Gas"]["LNG"]
+    gj_per_tonne = lng["calorific_value"]
+    assert ENERGY_TABLE[("LNG", "metric tons")] == pytest.approx(gj_per_tonne)
+    assert 50 < ENERGY_TABLE[("LNG", "metric tons")] < 56
+    assert ENERGY_TABLE[("LNG", "gallons")] == pytest.approx(UNIT_CONVERSIONS["gallons"] * lng["density"] * gj_per_tonne)
+    assert ENERGY_TABLE[("LNG", "cubic_meters")] == pytest.approx(lng["density"] * gj_per_tonne)
+    assert convert_units(1, "Natural Gas", "LNG", "metric tons", "mmbtu") == pytest.approx(
+        gj_per_tonne / UNIT_CONVERSIONS["mmbtu"])
+    assert convert_units(1, "Natural Gas", "LNG", "metric tons", "cubic_meters") == pytest.approx(1 / lng["density"])
+    # Pipeline gas keeps its volumetric calorific value
+    assert convert_units(1, "Natural Gas", "Natural Gas", "mmbtu", "cubic_meters") == pytest.approx(1000 / 38.7)
+
+def test_lng_compares_with_other_fuels_per_tonne():
+    matrix = equivalence_matrix([1], ["LNG"], ["metric tons"], ["Brent Crude"], ["metric tons"])
+    assert matrix[0, 0] == pytest.approx(55 / 42.3)
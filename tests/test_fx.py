@@ -0,0 +1,210 @@
+import asyncio
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from commo_core import fx
+from commo_core.fx import RateCache, RateMatrix
+
+@pytest.fixture
+def matrix():
+    return RateMatrix({"EUR": 0.5, "GBP": 0.25}, "USD", currencies=["USD", "EUR", "GBP", "JPY"])
+
+def test_cross_rates(matrix):
+    assert matrix.rate("EUR", "GBP") == 0.5
+    assert matrix.rate("USD", "JPY") is None
+    np.testing.assert_allclose(matrix.convert([1, 1, 1], ["EUR", "GBP", "XXX"], "USD"), [2, 4, np.nan])
+
+def test_ledger_converts_and_subtotals_every_row(matrix):
+    amounts = [10, 20, np.nan, 5, 7, 1, 2, 3]
+    currencies = ["usd", " EUR ", "EUR", "XXX", "JPY", "", None, np.nan]
+    converted, subtotals = matrix.ledger(amounts, currencies, "USD")
+    np.testing.assert_allclose(converted, [10, 40, np.nan, np.nan, np.nan, np.nan, np.nan, np.nan])
+    assert subtotals["currency"].tolist() == ["", "EUR", "JPY", "USD", "XXX"]
+    assert subtotals["rows"].tolist() == [3, 2, 1, 1, 1]
+    assert subtotals["amount"].tolist() == [6, 20, 7, 10, 5]
+    assert subtotals["rows"].sum() == len(amounts)
+    unconverted = subtotals[subtotals["rate"].isna()]
+    assert unconverted["currency"].tolist() == ["", "JPY", "XXX"]
+    assert subtotals["converted"].sum() == 50
+
+def test_ledger_of_nothing(matrix):
+    converted, subtotals = matrix.ledger([], [], "EUR")
+    assert len(converted) == 0 and subtotals.empty
+
+def test_ledger_matches_row_by_row_conversion(matrix):
+    rng = np.random.default_rng(0)
+    amounts = rng.uniform(0, 1000, 500)
+    currencies = rng.choice(["USD", "EUR", "GBP"], 500)
+    converted, subtotals = matrix.ledger(amounts, currencies, "GBP")
+    np.testing.assert_allclose(converted, matrix.convert(amounts, currencies, "GBP"))
+    expected = pd.Series(converted).groupby(currencies).sum()
+    np.testing.assert_allclose(subtotals.set_index("currency")["converted"], expected)
+
+@pytest.fixture
+def rate_server(monkeypatch):
+    """Local stand-in for the rate API that counts requests and client connections"""
+    server_state = {"requests": [], "clients": set(), "delay": 0.0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            server_state["requests"].append(self.path)
+            server_state["clients"].add(self.client_address)
+            time.sleep(server_state["delay"])
+            body = json.dumps({"base": self.path.rsplit("/", 1)[-1], "rates": {"EUR": 0.5, "GBP": 0.25}}).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    monkeypatch.setattr(fx, "RATES_URL", f"http://127.0.0.1:{server.server_address[1]}/latest/{{base}}")
+    yield server_state
+    server.shutdown()
+    server.server_close()
+
+def test_concurrent_requests_for_one_base_make_one_upstream_call(rate_server):
+    rate_server["delay"] = 0.2
+    cache = RateCache()
+    callers = 16
+    barrier = threading.Barrier(callers)
+
+    def get_rates():
+        barrier.wait()
+        return cache.get_rates("USD")
+
+    with ThreadPoolExecutor(callers) as pool:
+        tables = list(pool.map(lambda _: get_rates(), range(callers)))
+    assert rate_server["requests"] == ["/latest/USD"]
+    assert tables[0] == {"EUR": 0.5, "GBP": 0.25}
+    assert all(table is tables[0] for table in tables)
+    stats = cache.stats()
+    assert stats["fetches"] == 1 and stats["coalesced"] + stats["hits"] == callers - 1
+
+def test_fetches_reuse_pooled_connections(rate_server):
+    cache = RateCache()
+    for base in ["USD", "EUR", "GBP"]:
+        assert cache.get_rates(base) == {"EUR": 0.5, "GBP": 0.25}
+    assert fx.get_session() is fx.get_session()
+    assert len(rate_server["requests"]) == 3
+    assert len(rate_server["clients"]) == 1
+
+class CountingFetch:
+    """Injected fetch returning a new table per call; blocks while `gate` is cleared and fails if `fail` is set"""
+
+    def __init__(self):
+        self.calls = 0
+        self.gate = threading.Event()
+        self.gate.set()
+        self.fail = False
+
+    def __call__(self, base_currency):
+        self.calls += 1
+        self.gate.wait(5)
+        if self.fail:
+            raise ConnectionError("offline")
+        return {"EUR": float(self.calls)}
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.005)
+    assert condition()
+
+def test_fresh_tables_are_served_from_the_cache():
+    fetch = CountingFetch()
+    cache = RateCache(fetch=fetch, ttl=60)
+    assert cache.get_rates("USD") == {"EUR": 1.0}
+    assert cache.get_rates("USD") == {"EUR": 1.0}
+    assert fetch.calls == 1
+    assert cache.source("USD") == "live" and cache.age("USD") < 60 and cache.fetched_at("USD") <= time.time()
+    stats = cache.stats()
+    assert (stats["misses"], stats["hits"], stats["stale_hits"], stats["fetches"]) == (1, 1, 0, 1)
+    assert set(stats["ages"]) == {"USD"} and stats["sources"] == {"USD": "live"}
+
+def test_expired_tables_are_served_stale_while_one_refresh_runs():
+    fetch = CountingFetch()
+    cache = RateCache(fetch=fetch, ttl=0.05)
+    cache.get_rates("USD")
+    time.sleep(0.06)
+    fetch.gate.clear()
+    # Every caller gets the stale table at once; only the first starts a refresh
+    started = time.perf_counter()
+    assert [cache.get_rates("USD") for _ in range(5)] == [{"EUR": 1.0}] * 5
+    assert time.perf_counter() - started < 1
+    wait_for(lambda: fetch.calls == 2)
+    assert cache.stats()["stale_hits"] == 5
+    fetch.gate.set()
+    wait_for(lambda: cache.stats()["refreshes"] == 1)
+    assert cache.get_rates("USD") == {"EUR": 2.0}
+    assert fetch.calls == 2
+
+def test_failed_refresh_keeps_the_stale_table():
+    fetch = CountingFetch()
+    cache = RateCache(fetch=fetch, ttl=0.05)
+    cache.get_rates("USD")
+    time.sleep(0.06)
+    fetch.fail = True
+    assert cache.get_rates("USD") == {"EUR": 1.0}
+    wait_for(lambda: cache.stats()["failures"] == 1)
+    wait_for(lambda: "USD" not in cache._refreshing)
+    assert cache.get_rates("USD") == {"EUR": 1.0}
+    assert cache.stats()["refreshes"] == 0
+
+def test_first_fetch_failure_returns_none_and_clear_forgets_tables():
+    fetch = CountingFetch()
+    fetch.fail = True
+    cache = RateCache(fetch=fetch)
+    assert cache.get_rates("USD") is None
+    assert cache.source("USD") is None and cache.age("USD") is None
+    fetch.fail = False
+    assert cache.get_rates("USD") == {"EUR": 2.0}
+    cache.clear()
+    assert cache.get_rates("USD") == {"EUR": 3.0}
+    assert cache.stats()["misses"] == 3
+
+def test_multi_base_fetch_waits_for_the_slowest_call_not_the_sum():
+    def slow_fetch(base_currency):
+        time.sleep(0.3)
+        if base_currency == "XXX":
+            raise ConnectionError("unknown base")
+        return {"USD": 1.0, "base": base_currency}
+
+    cache = RateCache(fetch=slow_fetch)
+    started = time.perf_counter()
+    tables, errors = asyncio.run(fx.fetch_rate_tables(["USD", "EUR", "GBP", "JPY", "XXX", "EUR"], cache=cache))
+    assert time.perf_counter() - started < 0.9
+    assert sorted(tables) == ["EUR", "GBP", "JPY", "USD"]
+    assert tables["JPY"] == {"USD": 1.0, "base": "JPY"}
+    assert errors == {"XXX": "fetch failed"}
+
+def test_multi_base_fetch_times_out_each_base_separately():
+    release = threading.Event()
+
+    def fetch(base_currency):
+        if base_currency == "JPY":
+            release.wait(5)
+        return {"USD": 1.0}
+
+    try:
+        started = time.perf_counter()
+        tables, errors = asyncio.run(fx.fetch_rate_tables(["USD", "JPY", "EUR"], timeout=0.2,
+                                                          cache=RateCache(fetch=fetch)))
+        assert time.perf_counter() - started < 1
+    finally:
+        release.set()
+    assert sorted(tables) == ["EUR", "USD"]
+    assert errors == {"JPY": "timed out after 0.2s"}
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from commo_core.fx_history import RateHistory, convert_dated_frame
+
+@pytest.fixture
+def history(tmp_path):
+    history = RateHistory(str(tmp_path / "fx_history.parquet"))
+    history.import_long(pd.DataFrame({
+        "date": ["2024-01-01", "2024-01-01", "2024-01-03", "2024-01-03", "2024-01-10"],
+        "currency": ["EUR", "GBP", "EUR", "GBP", "EUR"],
+        "rate": [0.90, 0.80, 0.92, 0.79, 0.95]
+    }))
+    return history
+
+def test_import_and_record(history):
+    assert history.currencies() == ["EUR", "GBP", "USD"]
+    history.record({"EUR": 0.96, "JPY": 150.0}, "2024-01-10")
+    assert list(history.dates()) == list(np.array(["2024-01-01", "2024-01-03", "2024-01-10"], dtype="datetime64[D]"))
+    assert history.column("EUR")[-1] == 0.96
+    assert history.column("JPY")[-1] == 150.0
+    assert np.isnan(history.column("GBP")[-1])
+
+def test_asof_join_matches_merge_asof(history):
+    dates = pd.to_datetime(["2024-01-01", "2024-01-02", "2024-01-05", "2024-01-10", "2024-03-01"])
+    expected = pd.merge_asof(pd.DataFrame({"date": dates}),
+                             pd.DataFrame({"date": pd.to_datetime(["2024-01-01", "2024-01-03", "2024-01-10"]),
+                                           "EUR": [0.90, 0.92, 0.95]}), on="date")["EUR"].to_numpy()
+    np.testing.assert_allclose(history.rates_asof(dates.to_numpy(), "USD", "EUR"), expected)
+
+def test_dates_before_history_or_missing_have_no_rate(history):
+    dates = np.array(["2023-12-31", "NaT", "2024-01-02"], dtype="datetime64[D]")
+    assert list(history.asof_index(dates)) == [-1, -1, 0]
+    assert list(history.asof_index(dates, tolerance_days=5)) == [-1, -1, 0]
+
+def test_tolerance(history):
+    dates = np.array(["2024-01-05", "2024-01-06", "2024-01-09"], dtype="datetime64[D]")
+    assert list(history.asof_index(dates, tolerance_days=2)) == [1, -1, -1]
+    assert list(history.asof_index(dates, tolerance_days=0)) == [-1, -1, -1]
+
+def test_convert_dated_frame(history):
+    frame = pd.DataFrame({
+        "date": ["2024-01-02", "", "not a date", None, "2024-01-04", "2024-01-04"],
+        "amount": [100, 100, 100, 100, 100, "n/a"],
+        "currency": ["EUR", "EUR", "EUR", "EUR", "XXX", "GBP"]
+    })
+    converted = convert_dated_frame(frame, "USD", history=history)
+    np.testing.assert_allclose(converted["rate"], [1 / 0.90, np.nan, np.nan, np.nan, np.nan, 1 / 0.79])
+    np.testing.assert_allclose(converted["converted"], [100 / 0.90] + [np.nan] * 5)
+    assert converted["converted"].sum() == pytest.approx(100 / 0.90)
+
+def test_cross_rates_per_row(history):
+    rates = history.rates_asof(np.array(["2024-01-03", "2024-01-03"], dtype="datetime64[D]"),
+                               np.array(["EUR", "GBP"]), np.array(["GBP", "EUR"]))
+    np.testing.assert_allclose(rates, [0.79 / 0.92, 0.92 / 0.79])
+
+def test_currency_codes_are_normalised(history):
+    frame = pd.DataFrame({"date": ["2024-01-03"] * 4, "amount": [100] * 4,
+                          "currency": [" eur", "EUR ", "gbp", None]})
+    converted = convert_dated_frame(frame, " usd ", history=history)
+    np.testing.assert_allclose(converted["rate"], [1 / 0.92, 1 / 0.92, 1 / 0.79, np.nan])
+    rates = history.rates_asof(np.array(["2024-01-03"], dtype="datetime64[D]"), "eur", "Gbp")
+    np.testing.assert_allclose(rates, [0.79 / 0.92])
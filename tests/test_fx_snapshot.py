@@ -0,0 +1,84 @@
+import time
+
+import pytest
+
+from commo_core.fx import RateCache
+from commo_core.fx_snapshot import RateSnapshot
+
+@pytest.fixture
+def snapshot(tmp_path):
+    return RateSnapshot(str(tmp_path / "fx_snapshot.bin"))
+
+def test_tables_round_trip(snapshot):
+    assert snapshot.get("USD") is None and snapshot.tables() == {}
+    snapshot.store("USD", {"EUR": 0.5, "GBP": 0.25}, fetched_at=100.0)
+    snapshot.store("EUR", {"USD": 2.0, "JPY": 160}, fetched_at=200.0)
+    assert snapshot.get("USD") == ({"EUR": 0.5, "GBP": 0.25}, 100.0)
+    assert snapshot.get("EUR") == ({"USD": 2.0, "JPY": 160.0}, 200.0)
+    assert snapshot.tables() == {"USD": 100.0, "EUR": 200.0}
+    snapshot.store("USD", {"EUR": 0.6}, fetched_at=300.0)
+    assert snapshot.get("USD") == ({"EUR": 0.6}, 300.0)
+
+def test_codes_that_do_not_fit_are_skipped(snapshot):
+    snapshot.store("USD", {"EUR": 0.5, "TOOLONGCODE": 1.0, "€": 2.0}, fetched_at=1.0)
+    snapshot.store("ÜSD", {"EUR": 0.5}, fetched_at=1.0)
+    assert snapshot.get("USD") == ({"EUR": 0.5}, 1.0)
+    assert list(snapshot.tables()) == ["USD"]
+
+def test_tables_written_by_another_process_are_seen_and_kept(snapshot):
+    other = RateSnapshot(snapshot.path)
+    snapshot.store("USD", {"EUR": 0.5}, fetched_at=1.0)
+    assert other.get("USD") == ({"EUR": 0.5}, 1.0)
+    other.store("GBP", {"USD": 1.25}, fetched_at=2.0)
+    assert snapshot.get("GBP") == ({"USD": 1.25}, 2.0)
+    snapshot.store("EUR", {"USD": 2.0}, fetched_at=3.0)
+    assert set(other.tables()) == {"USD", "GBP", "EUR"}
+
+@pytest.mark.parametrize("content", [b"", b"NOTASNAP" + bytes(8), b"COMMOFX1\x01\x00\x00\x00\x05\x00\x00\x00USD\0\0\0\0\0"])
+def test_corrupt_files_read_as_empty(snapshot, content):
+    with open(snapshot.path, "wb") as f:
+        f.write(content)
+    assert snapshot.get("USD") is None
+    snapshot.store("USD", {"EUR": 0.5}, fetched_at=1.0)
+    assert snapshot.get("USD") == ({"EUR": 0.5}, 1.0)
+
+def test_clear(snapshot):
+    snapshot.store("USD", {"EUR": 0.5})
+    snapshot.clear()
+    snapshot.clear()
+    assert snapshot.get("USD") is None
+
+def failing_fetch(base_currency):
+    raise ConnectionError("offline")
+
+def test_cold_cache_is_served_from_the_snapshot_without_fetching(snapshot):
+    snapshot.store("USD", {"EUR": 0.5}, fetched_at=time.time())
+    fetches = []
+    cache = RateCache(fetch=lambda base: fetches.append(base) or {"EUR": 0.9}, snapshot=snapshot)
+    assert cache.get_rates("USD") == {"EUR": 0.5}
+    assert fetches == [] and cache.source("USD") == "snapshot"
+    assert cache.stats()["snapshot_loads"] == 1
+
+def test_live_fetches_are_stored_and_failed_fetches_fall_back_to_the_snapshot(snapshot):
+    cache = RateCache(fetch=lambda base: {"EUR": 0.9}, snapshot=snapshot)
+    assert cache.get_rates("USD") == {"EUR": 0.9} and cache.source("USD") == "live"
+    assert snapshot.get("USD")[0] == {"EUR": 0.9}
+
+    offline = RateCache(fetch=failing_fetch, snapshot=RateSnapshot(snapshot.path))
+    assert offline.get_rates("USD") == {"EUR": 0.9}
+    assert offline.source("USD") == "snapshot"
+    assert offline.get_rates("GBP") is None
+    assert offline.stats()["failures"] == 1
+
+def test_stale_snapshots_are_served_and_refreshed(snapshot):
+    snapshot.store("USD", {"EUR": 0.5}, fetched_at=time.time() - 3600)
+    cache = RateCache(fetch=lambda base: {"EUR": 0.9}, snapshot=snapshot, ttl=60)
+    assert cache.get_rates("USD") == {"EUR": 0.5}
+    assert cache.age("USD") >= 3600
+    # The refresh runs in the background and writes the snapshot last
+    for _ in range(200):
+        if snapshot.get("USD")[0] == {"EUR": 0.9}:
+            break
+        time.sleep(0.01)
+    assert snapshot.get("USD")[0] == {"EUR": 0.9}
+    assert cache.get_rates("USD") == {"EUR": 0.9} and cache.source("USD") == "live"
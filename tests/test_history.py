@@ -0,0 +1,73 @@
+import sqlite3
+
+import pytest
+
+from commo_core.bookmarks import DEFAULT_OWNER
+from commo_core.history import HistoryStore
+
+def conversion(value, commodity="Brent Crude"):
+    return {"category": "Oil", "commodity": commodity, "input_value": value, "from_unit": "barrels",
+            "to_unit": "metric tons", "result": value / 7.33, "density": 0.85}
+
+@pytest.fixture
+def history(tmp_path):
+    history = HistoryStore(str(tmp_path / "history.sqlite3"), flush_interval=0.01)
+    for second in range(12):
+        history.add(conversion(second), timestamp=f"2024-01-01 00:00:{second:02d}", owner="crude")
+    history.add(conversion(99, "Henry Hub"), timestamp="2024-01-01 00:00:30", owner="gas")
+    history.flush()
+    return history
+
+def test_pages_are_newest_first_and_scoped_to_one_owner(history):
+    first, cursor = history.page(5, owner="crude")
+    second, cursor = history.page(5, before=cursor, owner="crude")
+    last, cursor = history.page(5, before=cursor, owner="crude")
+    values = [entry["input_value"] for entry in first + second + last]
+    assert values == list(range(11, -1, -1))
+    assert cursor is None
+    assert first[0]["density"] == 0.85 and first[0]["owner"] == "crude"
+    assert [entry["commodity"] for entry in history.recent(5, owner="gas")] == ["Henry Hub"]
+    assert history.count(owner="crude") == 12
+    assert history.count(owner=None) == 13
+    assert history.count(owner="crude", commodity="Henry Hub") == 0
+
+def test_clear_deletes_only_that_owner(history):
+    assert history.clear("crude") == 12
+    assert history.count(owner="crude") == 0
+    assert history.count(owner="gas") == 1
+
+def test_pages_use_the_owner_index(history):
+    connection = history._connect()
+    plan = connection.execute("EXPLAIN QUERY PLAN SELECT * FROM conversions WHERE owner = ? AND (timestamp, id) < (?, ?) "
+                              "ORDER BY timestamp DESC, id DESC LIMIT 6", ("crude", "2024-01-01 00:00:05", 6)).fetchall()
+    connection.close()
+    detail = " ".join(row["detail"] for row in plan)
+    assert "idx_conversions_owner" in detail and "TEMP B-TREE" not in detail
+
+def test_unscoped_history_files_are_migrated_to_the_default_owner(tmp_path):
+    path = str(tmp_path / "old.sqlite3")
+    connection = sqlite3.connect(path)
+    connection.executescript("""
+        CREATE TABLE conversions (id INTEGER PRIMARY KEY, timestamp TEXT NOT NULL, category TEXT, commodity TEXT,
+                                  input_value REAL, from_unit TEXT, to_unit TEXT, result REAL, params TEXT);
+        CREATE INDEX idx_conversions_timestamp ON conversions (timestamp);
+        INSERT INTO conversions VALUES (1, '2024-01-01 00:00:00', 'Oil', 'Brent Crude', 1, 'barrels', 'barrels', 1, NULL);
+    """)
+    connection.close()
+    history = HistoryStore(path)
+    assert [entry["owner"] for entry in history.recent(5)] == [DEFAULT_OWNER]
+    history.add(conversion(2), owner="crude")
+    history.flush()
+    assert history.count(owner="crude") == 1 and history.count() == 1
+
+def test_unwritable_history_turns_recording_off_instead_of_hanging(tmp_path):
+    history = HistoryStore(str(tmp_path), flush_interval=0.01)  # a directory cannot be opened as a database
+    for value in range(5):
+        history.add(conversion(value))
+    history._writer.join(timeout=5)
+    assert not history._writer.is_alive()
+    history.flush()
+    assert not history.enabled
+    history.add(conversion(6))
+    history.flush()
+    assert history._queue.unfinished_tasks == 0
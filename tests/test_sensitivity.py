@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from commo_core import COMMODITY_DATA, convert_units
+from commo_core.sensitivity import (
+    PARAMETER_BOUNDS,
+    convert_with_parameters,
+    monte_carlo,
+    quality_parameter,
+    sample_parameter,
+    sweep
+)
+
+CASES = [(category, commodity, from_unit, to_unit)
+         for category, commodities in COMMODITY_DATA.items() if quality_parameter(category)
+         for commodity, properties in commodities.items()
+         for from_unit in properties["units"] for to_unit in properties["units"] if from_unit != to_unit]
+
+@pytest.mark.parametrize("category, commodity, from_unit, to_unit", CASES)
+def test_matches_convert_units_for_every_drawn_value(category, commodity, from_unit, to_unit):
+    parameter = quality_parameter(category)
+    reference = COMMODITY_DATA[category][commodity][parameter]
+    draws = sample_parameter(reference, 0.1 * reference, 5, "uniform", seed=0)
+    results = convert_with_parameters(1000, category, commodity, from_unit, to_unit, [reference, *draws])
+    expected = [convert_units(1000, category, commodity, from_unit, to_unit, **{parameter: value})
+                for value in [reference, *draws]]
+    np.testing.assert_allclose(results, expected, rtol=1e-9)
+    assert results[0] == pytest.approx(convert_units(1000, category, commodity, from_unit, to_unit))
+
+def test_categories_without_a_quality_parameter():
+    assert quality_parameter("Power/Electricity") is None
+    assert quality_parameter("Coal") is None
+
+@pytest.mark.parametrize("distribution", ["normal", "uniform", "triangular"])
+def test_monte_carlo_percentiles_are_ordered(distribution):
+    summary = monte_carlo(1000, "Oil & Liquids", "Brent Crude", "barrels", "metric tons", draws=20_000,
+                          distribution=distribution, seed=1)
+    bands = list(summary["percentiles"].values())
+    assert bands == sorted(bands)
+    assert summary["parameter"] == "density" and summary["draws"] == 20_000
+    assert summary["mean"] == pytest.approx(convert_units(1000, "Oil & Liquids", "Brent Crude", "barrels",
+                                                          "metric tons"), rel=0.01)
+    assert summary["histogram"]["counts"].sum() == 20_000
+
+def test_sampled_parameters_are_clipped_to_their_valid_range():
+    densities = sample_parameter(0.85, 10, 10_000, seed=2, low=PARAMETER_BOUNDS["density"][0])
+    assert densities.min() == PARAMETER_BOUNDS["density"][0] > 0
+    moisture = sample_parameter(13.5, 500, 10_000, "uniform", *PARAMETER_BOUNDS["moisture_content"], seed=3)
+    assert moisture.min() == 0 and moisture.max() == PARAMETER_BOUNDS["moisture_content"][1] < 100
+
+    # Spreads far wider than the physical range still give finite, positive conversions
+    for category, commodity, from_unit, to_unit, center, spread in [
+            ("Oil & Liquids", "Brent Crude", "barrels", "metric tons", 0.825, 5),
+            ("Agricultural", "Wheat", "bushels", "metric tons", 13.5, 500)]:
+        summary = monte_carlo(1000, category, commodity, from_unit, to_unit, center, spread, draws=10_000, seed=4)
+        bands = list(summary["percentiles"].values())
+        assert np.isfinite(bands).all() and bands[0] > 0 and bands == sorted(bands)
+
+def test_unknown_distribution():
+    with pytest.raises(ValueError):
+        sample_parameter(1, 1, 10, "cauchy")
+
+def test_sweep_is_monotonic_in_density():
+    grid, results = sweep(1000, "Oil & Liquids", "Brent Crude", "barrels", "metric tons", 0.7, 1.0, steps=7)
+    np.testing.assert_allclose(grid, np.linspace(0.7, 1.0, 7))
+    assert (np.diff(results) > 0).all()
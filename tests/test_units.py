@@ -0,0 +1,31 @@
+import pytest
+
+from commo_core import COMMODITY_DATA, UNIT_FACTOR_INDEX, compile_unit_graph, convert_units, get_conversion_factor
+
+def test_default_conversions_are_served_by_the_precompiled_index():
+    misses = compile_unit_graph.cache_info().misses
+    for category, commodities in COMMODITY_DATA.items():
+        for commodity, properties in commodities.items():
+            for from_unit in properties["units"]:
+                for to_unit in properties["units"]:
+                    convert_units(1.0, category, commodity, from_unit, to_unit)
+    assert compile_unit_graph.cache_info().misses == misses
+
+def test_index_matches_freshly_compiled_graphs():
+    for (category, commodity, density, calorific_value, moisture_content), factors in UNIT_FACTOR_INDEX.items():
+        graph = compile_unit_graph.__wrapped__(category, commodity, density, calorific_value, moisture_content)
+        assert factors == graph["factors"]
+
+def test_keyword_and_positional_calls_share_one_graph():
+    by_keyword = get_conversion_factor("Oil & Liquids", "barrels", "metric tons", density=0.9)
+    positional = get_conversion_factor("Oil & Liquids", "barrels", "metric tons", "Brent Crude", 0.9)
+    assert by_keyword == positional
+    misses = compile_unit_graph.cache_info().misses
+    get_conversion_factor("Oil & Liquids", "liters", "metric tons", "WTI Crude", density=0.9)
+    assert compile_unit_graph.cache_info().misses == misses
+
+def test_overrides_change_the_factor():
+    assert convert_units(1000, "Oil & Liquids", "Brent Crude", "barrels", "metric tons", density=0.9) == pytest.approx(
+        1000 * 0.158987 * 0.9)
+    assert convert_units(1000, "Natural Gas", "Natural Gas", "mmbtu", "cubic_meters", calorific_value=40) == pytest.approx(
+        1000 * 1000 / 40)